@@ -1,5 +1,3 @@
-import math
-
 from odoo import api, fields, models
 
 
@@ -25,27 +23,13 @@ class AccountAsset(models.Model):
         res["context"] = {"default_asset_ids": [(6, 0, self.ids)]}
         return res
 
-    @api.model
-    def create(self, vals):
-        res = super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
         ctx = self._context
-        if ctx.get("create_asset_from_move_line") and res.profile_id.has_equipments:
+        equipment_assets = res.filtered("profile_id.has_equipments")
+        if ctx.get("create_asset_from_move_line") and equipment_assets:
             invoice = self.env["account.move"].browse(ctx.get("move_id", []))
-            for line in invoice.invoice_line_ids:
-                equipment_qty = math.ceil(line.quantity)
-                equipments = self.env["maintenance.equipment"]
-                for equipment_nr in range(int(equipment_qty)):
-                    equipment_data = {
-                        "name": "{} [{}/{}]".format(
-                            line.name, equipment_nr + 1, equipment_qty
-                        ),
-                        "category_id": (line.asset_profile_id.equipment_category_id.id),
-                        "invoice_line_id": line.id,
-                        "cost": line.price_subtotal / line.quantity,
-                        "partner_id": line.move_id.partner_id.id,
-                        "owner_user_id": (line.move_id.user_id or self.env.user).id,
-                        "purchase_date": line.move_id.invoice_date,
-                    }
-                    equipments += equipments.create(equipment_data)
-                res.write({"equipment_ids": [(4, x) for x in equipments.ids]})
+            equipments = invoice.invoice_line_ids._get_or_create_equipments()
+            equipment_assets.write({"equipment_ids": [(4, x) for x in equipments.ids]})
         return res
@@ -1,5 +1,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import math
+
 from odoo import api, fields, models
 
 
@@ -33,3 +35,29 @@ class AccountMoveLine(models.Model):
         inverse_name="invoice_line_id",
         string="Equipments",
     )
+
+    def _get_or_create_equipments(self):
+        """
+        Return the equipments of the lines, after creating one equipment per unit
+        of quantity for lines that have none yet
+        """
+        vals_list = []
+        for line in self.filtered(lambda x: not x.equipment_ids):
+            equipment_qty = math.ceil(line.quantity)
+            vals_list += [
+                line._prepare_equipment_vals(equipment_nr, equipment_qty)
+                for equipment_nr in range(int(equipment_qty))
+            ]
+        self.env["maintenance.equipment"].create(vals_list)
+        return self.mapped("equipment_ids")
+
+    def _prepare_equipment_vals(self, equipment_nr, equipment_qty):
+        return {
+            "name": "{} [{}/{}]".format(self.name, equipment_nr + 1, equipment_qty),
+            "category_id": (self.asset_profile_id.equipment_category_id.id),
+            "invoice_line_id": self.id,
+            "cost": self.price_subtotal / self.quantity,
+            "partner_id": self.move_id.partner_id.id,
+            "owner_user_id": (self.move_id.user_id or self.env.user).id,
+            "purchase_date": self.move_id.invoice_date,
+        }
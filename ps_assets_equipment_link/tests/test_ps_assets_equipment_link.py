@@ -34,3 +34,34 @@ class TestPsAssetsEquipmentLink(TransactionCase):
             equipment_action["domain"]
         )
         self.assertEqual(new_asset.equipment_ids, equipment)
+
+    def test_asset_creation_multiple_lines(self):
+        """Assets of the same bill share equipments instead of duplicating them"""
+        self.invoice.write(
+            {
+                "invoice_line_ids": [
+                    (1, self.invoice.invoice_line_ids.id, {"quantity": 3}),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "another line with asset",
+                            "quantity": 2,
+                            "asset_profile_id": self.env.ref(
+                                "ps_assets_equipment_link.demo_asset_profile"
+                            ).id,
+                        },
+                    ),
+                ]
+            }
+        )
+        last_asset = self.env["account.asset"].search([], order="id desc", limit=1)
+        self.invoice.action_post()
+        new_assets = self.env["account.asset"].search([("id", ">", last_asset.id or 0)])
+        self.assertEqual(len(self.invoice.equipment_ids), 5)
+        for asset in new_assets:
+            self.assertEqual(asset.equipment_ids, self.invoice.equipment_ids)
+        self.assertEqual(
+            self.invoice.equipment_ids.mapped("warranty_date"),
+            self.invoice.equipment_ids.mapped("purchase_date"),
+        )
@@ -0,0 +1,18 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+{
+    "name": "PS benchmark",
+    "summary": "Generate data at scale and time the invoicing pipeline",
+    "version": "14.0.1.0.0",
+    "development_status": "Alpha",
+    "category": "Tools",
+    "website": "http://www.tosc.nl",
+    "author": "Hunki Enterprises BV,The Open Source Company,Odoo Community Association (OCA)",
+    "license": "AGPL-3",
+    "depends": [
+        "ps_timesheet_invoicing",
+        "ps_planning",
+    ],
+    "data": [],
+}
@@ -0,0 +1 @@
+from . import ps_benchmark
@@ -0,0 +1,505 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+import json
+import logging
+import random
+import time
+from datetime import date, timedelta
+
+from psycopg2.extras import execute_values
+
+from odoo import api, fields, models
+
+from odoo.addons.ps_hr.models.ps_instrumentation import collect_instrumentation
+
+_logger = logging.getLogger(__name__)
+
+# a monday, so that generated weeks are calendar weeks
+BENCHMARK_DATE_START = date(2024, 1, 1)
+BENCHMARK_REFRESH_MODELS = [
+    "status.time.report",
+    "crm.pipeline.actuals.monthly",
+    "ps.planning.billing.report",
+]
+BENCHMARK_REPORT_MODELS = [
+    "status.time.report",
+    "hr.chargeability.report",
+    "overtime.balance.report",
+    "crm.pipeline.actuals.report",
+    "ps.time.line.planning.report",
+    "ps.planning.billing.report",
+]
+
+
+class BenchmarkRollback(Exception):
+    """Raised to roll back the savepoint a benchmark runs in"""
+
+
+class PsBenchmark(models.AbstractModel):
+    _name = "ps.benchmark"
+    _description = "Benchmark of the invoicing pipeline"
+
+    @api.model
+    def _sql_insert(self, model_name, vals_list):
+        """
+        Insert vals_list into the table of model_name, return the new records.
+        Values for fields without column are ignored, stored computed fields are
+        computed by the ORM afterwards
+        """
+        Model = self.env[model_name]
+        if not vals_list:
+            return Model
+        now = fields.Datetime.now()
+        columns = [
+            name
+            for name in vals_list[0]
+            if name in Model._fields
+            and Model._fields[name].store
+            and Model._fields[name].column_type
+        ]
+        if Model._log_access:
+            columns += ["create_uid", "create_date", "write_uid", "write_date"]
+            vals_list = [
+                dict(
+                    vals,
+                    create_uid=self.env.uid,
+                    create_date=now,
+                    write_uid=self.env.uid,
+                    write_date=now,
+                )
+                for vals in vals_list
+            ]
+        rows = execute_values(
+            self.env.cr,
+            'INSERT INTO "%s" (%s) VALUES %%s RETURNING id'
+            % (Model._table, ", ".join('"%s"' % column for column in columns)),
+            [tuple(vals[column] for column in columns) for vals in vals_list],
+            page_size=1000,
+            fetch=True,
+        )
+        self.env.cache.invalidate()
+        records = Model.browse([row[0] for row in rows])
+        for field in Model._fields.values():
+            if field.store and field.compute:
+                self.env.add_to_compute(field, records)
+        records.recompute()
+        return records
+
+    @api.model
+    def _generate_date_ranges(self, range_type, date_start, date_end, step, name):
+        """
+        Insert date ranges of length step (an SQL interval) from date_start to
+        date_end where the type has none yet, named by the to_char format name
+        """
+        self.env["date.range"].flush()
+        self.env.cr.execute(
+            """
+            INSERT INTO date_range (
+                name, type_id, company_id, date_start, date_end, active,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                to_char(day, %(name)s), %(type_id)s, %(company_id)s, day::date,
+                (day + %(step)s::interval - interval '1 day')::date, TRUE,
+                %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+            FROM generate_series(
+                %(date_start)s::date, %(date_end)s::date, %(step)s::interval
+            ) day
+            WHERE NOT EXISTS (
+                SELECT 1 FROM date_range dr
+                WHERE dr.type_id = %(type_id)s
+                AND daterange(dr.date_start, dr.date_end, '[]') && daterange(
+                    day::date,
+                    (day + %(step)s::interval - interval '1 day')::date,
+                    '[]'
+                )
+            )
+            """,
+            {
+                "name": name,
+                "type_id": range_type.id,
+                "company_id": self.env.company.id,
+                "date_start": date_start,
+                "date_end": date_end,
+                "step": step,
+                "uid": self.env.uid,
+            },
+        )
+        self.env["date.range"].invalidate_cache()
+
+    @api.model
+    def _generate_data(
+        self,
+        employees=10,
+        projects=5,
+        weeks=4,
+        lines_per_week=5,
+        seed=0,
+        date_start=BENCHMARK_DATE_START,
+    ):
+        """
+        Generate employees with a timesheet per week, projects with one task and
+        fee rates for all employees on all tasks, and time lines spread over the
+        working days of the sheets. The same parameters yield the same data.
+        Return a dict with the generated records
+        """
+        rng = random.Random(seed)
+        prefix = "benchmark-%s-%s-%s-%s-%s" % (
+            seed,
+            employees,
+            projects,
+            weeks,
+            lines_per_week,
+        )
+        company = self.env.company
+        date_end = date_start + timedelta(weeks=weeks, days=-1)
+        week_type = self.env.ref("ps_date_range_week.date_range_calender_week")
+        self._generate_date_ranges(
+            week_type, date_start, date_end, "1 week", '"Week" IYYY-IW'
+        )
+        self._generate_date_ranges(
+            self.env.ref("account_fiscal_month.date_range_fiscal_month"),
+            date_start.replace(day=1),
+            date_end,
+            "1 month",
+            "YYYY-MM",
+        )
+        week_ranges = self.env["date.range"].search(
+            [
+                ("type_id", "=", week_type.id),
+                ("date_start", ">=", date_start),
+                ("date_start", "<=", date_end),
+            ],
+            order="date_start",
+        )
+
+        partner = self.env["res.partner"].create({"name": prefix, "is_company": True})
+        invoice_properties = self.env["project.invoicing.properties"].create(
+            {"name": prefix, "actual_time_spent": True, "actual_expenses": True}
+        )
+        project_records = (
+            self.env["project.project"]
+            .with_context(tracking_disable=True)
+            .create(
+                [
+                    {
+                        "name": "%s project %d" % (prefix, i),
+                        "partner_id": partner.id,
+                        "invoice_address": partner.id,
+                        "invoice_properties": invoice_properties.id,
+                        "chargeable": True,
+                        "allow_timesheets": True,
+                    }
+                    for i in range(projects)
+                ]
+            )
+        )
+        tasks = (
+            self.env["project.task"]
+            .with_context(tracking_disable=True)
+            .create(
+                [
+                    {"name": "%s task" % project.name, "project_id": project.id}
+                    for project in project_records
+                ]
+            )
+        )
+        users = (
+            self.env["res.users"]
+            .with_context(no_reset_password=True, tracking_disable=True)
+            .create(
+                [
+                    {
+                        "name": "%s employee %d" % (prefix, i),
+                        "login": "%s-%d" % (prefix, i),
+                        "groups_id": [
+                            (4, self.env.ref("base.group_user").id),
+                            (
+                                4,
+                                self.env.ref("hr_timesheet.group_hr_timesheet_user").id,
+                            ),
+                        ],
+                    }
+                    for i in range(employees)
+                ]
+            )
+        )
+        employee_records = self.env["hr.employee"].create(
+            [
+                {
+                    "name": user.name,
+                    "user_id": user.id,
+                    "official_date_of_employment": date_start - timedelta(days=365),
+                    # fewer than five lines a week can't fill every weekday
+                    "timesheet_no_8_hours_day": lines_per_week < 5,
+                }
+                for user in users
+            ]
+        )
+        product = self.env["product.product"].search(
+            [
+                (
+                    "categ_id",
+                    "=",
+                    self.env.ref("ps_timesheet_invoicing.product_category_fee_rate").id,
+                )
+            ],
+            limit=1,
+        ) or self.env["product.product"].create(
+            {
+                "name": prefix,
+                "type": "service",
+                "categ_id": self.env.ref(
+                    "ps_timesheet_invoicing.product_category_fee_rate"
+                ).id,
+            }
+        )
+        task_users = self._sql_insert(
+            "task.user",
+            [
+                {
+                    "task_id": task.id,
+                    "project_id": task.project_id.id,
+                    "user_id": user.id,
+                    "product_id": product.id,
+                    "fee_rate": rng.choice([80, 100, 120, 150]),
+                    "ic_fee_rate": 0,
+                    "from_date": date_start,
+                }
+                for user in users
+                for task in tasks
+            ],
+        )
+        sheets = self._sql_insert(
+            "hr_timesheet.sheet",
+            [
+                {
+                    "name": "%s %s" % (employee.name, week.name),
+                    "employee_id": employee.id,
+                    "user_id": employee.user_id.id,
+                    "week_id": week.id,
+                    "date_start": week.date_start,
+                    "date_end": week.date_end,
+                    "company_id": company.id,
+                    "state": "draft",
+                    "review_policy": company.timesheet_sheet_review_policy,
+                }
+                for employee in employee_records
+                for week in week_ranges
+            ],
+        )
+        uom_hour = self.env.ref("uom.product_uom_hour")
+        # spread 8 hours a weekday over the lines of that day, so the sheets
+        # pass the checks on approval without overtime
+        lines_per_day = [len(range(day, lines_per_week, 5)) for day in range(5)]
+        line_vals = []
+        for sheet in sheets:
+            for i in range(lines_per_week):
+                task = tasks[rng.randrange(len(tasks))]
+                line_date = sheet.week_id.date_start + timedelta(days=i % 5)
+                line_vals.append(
+                    {
+                        "name": "%s %s" % (prefix, line_date),
+                        "date": line_date,
+                        "unit_amount": 8.0 / lines_per_day[i % 5],
+                        "amount": 0,
+                        "user_id": sheet.user_id.id,
+                        "employee_id": sheet.employee_id.id,
+                        "project_id": task.project_id.id,
+                        "task_id": task.id,
+                        "account_id": task.project_id.analytic_account_id.id,
+                        "company_id": company.id,
+                        "product_uom_id": uom_hour.id,
+                        "sheet_id": sheet.id,
+                        "state": "draft",
+                    }
+                )
+        time_lines = self._sql_insert("ps.time.line", line_vals)
+        return {
+            "projects": project_records,
+            "tasks": tasks,
+            "employees": employee_records,
+            "task_users": task_users,
+            "sheets": sheets,
+            "time_lines": time_lines,
+        }
+
+    @api.model
+    def _measure(self, results, name, function, *args):
+        """
+        Run function in a savepoint and store its wall clock time, query count,
+        the figures of the instrumented entry points it called and error if any
+        in results under name, return its result
+        """
+        cr = self.env.cr
+        self.env["base"].flush()
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        result = None
+        error = None
+        collected = []
+        try:
+            with cr.savepoint(), collect_instrumentation() as collected:
+                result = function(*args)
+                self.env["base"].flush()
+        except Exception as e:
+            _logger.exception("Benchmark scenario %s failed", name)
+            error = str(e)
+        results[name] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "queries": cr.sql_log_count - queries,
+            "entry_points": self._summarize_instrumentation(collected),
+        }
+        if error:
+            results[name]["error"] = error
+        return result
+
+    @api.model
+    def _summarize_instrumentation(self, collected):
+        """Sum up measurements of instrumented entry points per name"""
+        summary = {}
+        for stats in collected:
+            entry_point = summary.setdefault(
+                stats["name"],
+                {
+                    "calls": 0,
+                    "records": 0,
+                    "queries": 0,
+                    "sql_seconds": 0,
+                    "python_seconds": 0,
+                },
+            )
+            entry_point["calls"] += 1
+            for key in ("records", "queries", "sql_seconds", "python_seconds"):
+                entry_point[key] += stats[key]
+        for entry_point in summary.values():
+            entry_point["sql_seconds"] = round(entry_point["sql_seconds"], 3)
+            entry_point["python_seconds"] = round(entry_point["python_seconds"], 3)
+        return summary
+
+    @api.model
+    def _scenario_approve_timesheets(self, sheets):
+        for sheet in sheets:
+            sheet.action_timesheet_confirm()
+        for sheet in sheets:
+            sheet.action_timesheet_done()
+
+    @api.model
+    def _scenario_prepare_ps_invoice(self, time_lines):
+        self.env["time.line.status"].with_context(
+            active_id=time_lines[:1].id,
+            active_ids=time_lines.ids,
+            active_model=time_lines._name,
+        ).create({"name": "invoiceable"}).ps_invoice_lines()
+        return self.env["ps.invoice"].search(
+            [("user_total_ids.detail_ids", "in", time_lines.ids)]
+        )
+
+    @api.model
+    def _scenario_compute_objects(self, ps_invoices):
+        ps_invoices.invalidate_cache()
+        ps_invoices._compute_objects()
+
+    @api.model
+    def _scenario_wip_posting(self, time_lines):
+        # what ps_invoice_lines does for delayed WIP lines, but running the job
+        # synchronously
+        self.env["base"].flush()
+        self.env.cr.execute(
+            "UPDATE ps_time_line SET state='delayed' WHERE id IN %s",
+            (tuple(time_lines.ids),),
+        )
+        self.env.cache.invalidate()
+        self.env["time.line.status"].create(
+            {"name": "delayed", "wip": True}
+        ).prepare_account_move(
+            time_lines.ids, {line.id: line.state for line in time_lines}
+        )
+
+    @api.model
+    def _scenario_refresh_reports(self):
+        for model_name in BENCHMARK_REFRESH_MODELS:
+            if model_name in self.env:
+                self.env[model_name]._refresh()
+
+    @api.model
+    def _scenario_open_report(self, model_name):
+        Model = self.env[model_name]
+        view = Model.fields_view_get(view_type="tree")
+        Model.fields_view_get(view_type="search")
+        Model.search_read([], list(view["fields"]), limit=80)
+        Model.search_count([])
+
+    @api.model
+    def _run_benchmark(self, **params):
+        """
+        Generate data with params and time the invoicing pipeline on it, return
+        a dict with the parameters and per scenario its timing and query count.
+        Everything runs in a savepoint that is rolled back afterwards
+        """
+        result = {}
+        try:
+            with self.env.cr.savepoint():
+                result = self._run_benchmark_scenarios(**params)
+                raise BenchmarkRollback()
+        except BenchmarkRollback:
+            pass
+        return result
+
+    @api.model
+    def _run_benchmark_scenarios(self, **params):
+        """Generate data with params and measure all scenarios on it"""
+        results = {}
+        data = self._measure(
+            results, "generate_data", lambda: self._generate_data(**params)
+        )
+        if data is None:
+            return {"params": params, "records": {}, "scenarios": results}
+        time_lines = data["time_lines"]
+        self._measure(
+            results,
+            "approve_timesheets",
+            self._scenario_approve_timesheets,
+            data["sheets"],
+        )
+        invoice_lines = time_lines.filtered(lambda x: x.id % 2 == 0)
+        ps_invoices = (
+            self._measure(
+                results,
+                "prepare_ps_invoice",
+                self._scenario_prepare_ps_invoice,
+                invoice_lines,
+            )
+            or self.env["ps.invoice"]
+        )
+        self._measure(
+            results, "compute_objects", self._scenario_compute_objects, ps_invoices
+        )
+        self._measure(results, "generate_invoice", ps_invoices.generate_invoice)
+        self._measure(
+            results,
+            "wip_posting",
+            self._scenario_wip_posting,
+            time_lines - invoice_lines,
+        )
+        self._measure(results, "refresh_reports", self._scenario_refresh_reports)
+        for model_name in BENCHMARK_REPORT_MODELS:
+            if model_name in self.env:
+                self._measure(
+                    results,
+                    "open_report %s" % model_name,
+                    self._scenario_open_report,
+                    model_name,
+                )
+        return {
+            "params": params,
+            "records": {name: len(records) for name, records in data.items()},
+            "scenarios": results,
+        }
+
+    @api.model
+    def _dump(self, result, path):
+        """Write result of _run_benchmark as JSON to path"""
+        with open(path, "w") as output:
+            json.dump(result, output, indent=2, sort_keys=True)
@@ -0,0 +1 @@
+from . import test_ps_benchmark
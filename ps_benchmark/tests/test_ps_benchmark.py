@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+class TestPsBenchmark(TransactionCase):
+    def test_generate_data(self):
+        data = self.env["ps.benchmark"]._generate_data(
+            employees=2, projects=2, weeks=2, lines_per_week=3
+        )
+        self.assertEqual(len(data["task_users"]), 4)
+        self.assertEqual(len(data["sheets"]), 4)
+        self.assertEqual(len(data["time_lines"]), 12)
+        self.assertTrue(all(data["sheets"].mapped("week_id")))
+        self.assertEqual(
+            data["time_lines"].mapped("sheet_id.employee_id"), data["employees"]
+        )
+
+    def test_run_benchmark(self):
+        result = self.env["ps.benchmark"]._run_benchmark(
+            employees=1, projects=1, weeks=1, lines_per_week=2
+        )
+        self.assertEqual(result["records"]["time_lines"], 2)
+        self.assertIn("generate_invoice", result["scenarios"])
+        for name, scenario in result["scenarios"].items():
+            self.assertNotIn("error", scenario, name)
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            self.env["ps.benchmark"]._dump(result, output.name)
+            self.assertEqual(json.load(output), json.loads(json.dumps(result)))
+
+    def test_run_benchmark_rollback(self):
+        params = dict(employees=1, projects=1, weeks=1, lines_per_week=1)
+        for _i in range(2):
+            result = self.env["ps.benchmark"]._run_benchmark(**params)
+            self.assertNotIn("error", result["scenarios"]["generate_data"])
+        self.assertFalse(
+            self.env["res.partner"].search([("name", "=like", "benchmark-%")])
+        )
+
+
+@tagged("-standard", "ps_benchmark")
+class TestPsBenchmarkRun(TransactionCase):
+    def test_benchmark(self):
+        employees, projects, weeks, lines_per_week = map(
+            int, os.environ.get("PS_BENCHMARK_SCALE", "10,5,4,5").split(",")
+        )
+        result = self.env["ps.benchmark"]._run_benchmark(
+            employees=employees,
+            projects=projects,
+            weeks=weeks,
+            lines_per_week=lines_per_week,
+        )
+        for name, scenario in result["scenarios"].items():
+            self.assertNotIn("error", scenario, name)
+        if os.environ.get("PS_BENCHMARK_OUTPUT"):
+            self.env["ps.benchmark"]._dump(result, os.environ["PS_BENCHMARK_OUTPUT"])
@@ -25,6 +25,7 @@
     "data": [
         "security/crm_security.xml",
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/crm_lead_views.xml",
         "views/hr_department.xml",
     ],
@@ -3,3 +3,4 @@ from . import crm_monthly_revenue
 from . import crm_revenue_split
 from . import crm_stage
 from . import hr_department
+from . import hr_employee
@@ -6,9 +6,33 @@ from datetime import datetime, timedelta
 
 from dateutil.relativedelta import relativedelta
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+OPERATING_UNIT_COLOURS = {
+    "Magnus Blue B.V.": "blue",
+    "Magnus Red B.V.": "red",
+    "Magnus Green B.V.": "green",
+    "Magnus Black B.V.": "black",
+}
+REVENUE_SPLIT_COLOURS = ("blue", "red", "green", "black")
+
+
+def _get_changed_vals(record, vals):
+    """Return the subset of vals that differs from the values of record"""
+    changed = {}
+    for name, value in vals.items():
+        field = record._fields[name]
+        current = record[name]
+        if field.type == "many2one":
+            current = current.id
+        if field.type == "float":
+            if tools.float_compare(current, value or 0.0, precision_digits=2):
+                changed[name] = value
+        elif current != value:
+            changed[name] = value
+    return changed
+
 
 class Lead(models.Model):
     _inherit = "crm.lead"
@@ -23,39 +47,16 @@ class Lead(models.Model):
     @api.depends("operating_unit_id")
     def _compute_dept_ou_domain(self):
         """
-        Compute the domain for the department domain.
+        Compute the domain for the department domain: departments whose root
+        department has the operating unit of the lead
         """
-        department_ids = []
-        if self.operating_unit_id:
-            self.env.cr.execute(
-                """
-                            SELECT id
-                            FROM hr_department
-                            WHERE operating_unit_id = %s
-                            AND parent_id IS NULL
-                            """,
-                (self.operating_unit_id.id,),
+        for this in self:
+            this.dept_ou_domain = json.dumps(
+                [("root_operating_unit_id", "=", this.operating_unit_id.id)]
+                if this.operating_unit_id
+                else [("id", "in", [])]
             )
 
-            result = self.env.cr.fetchall()
-            for res in result:
-                department_id = res[0]
-                self.env.cr.execute(
-                    """
-                    WITH RECURSIVE
-                        subordinates AS(
-                            SELECT id, parent_id  FROM hr_department WHERE id = %s
-                            UNION
-                            SELECT h.id, h.parent_id FROM hr_department h
-                            INNER JOIN subordinates s ON s.id = h.parent_id)
-                        SELECT  *  FROM subordinates""",
-                    (department_id,),
-                )
-                result2 = self.env.cr.fetchall()
-                for res2 in result2:
-                    department_ids.append(res2[0])
-        self.dept_ou_domain = json.dumps([("id", "in", department_ids)])
-
     start_date = fields.Date("Start Date")
     end_date = fields.Date("End Date")
     project_id = fields.Many2one("project.project", string="Project")
@@ -99,30 +100,34 @@ class Lead(models.Model):
                 self.env.user.notify_info(message=text, sticky=True)
         return res
 
+    def _get_revenue_split_colour(self):
+        """Return the revenue split colour of the operating unit of the lead"""
+        self.ensure_one()
+        return OPERATING_UNIT_COLOURS.get(self.operating_unit_id.name)
+
+    def _get_revenue_split_colour_vals(self, total_revenue, percentages=None):
+        """
+        Return revenue split percentages and amounts per colour for
+        total_revenue. Without percentages per colour, everything goes to the
+        colour of the operating unit of the lead
+        """
+        if percentages is None:
+            colour = self._get_revenue_split_colour()
+            percentages = {
+                split_colour: 100 if split_colour == colour else 0.0
+                for split_colour in REVENUE_SPLIT_COLOURS
+            }
+        vals = {}
+        for colour in REVENUE_SPLIT_COLOURS:
+            vals["ps_%s_bv_per" % colour] = percentages[colour]
+            vals["ps_%s_bv_amount" % colour] = total_revenue * percentages[colour] / 100
+        return vals
+
     @api.depends("operating_unit_id")
     @api.onchange("operating_unit_id")
     def onchange_operating_unit_id(self):
         for rec in self.revenue_split_ids:
-            rec.ps_blue_bv_per = 0.0
-            rec.ps_blue_bv_amount = 0.0
-            rec.ps_red_bv_amount = 0.0
-            rec.ps_red_bv_per = 0.0
-            rec.ps_green_bv_per = 0.0
-            rec.ps_green_bv_amount = 0.0
-            rec.ps_black_bv_per = 0.0
-            rec.ps_black_bv_amount = 0.0
-            if self.operating_unit_id.name == "Magnus Blue B.V.":
-                rec.ps_blue_bv_per = 100
-                rec.ps_blue_bv_amount = rec.total_revenue
-            if self.operating_unit_id.name == "Magnus Red B.V.":
-                rec.ps_red_bv_amount = rec.total_revenue
-                rec.ps_red_bv_per = 100
-            if self.operating_unit_id.name == "Magnus Green B.V.":
-                rec.ps_green_bv_per = 100
-                rec.ps_green_bv_amount = rec.total_revenue
-            if self.operating_unit_id.name == "Magnus Black B.V.":
-                rec.ps_black_bv_per = 100
-                rec.ps_black_bv_amount = rec.total_revenue
+            rec.update(self._get_revenue_split_colour_vals(rec.total_revenue))
 
     @api.model
     def default_get(self, fields):
@@ -226,44 +231,18 @@ class Lead(models.Model):
                     )
                 )
 
-                blue_per = 0.0
-                red_per = 0.0
-                green_per = 0.0
-                black_per = 0.0
-                ps_blue_bv_amount = 0.0
-                ps_red_bv_amount = 0.0
-                ps_green_bv_amount = 0.0
-                ps_black_bv_amount = 0.0
-                if self.operating_unit_id.name == "Magnus Blue B.V.":
-                    blue_per = 100
-                    ps_blue_bv_amount = expected_revenue_per_month
-                if self.operating_unit_id.name == "Magnus Red B.V.":
-                    red_per = 100
-                    ps_red_bv_amount = expected_revenue_per_month
-                if self.operating_unit_id.name == "Magnus Green B.V.":
-                    green_per = 100
-                    ps_green_bv_amount = expected_revenue_per_month
-                if self.operating_unit_id.name == "Magnus Black B.V.":
-                    black_per = 100
-                    ps_black_bv_amount = expected_revenue_per_month
-
                 monthly_revenues_split.append(
                     (
                         0,
                         0,
-                        {
-                            "month": month.id,
-                            "total_revenue": expected_revenue_per_month,
-                            "total_revenue_per": 100,
-                            "ps_blue_bv_per": blue_per,
-                            "ps_red_bv_per": red_per,
-                            "ps_black_bv_per": black_per,
-                            "ps_green_bv_per": green_per,
-                            "ps_blue_bv_amount": ps_blue_bv_amount,
-                            "ps_red_bv_amount": ps_red_bv_amount,
-                            "ps_green_bv_amount": ps_green_bv_amount,
-                            "ps_black_bv_amount": ps_black_bv_amount,
-                        },
+                        dict(
+                            self._get_revenue_split_colour_vals(
+                                expected_revenue_per_month
+                            ),
+                            month=month.id,
+                            total_revenue=expected_revenue_per_month,
+                            total_revenue_per=100,
+                        ),
                     )
                 )
                 sd = month_end_date + timedelta(days=1)
@@ -277,6 +256,201 @@ class Lead(models.Model):
             self.monthly_revenue_ids = monthly_revenues + manual_lines
             self.revenue_split_ids = monthly_revenues_split
 
+    def _get_revenue_schedule(self):
+        """
+        Return a dict lead id -> list of dicts with the monthly periods of the
+        leads in self, their fiscal month and year and their prorated expected
+        and weighted revenue. Periods, ranges and proration come from one query
+        """
+        if not self:
+            return {}
+        self.flush(
+            ["start_date", "end_date", "company_id", "prorated_revenue", "probability"]
+        )
+        self.env["date.range"].flush(
+            ["type_id", "date_start", "date_end", "company_id"]
+        )
+        self.env.cr.execute(
+            """
+            WITH periods AS (
+                SELECT
+                    cl.id AS lead_id,
+                    coalesce(cl.company_id, %(company_id)s) AS company_id,
+                    greatest(month_start::date, cl.start_date) AS date_start,
+                    least(
+                        (month_start + interval '1 month - 1 day')::date,
+                        cl.end_date
+                    ) AS date_end,
+                    cl.end_date - cl.start_date + 1 AS total_days,
+                    coalesce(cl.prorated_revenue, 0)::float AS prorated_revenue,
+                    coalesce(cl.probability, 0)::float AS probability
+                FROM crm_lead cl
+                CROSS JOIN LATERAL generate_series(
+                    date_trunc('month', cl.start_date), cl.end_date, '1 month'
+                ) month_start
+                WHERE cl.id IN %(lead_ids)s AND cl.start_date <= cl.end_date
+            )
+            SELECT
+                periods.lead_id,
+                periods.date_start,
+                periods.date_end,
+                month.id,
+                year.id,
+                periods.date_end - periods.date_start + 1,
+                periods.prorated_revenue
+                * (periods.date_end - periods.date_start + 1)
+                / periods.total_days,
+                periods.prorated_revenue
+                * (periods.date_end - periods.date_start + 1)
+                / periods.total_days
+                * periods.probability / 100,
+                periods.probability
+            FROM periods
+            LEFT JOIN LATERAL (
+                SELECT dr.id
+                FROM date_range dr
+                JOIN date_range_type drt ON drt.id = dr.type_id
+                WHERE drt.fiscal_month
+                AND dr.company_id = periods.company_id
+                AND periods.date_end BETWEEN dr.date_start AND dr.date_end
+                ORDER BY dr.id
+                LIMIT 1
+            ) month ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT dr.id
+                FROM date_range dr
+                JOIN date_range_type drt ON drt.id = dr.type_id
+                WHERE drt.fiscal_year
+                AND dr.company_id = periods.company_id
+                AND periods.date_end BETWEEN dr.date_start AND dr.date_end
+                ORDER BY dr.id
+                LIMIT 1
+            ) year ON TRUE
+            ORDER BY periods.lead_id, periods.date_start
+            """,
+            {"company_id": self.env.company.id, "lead_ids": tuple(self.ids)},
+        )
+        result = {}
+        for (
+            lead_id,
+            date_start,
+            date_end,
+            month_id,
+            year_id,
+            days,
+            expected_revenue,
+            weighted_revenue,
+            probability,
+        ) in self.env.cr.fetchall():
+            result.setdefault(lead_id, []).append(
+                {
+                    "date": date_end,
+                    "latest_revenue_date": date_end.replace(day=1) - timedelta(days=1),
+                    "year": year_id or False,
+                    "month": month_id or False,
+                    "no_of_days": "%d %s (%d-%d %s)"
+                    % (
+                        days,
+                        "days" if days > 1 else "day",
+                        date_start.day,
+                        date_end.day,
+                        date_start.strftime("%B"),
+                    ),
+                    "weighted_revenue": weighted_revenue,
+                    "expected_revenue": expected_revenue,
+                    "percentage": probability,
+                }
+            )
+        return result
+
+    def _update_revenue_schedule(self):
+        """
+        Regenerate the computed monthly revenue and the revenue split of the leads
+        in self with a start and end date. Only rows that changed are written,
+        rows for periods that disappeared are removed, and split percentages
+        are kept
+        """
+        MonthlyRevenue = self.env["crm.monthly.revenue"]
+        RevenueSplit = self.env["crm.revenue.split"]
+        leads = self.filtered(lambda x: x.start_date and x.end_date)
+        schedule = leads._get_revenue_schedule()
+        existing_revenue = MonthlyRevenue.search(
+            [("lead_id", "in", leads.ids), ("computed_line", "=", True)],
+            order="date",
+        )
+        existing_split = RevenueSplit.search([("lead_id", "in", leads.ids)])
+        revenue_by_key = {}
+        for revenue in existing_revenue:
+            revenue_by_key.setdefault((revenue.lead_id.id, revenue.date), []).append(
+                revenue
+            )
+        split_by_key = {}
+        for split in existing_split:
+            split_by_key.setdefault((split.lead_id.id, split.month.id), []).append(
+                split
+            )
+        keep_revenue = MonthlyRevenue
+        keep_split = RevenueSplit
+        revenue_vals_list = []
+        split_vals_list = []
+        for lead in leads:
+            for vals in schedule.get(lead.id, []):
+                revenue = revenue_by_key.get((lead.id, vals["date"]))
+                if revenue:
+                    revenue = revenue.pop(0)
+                    keep_revenue += revenue
+                    changed = _get_changed_vals(revenue, vals)
+                    if changed:
+                        revenue.write(changed)
+                else:
+                    revenue_vals_list.append(
+                        dict(vals, lead_id=lead.id, computed_line=True)
+                    )
+                split_vals = {
+                    "month": vals["month"],
+                    "total_revenue": vals["expected_revenue"],
+                    "total_revenue_per": 100,
+                }
+                split = split_by_key.get((lead.id, vals["month"]))
+                if split:
+                    split = split.pop(0)
+                    keep_split += split
+                    percentages = {
+                        colour: split["ps_%s_bv_per" % colour]
+                        for colour in REVENUE_SPLIT_COLOURS
+                    }
+                    split_vals.update(
+                        lead._get_revenue_split_colour_vals(
+                            vals["expected_revenue"],
+                            percentages if any(percentages.values()) else None,
+                        )
+                    )
+                    changed = _get_changed_vals(split, split_vals)
+                    if changed:
+                        split.write(changed)
+                else:
+                    split_vals.update(
+                        lead._get_revenue_split_colour_vals(vals["expected_revenue"]),
+                        lead_id=lead.id,
+                    )
+                    split_vals_list.append(split_vals)
+        (existing_revenue - keep_revenue).unlink()
+        (existing_split - keep_split).unlink()
+        MonthlyRevenue.create(revenue_vals_list)
+        RevenueSplit.create(split_vals_list)
+
+    @api.model
+    def _cron_update_revenue_schedule(self):
+        """Regenerate the revenue schedule of all open opportunities"""
+        self.search(
+            [
+                ("type", "=", "opportunity"),
+                ("start_date", "!=", False),
+                ("end_date", "!=", False),
+                ("stage_id.is_won", "=", False),
+            ]
+        )._update_revenue_schedule()
+
     def recalculate_total(self):
         self.ensure_one()
         if round(sum(self.monthly_revenue_ids.mapped("expected_revenue")), 2) != round(
@@ -2,7 +2,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
 
@@ -58,6 +58,14 @@ class CRMRevenueSplit(models.Model):
         oldname="mangnus_black_bv_per", string="Magnus Black B.V. %"
     )
 
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "crm_revenue_split_project_month_index",
+            self._table,
+            ["project_id", "month"],
+        )
+
     @api.constrains(
         "ps_blue_bv_per", "ps_red_bv_per", "ps_green_bv_per", "ps_black_bv_per"
     )
@@ -1,7 +1,7 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class HrDepartment(models.Model):
@@ -13,3 +13,24 @@ class HrDepartment(models.Model):
         tracking=True,
     )
     no_ott_check = fields.Boolean("8 Hours OTT possible", help="No Overtime Check")
+    root_department_id = fields.Many2one(
+        "hr.department",
+        string="Root Department",
+        compute="_compute_root_department_id",
+        store=True,
+        index=True,
+    )
+    root_operating_unit_id = fields.Many2one(
+        "operating.unit",
+        string="Root Operating Unit",
+        related="root_department_id.operating_unit_id",
+        store=True,
+        index=True,
+    )
+
+    @api.depends("parent_id.root_department_id")
+    def _compute_root_department_id(self):
+        for department in self:
+            department.root_department_id = (
+                department.parent_id.root_department_id or department
+            )
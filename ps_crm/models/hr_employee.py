@@ -0,0 +1,16 @@
+# Copyright 2018 The Open Source Company ((www.tosc.nl).)
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import fields, models
+
+
+class HrEmployee(models.Model):
+    _inherit = "hr.employee"
+
+    root_operating_unit_id = fields.Many2one(
+        "operating.unit",
+        string="Root Operating Unit",
+        related="department_id.root_operating_unit_id",
+        store=True,
+        index=True,
+    )
@@ -1,3 +1,6 @@
+import json
+from datetime import date
+
 from odoo.tests.common import Form, TransactionCase
 
 
@@ -19,3 +22,59 @@ class TestPsCrm(TransactionCase):
             self.assertFalse(lead_form.partner_contact_id)
             self.assertFalse(lead_form.contact_name)
             lead_form.operating_unit_id = operating_unit
+
+    def test_revenue_schedule(self):
+        self.lead.write(
+            {
+                "start_date": date(2024, 1, 15),
+                "end_date": date(2024, 3, 14),
+                "expected_revenue": 6000,
+                "probability": 50,
+            }
+        )
+        self.lead._update_revenue_schedule()
+        revenue = self.lead.monthly_revenue_ids.filtered("computed_line").sorted("date")
+        self.assertEqual(
+            revenue.mapped("date"),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 14)],
+        )
+        self.assertAlmostEqual(
+            sum(revenue.mapped("expected_revenue")), self.lead.prorated_revenue
+        )
+        self.assertEqual(revenue[0].no_of_days, "17 days (15-31 January)")
+        self.assertEqual(len(self.lead.revenue_split_ids), 3)
+
+        first_month = revenue[0]
+        self.lead.probability = 20
+        self.lead.end_date = date(2024, 2, 29)
+        self.lead._update_revenue_schedule()
+        revenue = self.lead.monthly_revenue_ids.filtered("computed_line").sorted("date")
+        self.assertEqual(len(revenue), 2)
+        self.assertEqual(revenue[0], first_month)
+        self.assertEqual(first_month.percentage, 20)
+        self.assertAlmostEqual(
+            sum(revenue.mapped("weighted_revenue")), self.lead.prorated_revenue * 0.2
+        )
+
+    def test_department_root(self):
+        operating_unit = self.env.ref("operating_unit.main_operating_unit")
+        root = self.env["hr.department"].create(
+            {"name": "Root", "operating_unit_id": operating_unit.id}
+        )
+        child = self.env["hr.department"].create(
+            {"name": "Child", "parent_id": root.id}
+        )
+        grandchild = self.env["hr.department"].create(
+            {"name": "Grandchild", "parent_id": child.id}
+        )
+        self.assertEqual(grandchild.root_department_id, root)
+        self.assertEqual(grandchild.root_operating_unit_id, operating_unit)
+        self.lead.operating_unit_id = operating_unit
+        self.assertIn(
+            grandchild,
+            self.env["hr.department"].search(json.loads(self.lead.dept_ou_domain)),
+        )
+        new_root = self.env["hr.department"].create({"name": "New root"})
+        child.parent_id = new_root
+        self.assertEqual(grandchild.root_department_id, new_root)
+        self.assertFalse(grandchild.root_operating_unit_id)
@@ -43,9 +43,13 @@ class MaintenanceEquipment(models.Model):
 
     @api.depends("purchase_date", "warranty_category.warranty_duration")
     def _compute_warranty_date(self):
-        purchase_date = self.purchase_date
-        month = purchase_date.month - 1 + self.warranty_category.warranty_duration
-        year = purchase_date.year + month // 12
-        month = month % 12 + 1
-        day = min(purchase_date.day, calendar.monthrange(year, month)[1])
-        self.warranty_date = date(year, month, day)
+        for this in self:
+            purchase_date = this.purchase_date
+            if not purchase_date:
+                this.warranty_date = False
+                continue
+            month = purchase_date.month - 1 + this.warranty_category.warranty_duration
+            year = purchase_date.year + month // 12
+            month = month % 12 + 1
+            day = min(purchase_date.day, calendar.monthrange(year, month)[1])
+            this.warranty_date = date(year, month, day)
@@ -1,7 +1,7 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class AccountMoveLine(models.Model):
@@ -11,14 +11,21 @@ class AccountMoveLine(models.Model):
 
     def _prepare_analytic_line(self):
         result = super()._prepare_analytic_line()
+        partner2user = {}
+        if self.env.context.get("ps_expense_set_partner_uid"):
+            partner2user = self._get_partner_user_map(self.mapped("partner_id"))
         for this, vals in zip(self, result):
             if this.partner_id and self.env.context.get("ps_expense_set_partner_uid"):
-                user = (
-                    self.env["res.users"].search(
-                        [("partner_id", "=", this.partner_id.id)], limit=1
-                    )
-                    or self.env.user
-                )
-                vals["user_id"] = user.id
+                vals["user_id"] = partner2user.get(this.partner_id.id, self.env.uid)
             vals["customer_charge_expense"] = this.customer_charge_expense
         return result
+
+    @api.model
+    def _get_partner_user_map(self, partners):
+        """Return a dict partner id -> id of the first user of the partner"""
+        partner2user = {}
+        if not partners:
+            return partner2user
+        for user in self.env["res.users"].search([("partner_id", "in", partners.ids)]):
+            partner2user.setdefault(user.partner_id.id, user.id)
+        return partner2user
@@ -43,14 +43,11 @@ class HrExpense(models.Model):
 
     def _get_account_move_line_values(self):
         result = super()._get_account_move_line_values()
+        expense2charge = {this.id: this.customer_charge_expense for this in self}
         for this_id, move_line_vals in result.items():
             for vals in move_line_vals:
                 if vals.get("analytic_account_id"):
-                    vals.update(
-                        customer_charge_expense=self.browse(
-                            this_id
-                        ).customer_charge_expense
-                    )
+                    vals.update(customer_charge_expense=expense2charge[this_id])
         return result
 
     def write(self, vals):
@@ -22,3 +22,10 @@ class TestPsExpense(TransactionCase):
         self.assertEqual(
             expense_sheet.account_move_id.operating_unit_id, expense.operating_unit_id
         )
+        demo_user = self.env.ref("base.user_demo")
+        self.assertEqual(
+            self.env["account.move.line"]._get_partner_user_map(
+                demo_user.partner_id + self.env.ref("base.res_partner_1")
+            ),
+            {demo_user.partner_id.id: demo_user.id},
+        )
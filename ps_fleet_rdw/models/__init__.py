@@ -1,2 +1,3 @@
 from . import fleet_vehicle
 from . import rdw_api
+from . import vehicle_rdw_cache
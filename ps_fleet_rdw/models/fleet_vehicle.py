@@ -1,7 +1,5 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-import re
-
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
@@ -17,36 +15,97 @@ class FleetVehicle(models.Model):
 
     def fetch_data_from_rdw(self):
         """
-        This function creates an vehicle_from_rdw object, and then uses a function from
-        this object to fetch the RDW data.
+        Fetch the RDW data of the vehicles, raise if a vehicle is unknown to RDW
+        or has no matching model
         """
-        rdw_data = self.env["vehicle.from.rdw"].create(
-            {"license_plate": re.sub("-", "", self.license_plate)}
+        self._refresh_from_rdw(raise_if_missing=True)
+
+    def action_refresh_rdw_data(self):
+        """Fetch the RDW data of many vehicles, skipping the ones that fail"""
+        self._refresh_from_rdw()
+
+    def _get_rdw_license_plate(self):
+        return self.env["vehicle.from.rdw"]._normalize_license_plate(self.license_plate)
+
+    def _refresh_from_rdw(self, raise_if_missing=False, transport=None):
+        vehicles = self.filtered("license_plate")
+        data_by_plate = self.env["vehicle.from.rdw"]._fetch_rdw_data_bulk(
+            [vehicle._get_rdw_license_plate() for vehicle in vehicles],
+            transport=transport,
         )
-        rdw_data_dict = rdw_data.fetch_rdw_data()
-        model_id = self.fetch_model_id(rdw_data_dict["brand"], rdw_data_dict["type"])
-        if not model_id:
-            raise UserError(
-                _(
-                    "Please first create a vehicle model with brand %s and model %s"
-                    % (rdw_data_dict["brand"], rdw_data_dict["type"])
-                )
+        model_map = self._get_rdw_model_map()
+        for vehicle in vehicles:
+            rdw_data_dict = data_by_plate.get(vehicle._get_rdw_license_plate())
+            if not rdw_data_dict:
+                if raise_if_missing:
+                    raise UserError(
+                        _(
+                            "Car is not present in RDW Open Data database, please "
+                            "fill details manually."
+                        )
+                    )
+                continue
+            model_id = self._match_rdw_model(
+                model_map, rdw_data_dict["brand"], rdw_data_dict["type"]
             )
-        self.update(
-            {
-                "color": rdw_data_dict["color"],
-                "seats": rdw_data_dict["seats"],
-                "doors": rdw_data_dict["doors"],
-                "rdw_brand": (rdw_data_dict["brand"] or "").capitalize(),
-                "rdw_handelsnaam": (rdw_data_dict["type"] or "").capitalize(),
-                "co2": rdw_data_dict["co2"],
-                "car_value": rdw_data_dict["fiscal_value"],
-                "fuel_type": self.fetch_fuel_type(rdw_data_dict["fuel_type"]),
-                "model_id": model_id,
-                "power": int(float(rdw_data_dict["power"] or 0)),
-                "horsepower": int(1.362 * float(rdw_data_dict["power"] or 0)),
-            }
-        )
+            if not model_id:
+                if raise_if_missing:
+                    raise UserError(
+                        _(
+                            "Please first create a vehicle model with brand %s and "
+                            "model %s"
+                        )
+                        % (rdw_data_dict["brand"], rdw_data_dict["type"])
+                    )
+                continue
+            vehicle.update(vehicle._prepare_rdw_vals(rdw_data_dict, model_id))
+
+    def _prepare_rdw_vals(self, rdw_data_dict, model_id):
+        return {
+            "color": rdw_data_dict["color"],
+            "seats": rdw_data_dict["seats"],
+            "doors": rdw_data_dict["doors"],
+            "rdw_brand": (rdw_data_dict["brand"] or "").capitalize(),
+            "rdw_handelsnaam": (rdw_data_dict["type"] or "").capitalize(),
+            "co2": rdw_data_dict["co2"],
+            "car_value": rdw_data_dict["fiscal_value"],
+            "fuel_type": self.fetch_fuel_type(rdw_data_dict["fuel_type"]),
+            "model_id": model_id,
+            "power": int(float(rdw_data_dict["power"] or 0)),
+            "horsepower": int(1.362 * float(rdw_data_dict["power"] or 0)),
+        }
+
+    @api.model
+    def _get_rdw_model_map(self):
+        """
+        Return a list of (lowercase brand name, [(lowercase model name, model
+        id)]) for all vehicle models, loaded in one search
+        """
+        brands = {}
+        for brand in self.env["fleet.vehicle.model.brand"].search([]):
+            brands[brand.id] = ((brand.name or "").lower(), [])
+        for model in self.env["fleet.vehicle.model"].search([]):
+            if model.brand_id.id in brands:
+                brands[model.brand_id.id][1].append(
+                    ((model.name or "").lower(), model.id)
+                )
+        return list(brands.values())
+
+    @api.model
+    def _match_rdw_model(self, model_map, rdw_brand_name, rdw_model):
+        """
+        Return the id of the model whose name contains rdw_model of the first
+        brand whose name contains rdw_brand_name
+        """
+        rdw_brand_name = (rdw_brand_name or "").lower()
+        rdw_model = (rdw_model or "").lower()
+        for brand_name, models_list in model_map:
+            if rdw_brand_name in brand_name:
+                for model_name, model_id in models_list:
+                    if rdw_model in model_name:
+                        return model_id
+                return False
+        return False
 
     def fetch_fuel_type(self, rdw_fuel_type):
         if rdw_fuel_type == "Benzine":
@@ -58,20 +117,6 @@ class FleetVehicle(models.Model):
         else:
             return None
 
-    def fetch_model_id(self, rdw_brand_name, rdw_model):
-        brand_id = (
-            self.env["fleet.vehicle.model.brand"]
-            .search([("name", "ilike", rdw_brand_name)], limit=1)
-            .id
-        )
-        found_models = self.env["fleet.vehicle.model"].search(
-            ["&", ("brand_id", "=", brand_id), ("name", "ilike", rdw_model)], limit=1
-        )
-        if brand_id and found_models:
-            model_id = found_models.id
-            return model_id
-        return self.env["fleet.vehicle.model.brand"]
-
     @api.depends("model_id", "license_plate")
     def _compute_vehicle_name(self):
         for record in self:
@@ -1,8 +1,52 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 
-from odoo import _, fields, models
+from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
+_logger = logging.getLogger(__name__)
+
+RDW_BASE_URL = "https://opendata.rdw.nl"
+RDW_VEHICLE_PATH = "/resource/m9d7-ebf2.json"
+RDW_FUEL_PATH = "/resource/8ys7-d773.json"
+RDW_TIMEOUT = 10
+RDW_MAX_WORKERS = 8
+
+
+class RDWTransport(object):
+    """Fetch JSON from the RDW Open Data API over a pooled session"""
+
+    def __init__(self, base_url=RDW_BASE_URL, timeout=RDW_TIMEOUT, pool_size=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size or RDW_MAX_WORKERS
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_json(self, path, params):
+        response = self.session.get(
+            self.base_url + path, params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def fetch(self, license_plate):
+        """Return the vehicle and fuel rows for a license plate"""
+        return (
+            self.get_json(RDW_VEHICLE_PATH, {"kenteken": license_plate}),
+            self.get_json(RDW_FUEL_PATH, {"kenteken": license_plate}),
+        )
+
 
 class VehicleFromRDW(models.TransientModel):
     """
@@ -13,25 +57,27 @@ class VehicleFromRDW(models.TransientModel):
 
     license_plate = fields.Char()
 
-    def fetch_rdw_data(self):
-        rdw_data = requests.get(
-            "https://opendata.rdw.nl/resource/m9d7-ebf2.json?kenteken="
-            + self.license_plate
-        ).json()
-        rdw_data_brandstof = requests.get(
-            "https://opendata.rdw.nl/resource/8ys7-d773.json?Kenteken="
-            + self.license_plate
-        ).json()
+    @api.model
+    def _get_transport(self):
+        """Return the transport used to talk to RDW, override to inject another"""
+        get_param = self.env["ir.config_parameter"].sudo().get_param
+        return RDWTransport(
+            base_url=get_param("ps_fleet_rdw.base_url", RDW_BASE_URL),
+            timeout=float(get_param("ps_fleet_rdw.timeout", RDW_TIMEOUT)),
+        )
+
+    @api.model
+    def _normalize_license_plate(self, license_plate):
+        """Return a license plate the way RDW knows it, without dashes"""
+        return re.sub("-", "", license_plate or "").upper()
+
+    @api.model
+    def _parse_rdw_data(self, rdw_data, rdw_data_brandstof):
         if not rdw_data:
-            raise UserError(
-                _(
-                    "Car is not present in RDW Open Data database, please fill details "
-                    "manually."
-                )
-            )
+            return None
         rdw_data_dict = rdw_data[0]
-        rdw_data_brandstof_dict = rdw_data_brandstof[0]
-        data = {
+        rdw_data_brandstof_dict = rdw_data_brandstof[0] if rdw_data_brandstof else {}
+        return {
             "fiscal_value": rdw_data_dict.get("catalogusprijs"),
             "brand": rdw_data_dict.get("merk"),
             "type": rdw_data_dict.get("handelsbenaming"),
@@ -43,4 +89,55 @@ class VehicleFromRDW(models.TransientModel):
             "co2": rdw_data_brandstof_dict.get("co2_uitstoot_gecombineerd"),
             "power": rdw_data_brandstof_dict.get("nettomaximumvermogen"),
         }
+
+    @api.model
+    def _fetch_rdw_data_bulk(self, license_plates, transport=None):
+        """
+        Return a dict license plate -> RDW data, None for unknown plates. Cached
+        responses younger than the TTL are reused, the rest is fetched
+        concurrently. Plates that fail to fetch are left out. A transport
+        created here is closed afterwards, a passed one is left open
+        """
+        Cache = self.env["vehicle.rdw.cache"]
+        license_plates = list(set(license_plates))
+        result = Cache._get_cached(license_plates)
+        to_fetch = [plate for plate in license_plates if plate not in result]
+        if not to_fetch:
+            return result
+        own_transport = transport is None
+        transport = transport or self._get_transport()
+
+        def fetch(license_plate):
+            try:
+                return license_plate, transport.fetch(license_plate)
+            except (requests.RequestException, ValueError) as e:
+                _logger.warning("Fetching RDW data for %s failed: %s", license_plate, e)
+                return license_plate, None
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=min(RDW_MAX_WORKERS, len(to_fetch))
+            ) as executor:
+                fetched = {
+                    license_plate: self._parse_rdw_data(*response)
+                    for license_plate, response in executor.map(fetch, to_fetch)
+                    if response is not None
+                }
+        finally:
+            if own_transport:
+                transport.close()
+        Cache._set_cached(fetched)
+        result.update(fetched)
+        return result
+
+    def fetch_rdw_data(self):
+        license_plate = self._normalize_license_plate(self.license_plate)
+        data = self._fetch_rdw_data_bulk([license_plate]).get(license_plate)
+        if not data:
+            raise UserError(
+                _(
+                    "Car is not present in RDW Open Data database, please fill details "
+                    "manually."
+                )
+            )
         return data
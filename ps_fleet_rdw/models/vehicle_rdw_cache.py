@@ -0,0 +1,71 @@
+import json
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+RDW_CACHE_TTL_HOURS = 24
+
+
+class VehicleRDWCache(models.Model):
+    """Responses of the RDW Open Data API per license plate"""
+
+    _name = "vehicle.rdw.cache"
+    _description = "RDW data cache"
+    _log_access = False
+
+    license_plate = fields.Char(required=True, index=True)
+    data = fields.Text()
+    fetch_date = fields.Datetime(required=True)
+
+    _sql_constraints = [
+        ("license_plate_unique", "unique(license_plate)", "Duplicate license plate")
+    ]
+
+    @api.model
+    def _get_ttl(self):
+        return timedelta(
+            hours=float(
+                self.env["ir.config_parameter"]
+                .sudo()
+                .get_param("ps_fleet_rdw.cache_ttl_hours", RDW_CACHE_TTL_HOURS)
+            )
+        )
+
+    @api.model
+    def _get_cached(self, license_plates):
+        """Return a dict license plate -> data for fresh cache entries"""
+        if not license_plates:
+            return {}
+        self.env.cr.execute(
+            "SELECT license_plate, data FROM vehicle_rdw_cache "
+            "WHERE license_plate IN %s AND fetch_date >= %s",
+            (tuple(license_plates), fields.Datetime.now() - self._get_ttl()),
+        )
+        return {
+            license_plate: json.loads(data) if data else None
+            for license_plate, data in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _set_cached(self, data_by_plate):
+        """Store data per license plate, replacing older entries"""
+        if not data_by_plate:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO vehicle_rdw_cache (license_plate, data, fetch_date)
+            SELECT license_plate, data, %s
+            FROM unnest(%s::varchar[], %s::text[]) AS new(license_plate, data)
+            ON CONFLICT (license_plate) DO UPDATE
+            SET data = EXCLUDED.data, fetch_date = EXCLUDED.fetch_date
+            """,
+            (
+                fields.Datetime.now(),
+                list(data_by_plate),
+                [
+                    json.dumps(data) if data is not None else None
+                    for data in data_by_plate.values()
+                ],
+            ),
+        )
+        self.invalidate_cache()
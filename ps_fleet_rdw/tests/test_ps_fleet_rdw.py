@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class FakeTransport(object):
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.closed = False
+
+    def fetch(self, license_plate):
+        self.calls.append(license_plate)
+        return self.responses.get(license_plate, ([], []))
+
+    def close(self):
+        self.closed = True
+
+
+class TestPsFleetRdw(TransactionCase):
+    def test_refresh_from_rdw(self):
+        model = self.env.ref("fleet.model_astra")
+        transport = FakeTransport(
+            {
+                "AB123C": (
+                    [
+                        {
+                            "merk": model.brand_id.name.upper(),
+                            "handelsbenaming": model.name.upper(),
+                            "eerste_kleur": "GRIJS",
+                            "aantal_deuren": "4",
+                            "aantal_zitplaatsen": "5",
+                            "catalogusprijs": "30000",
+                        }
+                    ],
+                    [
+                        {
+                            "brandstof_omschrijving": "Benzine",
+                            "nettomaximumvermogen": "100",
+                        }
+                    ],
+                )
+            }
+        )
+        known, unknown = self.env["fleet.vehicle"].create(
+            [
+                {"name": "known", "license_plate": "AB-123-C"},
+                {"name": "unknown", "license_plate": "XX-999-X"},
+            ]
+        )
+        (known + unknown)._refresh_from_rdw(transport=transport)
+        self.assertEqual(known.model_id, model)
+        self.assertEqual(known.color, "GRIJS")
+        self.assertEqual(known.horsepower, 136)
+        self.assertFalse(unknown.rdw_brand)
+        self.assertEqual(sorted(transport.calls), ["AB123C", "XX999X"])
+        # both the known and the unknown plate are served from the cache now
+        (known + unknown)._refresh_from_rdw(transport=transport)
+        self.assertEqual(len(transport.calls), 2)
+
+    def test_fetch_rdw_data(self):
+        transport = FakeTransport(
+            {"AB123D": ([{"merk": "OPEL", "handelsbenaming": "ASTRA"}], [])}
+        )
+        wizard = self.env["vehicle.from.rdw"].create({"license_plate": "ab-123-d"})
+        with patch.object(type(wizard), "_get_transport", lambda self: transport):
+            data = wizard.fetch_rdw_data()
+        self.assertEqual(data["brand"], "OPEL")
+        self.assertEqual(transport.calls, ["AB123D"])
+        # transports created for the call are closed afterwards
+        self.assertTrue(transport.closed)
@@ -1,7 +1,7 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
 from odoo import _, models
 from odoo.exceptions import ValidationError
@@ -12,104 +12,82 @@ from odoo.addons.resource.models.resource import HOURS_PER_DAY
 class HrTimesheetSheet(models.Model):
     _inherit = "hr_timesheet.sheet"
 
-    def merge_leave_request(self, date, data, time_lines):
-        previous_date = datetime.strftime(date - timedelta(days=1), "%Y-%m-%d")
-        domain = [
-            ("date_to", "=", previous_date),
-            ("employee_id", "=", self.employee_id.id),
-            ("state", "=", "validate"),
-        ]
-        previous_leave_request = self.env["hr.leave"].search(domain)
-        if previous_leave_request:
-            # Merge LR by updating date_to and number_of_hours_temp
-            num_of_days = (
-                data["number_of_hours_display"]
-                + previous_leave_request.number_of_hours_display
-            ) / HOURS_PER_DAY
-            previous_leave_request.with_context(leave_skip_state_check=True).write(
-                {
-                    "date_to": date,
-                    "number_of_days": num_of_days,
-                    "ps_time_line_ids": [(4, line.id) for line in time_lines],
-                }
-            )
-        else:
-            # Create new LR from timesheet
-            self.env["hr.leave"].with_context(leave_skip_state_check=True).create(data)
-
-    def create_leave_request(self, leave_type, time_lines):
-        hours = sum(time_lines.mapped("unit_amount"))
-        date = min(time_lines.mapped("date"))
-        # Data to create leave requests from timesheet
-        data = {
-            "name": "Time report",
-            "number_of_hours_display": hours,
-            "number_of_days": hours / HOURS_PER_DAY,
-            "holiday_status_id": leave_type,
-            "state": "validate",
-            "date_from": date,
-            "date_to": date,
-            "employee_id": self.employee_id.id,
-            "ps_time_line_ids": [(6, 0, time_lines.ids)],
-        }
-        # Domain to get LR available in the same date period
-        domain = [
-            ("date_from", "<=", date),
-            ("date_to", ">=", date),
-            ("employee_id", "=", self.employee_id.id),
-            ("state", "not in", ["cancel", "refuse"]),
-            ("holiday_status_id", "=", leave_type),
-        ]
-        leave_request = (
-            self.env["hr.leave"]
-            .with_context(leave_skip_state_check=True)
-            .search(domain)
+    def _get_holiday_consumption_hours(self):
+        """
+        Return a dict sheet id -> [(date, hours, time line ids)] for time lines on
+        projects with holiday consumption in the week of the sheet
+        """
+        if not self:
+            return {}
+        self.env["ps.time.line"].flush(
+            ["sheet_id", "date", "unit_amount", "project_id"]
         )
-        if leave_request:
-            date_start = leave_request.date_from.date()
-            date_end = leave_request.date_to.date()
-
-            if date_start == date_end:
-                leave_request.write({"state": "draft"})
-                leave_request.unlink()
-                self.merge_leave_request(date, data, time_lines)
-
-            elif date_start != date_end:
-                if date_start == date:
-                    # Update LR with date_from
-                    leave_request.write({"date_from": date + timedelta(days=1)})
-                    self.merge_leave_request(date, data, time_lines)
+        self.env["project.project"].flush(["holiday_consumption"])
+        self.env.cr.execute(
+            """
+            SELECT ptl.sheet_id, ptl.date, SUM(ptl.unit_amount), ARRAY_AGG(ptl.id)
+            FROM ps_time_line ptl
+            JOIN hr_timesheet_sheet hts ON hts.id = ptl.sheet_id
+            JOIN date_range dr ON dr.id = hts.week_id
+            JOIN project_project pp ON pp.id = ptl.project_id
+            WHERE ptl.sheet_id IN %s
+            AND pp.holiday_consumption
+            AND ptl.date BETWEEN dr.date_start AND dr.date_start + 6
+            GROUP BY ptl.sheet_id, ptl.date
+            ORDER BY ptl.sheet_id, ptl.date
+            """,
+            (tuple(self.ids),),
+        )
+        result = {}
+        for sheet_id, date, hours, line_ids in self.env.cr.fetchall():
+            result.setdefault(sheet_id, []).append((date, hours, line_ids))
+        return result
 
-                if date_start != date:
-                    if date_end == date:
-                        leave_request.write(
-                            {
-                                "date_from": date_start,
-                                "date_to": date - timedelta(days=1),
-                            }
-                        )
-                        leave_request.copy(default=data)
-                    if date_end != date:
-                        # Update LR with date_from
-                        leave_request.write({"date_from": date + timedelta(days=1)})
-                        self.merge_leave_request(date, data, time_lines)
-                        splitted_leave_request = leave_request.copy(
-                            default={"state": leave_request.state}
-                        )
-                        # Update LR with date_to
-                        splitted_leave_request.write(
-                            {
-                                "date_to": date - timedelta(days=1),
-                                "date_from": date_start,
-                                "ps_time_line_ids": [
-                                    (4, line.id) for line in time_lines
-                                ],
-                            }
-                        )
-        if not leave_request:
-            self.env["hr.leave"].with_context(leave_skip_state_check=True).create(data)
+    def _get_leave_runs(self, consumption, leave_types, balances):
+        """
+        Return a list of [leave type, date from, date to, hours, time line ids] for
+        consecutive days booked on the same leave type. A day is booked on the first
+        leave type with enough remaining leaves, balances is updated accordingly
+        """
+        runs = []
+        for date, hours, line_ids in consumption:
+            if not hours:
+                continue
+            hours = min(hours, HOURS_PER_DAY)
+            leave_type = leave_types[-1]
+            for candidate in leave_types:
+                amount = (
+                    hours if candidate.request_unit == "hour" else hours / HOURS_PER_DAY
+                )
+                if balances[candidate.id]["virtual_remaining_leaves"] > amount:
+                    leave_type = candidate
+                    break
+            balances[leave_type.id]["virtual_remaining_leaves"] -= (
+                hours if leave_type.request_unit == "hour" else hours / HOURS_PER_DAY
+            )
+            if (
+                runs
+                and runs[-1][0] == leave_type
+                and runs[-1][2] + timedelta(days=1) == date
+            ):
+                runs[-1][2] = date
+                runs[-1][3] += hours
+                runs[-1][4] += line_ids
+            else:
+                runs.append([leave_type, date, date, hours, list(line_ids)])
+        return runs
 
-    def get_leave_type(self, hour):
+    def _reconcile_holiday_leaves(self):
+        """
+        Create leave requests for holiday consumption time lines of self, and
+        shorten, split or remove existing leave requests they overlap with.
+        Runs directly following a validated leave request of the same type from
+        a time report are merged into it, so consecutive weeks end up in one
+        leave request
+        """
+        consumption = self._get_holiday_consumption_hours()
+        if not consumption:
+            return
         leave_types = self.env["hr.leave.type"].search(
             [("valid", "=", True)], order="validity_start"
         )
@@ -120,34 +98,126 @@ class HrTimesheetSheet(models.Model):
                     "Note: For one of the selected project the Holiday Consumption is true."
                 )
             )
-        leave_type = False
-        for lt in leave_types:
-            if not leave_type and lt.virtual_remaining_leaves > hour:
-                leave_type = lt.id
-                break
-        if not leave_type:
-            leave_type = leave_types[-1].id
-        return leave_type
+        employees = self.mapped("employee_id")
+        balances = leave_types.get_employees_days(employees.ids)
+        sheet2runs = {
+            sheet: sheet._get_leave_runs(
+                consumption.get(sheet.id, []),
+                leave_types,
+                balances[sheet.employee_id.id],
+            )
+            for sheet in self
+        }
+        all_runs = sum(sheet2runs.values(), [])
+        if not all_runs:
+            return
+        HrLeave = self.env["hr.leave"].with_context(leave_skip_state_check=True)
+        existing = HrLeave.search(
+            [
+                ("employee_id", "in", employees.ids),
+                ("holiday_status_id", "in", leave_types.ids),
+                ("state", "not in", ["cancel", "refuse"]),
+                (
+                    "date_from",
+                    "<",
+                    datetime.combine(
+                        max(run[2] for run in all_runs) + timedelta(days=1), time.min
+                    ),
+                ),
+                # leaves ending the day before a run to merge with
+                (
+                    "date_to",
+                    ">=",
+                    datetime.combine(
+                        min(run[1] for run in all_runs) - timedelta(days=1), time.min
+                    ),
+                ),
+            ]
+        )
+        to_unlink = HrLeave.browse([])
+        vals_list = []
+        # runs in date order per employee, so a run can be merged with the one
+        # of the week before in self
+        sheet_runs = sorted(
+            ((sheet, run) for sheet, runs in sheet2runs.items() for run in runs),
+            key=lambda sheet_run: (sheet_run[0].employee_id.id, sheet_run[1][1]),
+        )
+        for sheet, (leave_type, date_from, date_to, hours, line_ids) in sheet_runs:
+            overlapping = existing.filtered(
+                lambda x: x.employee_id == sheet.employee_id
+                and x.holiday_status_id == leave_type
+                and x.date_from.date() <= date_to
+                and x.date_to.date() >= date_from
+            )
+            for leave in overlapping:
+                leave_start = leave.date_from.date()
+                leave_end = leave.date_to.date()
+                if leave_start >= date_from and leave_end <= date_to:
+                    existing -= leave
+                    to_unlink += leave
+                    continue
+                if leave_start < date_from and leave_end > date_to:
+                    existing += leave.copy(
+                        default={
+                            "state": leave.state,
+                            "date_from": date_to + timedelta(days=1),
+                            "date_to": leave.date_to,
+                        }
+                    )
+                if leave_start < date_from:
+                    leave.write({"date_to": date_from - timedelta(days=1)})
+                else:
+                    leave.write({"date_from": date_to + timedelta(days=1)})
+            previous = existing.filtered(
+                lambda x: x.employee_id == sheet.employee_id
+                and x.holiday_status_id == leave_type
+                and x.state == "validate"
+                and x.ps_time_line_ids
+                and x.date_to.date() == date_from - timedelta(days=1)
+            )[:1]
+            if previous:
+                previous.write(
+                    {
+                        "date_to": date_to,
+                        "number_of_days": previous.number_of_days
+                        + hours / HOURS_PER_DAY,
+                        "ps_time_line_ids": [(4, line_id) for line_id in line_ids],
+                    }
+                )
+                continue
+            previous_vals = vals_list and vals_list[-1]
+            if (
+                previous_vals
+                and previous_vals["employee_id"] == sheet.employee_id.id
+                and previous_vals["holiday_status_id"] == leave_type.id
+                and previous_vals["date_to"] == date_from - timedelta(days=1)
+            ):
+                previous_vals["date_to"] = date_to
+                previous_vals["number_of_hours_display"] += hours
+                previous_vals["number_of_days"] += hours / HOURS_PER_DAY
+                previous_vals["ps_time_line_ids"][0][2].extend(line_ids)
+                continue
+            vals_list.append(
+                {
+                    "name": "Time report",
+                    "number_of_hours_display": hours,
+                    "number_of_days": hours / HOURS_PER_DAY,
+                    "holiday_status_id": leave_type.id,
+                    "state": "validate",
+                    "date_from": date_from,
+                    "date_to": date_to,
+                    "employee_id": sheet.employee_id.id,
+                    "ps_time_line_ids": [(6, 0, line_ids)],
+                }
+            )
+        if to_unlink:
+            to_unlink.write({"state": "draft"})
+            to_unlink.unlink()
+        HrLeave.create(vals_list)
 
     def action_timesheet_done(self):
         res = super().action_timesheet_done()
-        if self.timesheet_ids:
-            date_from = self.date_start
-            for i in range(7):
-                date = date_from + timedelta(days=i)
-                time_lines = self.env["ps.time.line"].search(
-                    [
-                        ("date", "=", date),
-                        ("sheet_id", "=", self.id),
-                        ("sheet_id.employee_id", "=", self.employee_id.id),
-                        ("project_id.holiday_consumption", "=", True),
-                    ]
-                )
-                hours = sum(time_lines.mapped("unit_amount"))
-                if hours:
-                    hours = min(hours, HOURS_PER_DAY)
-                    leave_type = self.get_leave_type(hours)
-                    self.create_leave_request(leave_type, time_lines)
+        self.filtered("timesheet_ids")._reconcile_holiday_leaves()
         return res
 
     def action_timesheet_draft(self):
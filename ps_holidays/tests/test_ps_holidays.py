@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from odoo.tests.common import Form, TransactionCase
 
 
@@ -10,8 +12,7 @@ class TestPsHolidays(TransactionCase):
         self.leave_type = self.env.ref("hr_holidays.holiday_status_cl")
         self.leave_type.validity_start = "2023-01-01"
 
-    def test_ps_holidays(self):
-        """Test standard flow"""
+    def _fill_timesheet(self):
         with Form(self.timesheet) as timesheet_form:
             timesheet_form.add_line_project_id = self.env.ref(
                 "ps_holidays.project_holidays"
@@ -24,6 +25,10 @@ class TestPsHolidays(TransactionCase):
                 with timesheet_form.line_ids.edit(i) as day_line:
                     day_line.unit_amount = 8
         self.timesheet.action_timesheet_confirm()
+
+    def test_ps_holidays(self):
+        """Test standard flow"""
+        self._fill_timesheet()
         leaves = self.env["hr.leave"].search(
             [("employee_id.user_id", "=", self.user.id)]
         )
@@ -79,6 +84,73 @@ class TestPsHolidays(TransactionCase):
         )
         self.test_ps_holidays()
 
+    def test_ps_holidays_split(self):
+        """Test that a preexisting leave covering the week is split around it"""
+        date_start = self.timesheet.date_start
+        self.env["hr.leave.allocation"].create(
+            {
+                "holiday_type": "employee",
+                "employee_id": self.user.employee_id.id,
+                "number_of_days": 30,
+                "holiday_status_id": self.leave_type.id,
+                "state": "validate",
+            }
+        )
+        leave = (
+            self.env["hr.leave"]
+            .with_context(leave_skip_state_check=True)
+            .create(
+                {
+                    "employee_id": self.user.employee_id.id,
+                    "date_from": date_start - timedelta(days=3),
+                    "date_to": date_start + timedelta(days=9),
+                    "holiday_status_id": self.leave_type.id,
+                    "state": "validate",
+                }
+            )
+        )
+        self._fill_timesheet()
+        self.timesheet.with_user(self.admin).action_timesheet_done()
+        self.assertEqual(leave.date_to.date(), date_start - timedelta(days=1))
+        split = self.env["hr.leave"].search(
+            [
+                ("employee_id", "=", self.user.employee_id.id),
+                ("date_from", ">=", date_start + timedelta(days=7)),
+                ("holiday_status_id", "=", self.leave_type.id),
+            ]
+        )
+        self.assertEqual(split.date_to.date(), date_start + timedelta(days=9))
+
+    def test_ps_holidays_consecutive_weeks(self):
+        """Test that leaves of consecutive weeks are merged"""
+        leaves = self.env["hr.leave"].search(
+            [("employee_id.user_id", "=", self.user.id)]
+        )
+        first_sheet = self.timesheet
+        self._fill_timesheet()
+        first_sheet.with_user(self.admin).action_timesheet_done()
+        next_week = self.env["date.range"].search(
+            [
+                ("type_id", "=", first_sheet.week_id.type_id.id),
+                ("date_start", "=", first_sheet.date_end + timedelta(days=1)),
+            ]
+        )
+        self.timesheet = (
+            self.env["hr_timesheet.sheet"]
+            .with_user(self.user)
+            .create({"week_id": next_week.id})
+        )
+        self._fill_timesheet()
+        self.timesheet.with_user(self.admin).action_timesheet_done()
+        new_leaves = (
+            self.env["hr.leave"].search([("employee_id.user_id", "=", self.user.id)])
+            - leaves
+        )
+        self.assertEqual(len(new_leaves), 1)
+        self.assertEqual(new_leaves.date_from.date(), first_sheet.date_start)
+        self.assertEqual(new_leaves.date_to.date(), next_week.date_end)
+        self.assertEqual(new_leaves.number_of_days, 14)
+
     def test_wizard(self):
         """Test the allocation via wizard"""
         allocations = self.env["hr.leave.allocation"].search([])
@@ -10,22 +10,30 @@ class HREmployeeWizard(models.TransientModel):
     _inherit = "hr.employee.wizard"
 
     def create_holiday(self, employee_id):
+        self._create_holidays(employee_id)
+        return True
+
+    def _create_holidays(self, employees):
+        """Create and approve the allocations of self's hires for employees"""
         hr_leave_type = self.env["hr.leave.type"].search(
             [("is_leave_type_of_wizard", "=", True)], limit=1
         )
-        allocation_data = {
-            "holiday_status_id": hr_leave_type.id,
-            "holiday_type": "employee",
-            "employee_id": employee_id.id,
-            "number_of_days": self.leave_hours / HOURS_PER_DAY,
-            "state": "confirm",
-        }
-        allocation = self.env["hr.leave.allocation"].create(allocation_data)
-        allocation.action_approve()
-        return True
+        allocations = self.env["hr.leave.allocation"].create(
+            [
+                {
+                    "holiday_status_id": hr_leave_type.id,
+                    "holiday_type": "employee",
+                    "employee_id": employee_id.id,
+                    "number_of_days": this.leave_hours / HOURS_PER_DAY,
+                    "state": "confirm",
+                }
+                for this, employee_id in zip(self, employees)
+            ]
+        )
+        allocations.action_approve()
+        return allocations
 
-    def create_all(self):
-        result = super().create_all()
-        employee = self.env["hr.employee"].browse(result["res_id"])
-        self.create_holiday(employee)
-        return result
+    def _create_employees(self):
+        employees = super()._create_employees()
+        self._create_holidays(employees)
+        return employees
@@ -1,2 +1,4 @@
 from . import res_users
 from . import hr_employee
+from . import ps_view_arch_cache
+from . import ps_work_calendar
@@ -0,0 +1,131 @@
+# Copyright 2018 The Open Source Company ((www.tosc.nl).)
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+"""
+Opt-in instrumentation of expensive entry points.
+
+Methods decorated with instrumented() record their query count, time spent in
+SQL and in Python and the size of the recordset they were called on. Nothing is
+measured unless the logger of this module is enabled for DEBUG, ie by running
+with ``--log-handler odoo.addons.ps_hr.models.ps_instrumentation:DEBUG``, or a
+collector is active, as in tests using assert_query_budget().
+"""
+
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+def _collectors():
+    if not hasattr(_local, "collectors"):
+        _local.collectors = []
+    return _local.collectors
+
+
+@contextmanager
+def instrument(name, records, size=None, flush=True):
+    """
+    Measure the block as entry point name, records provides the cursor and,
+    unless size is passed, the number of records. Pass flush=False for compute
+    methods, flushing there would write pending values out of the order the
+    ORM expects, the writes of the block are then left out of the figures
+    """
+    collectors = _collectors()
+    if not collectors and not _logger.isEnabledFor(logging.DEBUG):
+        yield
+        return
+    cr = records.env.cr
+    thread = threading.current_thread()
+    # the cursor adds up the time of its queries on the current thread if the
+    # thread has those attributes, which http requests set up
+    own_counters = not hasattr(thread, "query_time")
+    if own_counters:
+        thread.query_count = 0
+        thread.query_time = 0
+    # pending writes of the caller are not part of the entry point
+    if flush:
+        records.env["base"].flush()
+    queries = cr.sql_log_count
+    query_time = thread.query_time
+    start = time.perf_counter()
+    try:
+        yield
+        if flush:
+            records.env["base"].flush()
+    finally:
+        seconds = time.perf_counter() - start
+        sql_seconds = thread.query_time - query_time
+        stats = {
+            "name": name,
+            "records": len(records) if size is None else size,
+            "queries": cr.sql_log_count - queries,
+            "sql_seconds": sql_seconds,
+            "python_seconds": max(seconds - sql_seconds, 0),
+        }
+        if own_counters:
+            del thread.query_count
+            del thread.query_time
+        for collected in collectors:
+            collected.append(stats)
+        _logger.debug(
+            "%(name)s: %(records)d records, %(queries)d queries, "
+            "%(sql_seconds).3fs SQL, %(python_seconds).3fs Python",
+            stats,
+        )
+
+
+def instrumented(size=None, flush=True):
+    """
+    Decorate a model method to instrument it as entry point named after the
+    model and the method. Pass a function taking the arguments of the method
+    as size if the number of records in self is not the relevant size, and
+    flush=False on compute methods
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with instrument(
+                "%s.%s" % (self._name, method.__name__),
+                self,
+                size=size(self, *args, **kwargs) if size else None,
+                flush=flush,
+            ):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect_instrumentation():
+    """Collect the measurements of instrumented entry points in the block"""
+    collected = []
+    collectors = _collectors()
+    collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        collectors.remove(collected)
+
+
+@contextmanager
+def assert_query_budget(test, name, queries):
+    """
+    Fail test if the entry point name issues more than queries queries in total
+    in the block, or isn't called at all
+    """
+    with collect_instrumentation() as collected:
+        yield collected
+    measured = [stats for stats in collected if stats["name"] == name]
+    test.assertTrue(measured, "%s was not called" % name)
+    total = sum(stats["queries"] for stats in measured)
+    test.assertLessEqual(
+        total, queries, "%s issued %d queries, budget is %d" % (name, total, queries)
+    )
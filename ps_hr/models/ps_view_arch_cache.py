@@ -0,0 +1,64 @@
+# Copyright 2018 The Open Source Company ((www.tosc.nl).)
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import hashlib
+
+from lxml import etree
+
+from odoo import api, models, tools
+
+
+class PsViewArchCache(models.AbstractModel):
+    _name = "ps.view.arch.cache"
+    _description = "Cache for post-processed view architectures"
+
+    @api.model
+    def _postprocess(self, model_name, method, result, view_type, key=()):
+        """
+        Replace the arch in result, as returned by fields_view_get, by the arch
+        modified in place by calling method of model_name with the parsed arch.
+        The outcome is cached per input arch, view, view type, groups and
+        language of the current user plus key, so pass whatever else method
+        depends on in key. Changed views yield a different input arch, so they
+        don't need the cache to be cleared
+        """
+        arch = result["arch"]
+        result["arch"] = self._get_postprocessed_arch(
+            model_name,
+            method,
+            result.get("view_id"),
+            view_type,
+            tuple(sorted(self.env.user.groups_id.ids)),
+            self.env.lang,
+            key,
+            hashlib.sha1(arch.encode()).hexdigest(),
+            arch,
+        )
+        return result
+
+    @api.model
+    @tools.ormcache(
+        "model_name",
+        "method",
+        "view_id",
+        "view_type",
+        "group_ids",
+        "lang",
+        "key",
+        "arch_hash",
+    )
+    def _get_postprocessed_arch(
+        self,
+        model_name,
+        method,
+        view_id,
+        view_type,
+        group_ids,
+        lang,
+        key,
+        arch_hash,
+        arch,
+    ):
+        doc = etree.fromstring(arch)
+        getattr(self.env[model_name], method)(doc)
+        return etree.tostring(doc, encoding="unicode")
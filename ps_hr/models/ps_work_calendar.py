@@ -0,0 +1,213 @@
+# Copyright 2018 The Open Source Company ((www.tosc.nl).)
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+from datetime import timedelta
+
+import pytz
+
+from odoo import api, models, tools
+
+from odoo.addons.resource.models.resource import HOURS_PER_DAY
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+    _logger.debug("Cannot import numpy, falling back to counting days one by one")
+
+WEEKMASK = "1111100"
+
+
+class PsWorkCalendar(models.AbstractModel):
+    _name = "ps.work.calendar"
+    _description = "Working day calendar"
+
+    @api.model
+    def _get_company_holidays(self, company_id):
+        """
+        Return a sorted tuple of dates covered by public holidays (leaves without
+        resource) of a company, in the timezone of their calendar
+        """
+        return self._get_company_holidays_cached(
+            company_id, self._get_company_holidays_version(company_id)
+        )
+
+    @api.model
+    def _get_company_holidays_version(self, company_id):
+        """
+        Return a digest of the public holidays of a company, to key the cached
+        holidays on instead of clearing all caches when public holidays change
+        """
+        self.env["resource.calendar.leaves"].flush(
+            ["resource_id", "company_id", "calendar_id", "date_from", "date_to"]
+        )
+        self.env["resource.calendar"].flush(["tz"])
+        self.env.cr.execute(
+            """
+            SELECT md5(string_agg(
+                concat_ws(',', rcl.id, rcl.date_from, rcl.date_to, rc.tz), ';'
+                ORDER BY rcl.id
+            ))
+            FROM resource_calendar_leaves rcl
+            LEFT JOIN resource_calendar rc ON rc.id = rcl.calendar_id
+            WHERE rcl.resource_id IS NULL
+            AND rcl.company_id IS NOT DISTINCT FROM %s
+            """,
+            (company_id or None,),
+        )
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    @tools.ormcache("company_id", "version")
+    def _get_company_holidays_cached(self, company_id, version):
+        holidays = set()
+        for leave in (
+            self.env["resource.calendar.leaves"]
+            .sudo()
+            .search([("resource_id", "=", False), ("company_id", "=", company_id)])
+        ):
+            tz = pytz.timezone(leave.calendar_id.tz or "UTC")
+            date = pytz.utc.localize(leave.date_from).astimezone(tz).date()
+            date_to = pytz.utc.localize(leave.date_to).astimezone(tz).date()
+            while date <= date_to:
+                holidays.add(date)
+                date += timedelta(days=1)
+        return tuple(sorted(holidays))
+
+    @api.model
+    def _get_work_day_sql(self, date, company_id):
+        """
+        Return an SQL condition that holds when the SQL expression date is a
+        working day of the company the SQL expression company_id evaluates to,
+        of any company if that is NULL. These are the rules of _count_work_days,
+        for SQL views and reports
+        """
+        return """
+            extract(isodow from {date}) IN ({weekdays})
+            AND NOT EXISTS (
+                SELECT 1
+                FROM resource_calendar_leaves rcl
+                LEFT JOIN resource_calendar rc ON rc.id = rcl.calendar_id
+                WHERE rcl.resource_id IS NULL
+                AND ({company_id} IS NULL OR rcl.company_id = {company_id})
+                AND (
+                    rcl.date_from AT TIME ZONE 'UTC'
+                    AT TIME ZONE coalesce(rc.tz, 'UTC')
+                )::date <= {date}
+                AND (
+                    rcl.date_to AT TIME ZONE 'UTC'
+                    AT TIME ZONE coalesce(rc.tz, 'UTC')
+                )::date >= {date}
+            )
+        """.format(
+            date=date,
+            company_id=company_id,
+            weekdays=", ".join(
+                str(isodow)
+                for isodow, work_day in enumerate(WEEKMASK, 1)
+                if work_day == "1"
+            ),
+        )
+
+    @api.model
+    def _get_parttime_factor(self, employee):
+        """
+        Return the fraction of a full-time schedule an employee works, parttime
+        being a percentage where 0 means full time
+        """
+        parttime = employee.sudo().parttime
+        return parttime / 100 if 0 < parttime < 100 else 1.0
+
+    @api.model
+    def _busday_count(self, starts, ends, holidays):
+        """Count week days that are not holidays from starts to ends inclusive"""
+        if numpy is not None:
+            return numpy.busday_count(
+                numpy.array(starts, dtype="datetime64[D]"),
+                numpy.array(ends, dtype="datetime64[D]") + 1,
+                weekmask=WEEKMASK,
+                holidays=numpy.array(holidays, dtype="datetime64[D]"),
+            ).tolist()
+        holidays = set(holidays)
+        result = []
+        for start, end in zip(starts, ends):
+            count = 0
+            while start <= end:
+                if WEEKMASK[start.weekday()] == "1" and start not in holidays:
+                    count += 1
+                start += timedelta(days=1)
+            result.append(count)
+        return result
+
+    @api.model
+    def _count_work_days(self, queries, company=None):
+        """
+        Return a list with the number of working days for each (date start,
+        date end, employee) in queries, both dates included. Holidays are the ones
+        of the company of the employee, or company if no employee is passed, and
+        days are scaled down for part-time employees. Queries are answered with one
+        vectorized call per company
+        """
+        company = company or self.env.company
+        result = [0.0] * len(queries)
+        by_company = {}
+        for index, (date_start, date_end, employee) in enumerate(queries):
+            company_id = (employee and employee.company_id.id) or company.id
+            by_company.setdefault(company_id, []).append(index)
+        for company_id, indexes in by_company.items():
+            counts = self._busday_count(
+                [queries[index][0] for index in indexes],
+                [queries[index][1] for index in indexes],
+                self._get_company_holidays(company_id),
+            )
+            for index, count in zip(indexes, counts):
+                employee = queries[index][2]
+                result[index] = count * (
+                    self._get_parttime_factor(employee) if employee else 1.0
+                )
+        return result
+
+    @api.model
+    def _get_norm_hours(self, queries, company=None):
+        """Return the norm hours for (date start, date end, employee) queries"""
+        return [
+            days * HOURS_PER_DAY for days in self._count_work_days(queries, company)
+        ]
+
+    @api.model
+    def _offset_work_days(self, dates, offsets, company=None):
+        """
+        Return the dates that are offsets working days after dates, starting from
+        the next working day if a date is not a working day itself
+        """
+        holidays = self._get_company_holidays((company or self.env.company).id)
+        if numpy is not None:
+            return [
+                date.tolist()
+                for date in numpy.busday_offset(
+                    numpy.array(dates, dtype="datetime64[D]"),
+                    offsets,
+                    roll="forward",
+                    weekmask=WEEKMASK,
+                    holidays=numpy.array(holidays, dtype="datetime64[D]"),
+                )
+            ]
+        holidays = set(holidays)
+
+        def is_work_day(date):
+            return WEEKMASK[date.weekday()] == "1" and date not in holidays
+
+        result = []
+        for date, offset in zip(dates, offsets):
+            while not is_work_day(date):
+                date += timedelta(days=1)
+            step = 1 if offset >= 0 else -1
+            for _i in range(abs(offset)):
+                date += timedelta(days=step)
+                while not is_work_day(date):
+                    date += timedelta(days=step)
+            result.append(date)
+        return result
@@ -1,5 +1,15 @@
+import base64
+from datetime import date, datetime
+from unittest.mock import patch
+
 from odoo.tests.common import Form, TransactionCase
 
+from odoo.addons.ps_hr.models.ps_instrumentation import (
+    assert_query_budget,
+    collect_instrumentation,
+    instrument,
+)
+
 
 class TestPsHr(TransactionCase):
     def test_hr_employee_wizard(self):
@@ -25,3 +35,176 @@ class TestPsHr(TransactionCase):
         action = wizard.create_all()
         employee = self.env["hr.employee"].browse(action["res_id"])
         self.assertTrue(employee)
+
+    def test_hr_employee_wizard_import(self):
+        csv_file = (
+            "firstname;lastname;login;gender;official_date_of_employment;external\n"
+            "first;trainee;ps_hr_trainee1;male;2024-09-01;0\n"
+            "second;trainee;ps_hr_trainee2;Female;2024-09-01;yes\n"
+            "third;trainee;ps_hr_trainee1;other;2024-09-01;0\n"
+            "fourth;;ps_hr_trainee4;robot;2024-09-01;0\n"
+        )
+        wizard = self.env["hr.employee.wizard"].create(
+            {
+                "street": "street",
+                "import_file": base64.b64encode(csv_file.encode("utf8")),
+                "import_filename": "trainees.csv",
+                "default_operating_unit_id": self.env.ref(
+                    "operating_unit.main_operating_unit"
+                ).id,
+            }
+        )
+        wizard.action_import()
+        employees = self.env["hr.employee"].search(
+            [("user_id.login", "like", "ps_hr_trainee")], order="id"
+        )
+        self.assertEqual(employees.mapped("gender"), ["male", "female"])
+        self.assertEqual(employees.mapped("external"), [False, True])
+        self.assertEqual(employees.mapped("user_id.partner_id.street"), ["street"])
+        self.assertEqual(
+            employees.mapped("user_id.default_operating_unit_id"),
+            self.env.ref("operating_unit.main_operating_unit"),
+        )
+        log = wizard.import_log.splitlines()
+        self.assertEqual(log[0], "2 employees created")
+        self.assertIn("Row 4", log[1])
+        self.assertIn("Row 5", log[2])
+
+    def test_work_calendar(self):
+        calendar = self.env["ps.work.calendar"]
+        employee = self.env.ref("hr.employee_qdp")
+        employee.parttime = 80
+        # 2024-01-01 is a monday
+        self.assertEqual(
+            calendar._count_work_days(
+                [
+                    (date(2024, 1, 1), date(2024, 1, 7), None),
+                    (date(2024, 1, 1), date(2024, 1, 31), None),
+                    (date(2024, 1, 1), date(2024, 1, 5), employee),
+                ]
+            ),
+            [5, 23, 4],
+        )
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "New year",
+                "company_id": self.env.company.id,
+                "calendar_id": self.env.company.resource_calendar_id.id,
+                "date_from": datetime(2024, 1, 1, 10),
+                "date_to": datetime(2024, 1, 1, 14),
+            }
+        )
+        self.assertEqual(
+            calendar._count_work_days([(date(2024, 1, 1), date(2024, 1, 7), None)]),
+            [4],
+        )
+        self.assertEqual(
+            calendar._get_norm_hours([(date(2024, 1, 1), date(2024, 1, 7), None)]),
+            [32],
+        )
+        self.assertEqual(
+            calendar._offset_work_days([date(2023, 12, 30), date(2024, 1, 5)], [0, 1]),
+            [date(2024, 1, 2), date(2024, 1, 8)],
+        )
+        with patch.object(
+            type(self.env["ps.work.calendar"]), "clear_caches"
+        ) as clear_caches:
+            leave = self.env["resource.calendar.leaves"].create(
+                {
+                    "name": "Day off",
+                    "calendar_id": self.env.company.resource_calendar_id.id,
+                    "resource_id": employee.resource_id.id,
+                    "date_from": datetime(2024, 1, 2, 10),
+                    "date_to": datetime(2024, 1, 2, 14),
+                }
+            )
+            leave.date_to = datetime(2024, 1, 2, 16)
+            leave.unlink()
+            # public holidays are picked up without clearing caches either
+            self.env["resource.calendar.leaves"].create(
+                {
+                    "name": "Day after new year",
+                    "company_id": self.env.company.id,
+                    "calendar_id": self.env.company.resource_calendar_id.id,
+                    "date_from": datetime(2024, 1, 2, 10),
+                    "date_to": datetime(2024, 1, 2, 14),
+                }
+            )
+            self.assertEqual(
+                calendar._count_work_days([(date(2024, 1, 1), date(2024, 1, 7), None)]),
+                [3],
+            )
+            clear_caches.assert_not_called()
+
+    def test_view_arch_cache(self):
+        calls = []
+
+        def _test_postprocess(self, doc):
+            calls.append(doc)
+            doc.set("string", "processed")
+
+        Partner = self.env["res.partner"]
+        with patch.object(
+            type(Partner), "_test_postprocess", _test_postprocess, create=True
+        ):
+            for _i in range(2):
+                result = self.env["ps.view.arch.cache"]._postprocess(
+                    Partner._name,
+                    "_test_postprocess",
+                    Partner.fields_view_get(view_type="tree"),
+                    "tree",
+                )
+                self.assertIn('string="processed"', result["arch"])
+            self.assertEqual(len(calls), 1)
+            # changed views yield a different arch
+            self.env["ir.ui.view"].create(
+                {
+                    "name": "test view arch cache",
+                    "model": "res.partner",
+                    "inherit_id": self.env.ref("base.view_partner_tree").id,
+                    "arch": '<xpath expr="/tree" position="attributes">'
+                    '<attribute name="string">changed</attribute></xpath>',
+                }
+            )
+            self.env["ps.view.arch.cache"]._postprocess(
+                Partner._name,
+                "_test_postprocess",
+                Partner.fields_view_get(view_type="tree"),
+                "tree",
+            )
+            self.assertEqual(len(calls), 2)
+            # an arch that differs by context is not served from the cache
+            result = Partner.fields_view_get(view_type="tree")
+            result["arch"] = result["arch"].replace("<tree", '<tree class="other"', 1)
+            result = self.env["ps.view.arch.cache"]._postprocess(
+                Partner._name, "_test_postprocess", result, "tree"
+            )
+            self.assertEqual(len(calls), 3)
+            self.assertIn('class="other"', result["arch"])
+
+    def test_instrumentation(self):
+        partners = self.env["res.partner"].search([], limit=2)
+
+        def read_partners():
+            with instrument("read_partners", partners):
+                partners.invalidate_cache()
+                partners.mapped("name")
+
+        read_partners()
+        with collect_instrumentation() as collected:
+            read_partners()
+        self.assertEqual(len(collected), 1)
+        self.assertEqual(collected[0]["records"], 2)
+        self.assertGreaterEqual(collected[0]["queries"], 1)
+        with assert_query_budget(self, "read_partners", 10):
+            read_partners()
+        with self.assertRaises(AssertionError):
+            with assert_query_budget(self, "read_partners", 0):
+                read_partners()
+        # compute methods are measured without flushing pending writes
+        partners[0].name = "Pending"
+        with collect_instrumentation() as collected:
+            with instrument("compute", partners, flush=False):
+                self.assertTrue(self.env.all.towrite["res.partner"])
+        self.assertTrue(self.env.all.towrite["res.partner"])
+        self.assertEqual(len(collected), 1)
@@ -1,9 +1,42 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import base64
+import csv
+import io
 import json
+import logging
+from datetime import date, datetime
 
-from odoo import api, fields, models
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover
+    openpyxl = None
+    _logger.debug("Cannot import openpyxl, importing XLSX files is unavailable")
+
+# fields the hires of a bulk import take from the wizard unless the file has them
+IMPORT_DEFAULT_FIELDS = [
+    "external",
+    "category_ids",
+    "country_id",
+    "lang",
+    "default_operating_unit_id",
+    "operating_unit_ids",
+    "department_id",
+    "parent_id",
+    "klippa_user",
+    "leave_hours",
+    "street",
+    "zip",
+    "city",
+    "account_id",
+]
+IMPORT_TRUE_VALUES = ("1", "true", "yes", "y", "x")
 
 
 class HREmployeeWizard(models.TransientModel):
@@ -72,6 +105,17 @@ class HREmployeeWizard(models.TransientModel):
 
     klippa_user = fields.Boolean(string="Employee uses Klippa")
 
+    import_file = fields.Binary(
+        "Import file",
+        help="A CSV or XLSX file with a header row of field names of this wizard, "
+        "one row per hire. Relational fields are matched by name, many2many values "
+        "are separated by commas. Roles and shared fields like operating units, "
+        "department, manager, address and language are taken from the wizard "
+        "unless the file has them",
+    )
+    import_filename = fields.Char("Import filename")
+    import_log = fields.Text("Import log", readonly=True)
+
     @api.depends("parent_department_id", "default_operating_unit_id")
     def _compute_department_id_domain(self):
         for this in self:
@@ -104,38 +148,47 @@ class HREmployeeWizard(models.TransientModel):
         res.update({"operating_unit_ids": operating_unit_ids.ids})
         return res
 
-    def create_partner(self):
-        """partner creation"""
-        firstname = self.firstname
-        lastname = self.lastname
+    @api.model
+    def _get_partner_reference_data(self):
+        """Return default values for partners that are looked up by name"""
         account_payment_term_id = self.env["account.payment.term"].search(
             [("name", "=", "Immediate Payment")], limit=1
         )
         account_payment_mode_id = self.env["account.payment.mode"].search(
             [("name", "=", "SEPA Credit Transfer (Outbound)")], limit=1
         )
-        partner = {
-            "name": firstname + " " + lastname if firstname and lastname else "",
-            "lastname": lastname,
-            "firstname": firstname,
-            "street": self.street,
-            "zip": self.zip,
-            "city": self.city,
-            "country_id": self.country_id and self.country_id.id,
-            "email": self.email,
-            "mobile": self.mobile,
-            "ref": self.ref,
+        return {
             "property_supplier_payment_term_id": account_payment_term_id
             and account_payment_term_id.id,
             "supplier_payment_mode_id": account_payment_mode_id
             and account_payment_mode_id.id,
-            "lang": self.lang,
         }
-        partner_id = self.env["res.partner"].create(partner)
-        return partner_id
 
-    # @api.multi
-    def create_user(self, partner_id):
+    def _prepare_partner_vals(self, reference_data):
+        firstname = self.firstname
+        lastname = self.lastname
+        return dict(
+            reference_data,
+            name=firstname + " " + lastname if firstname and lastname else "",
+            lastname=lastname,
+            firstname=firstname,
+            street=self.street,
+            zip=self.zip,
+            city=self.city,
+            country_id=self.country_id and self.country_id.id,
+            email=self.email,
+            mobile=self.mobile,
+            ref=self.ref,
+            lang=self.lang,
+        )
+
+    def create_partner(self):
+        """partner creation"""
+        return self.env["res.partner"].create(
+            self._prepare_partner_vals(self._get_partner_reference_data())
+        )
+
+    def _prepare_user_vals(self, partner_id):
         list_role = [(5, False, False)]
         for role_line in self.role_line_ids:
             data = {
@@ -144,7 +197,7 @@ class HREmployeeWizard(models.TransientModel):
                 "date_to": role_line.to_date or False,
             }
             list_role.append((0, 0, data))
-        user = {
+        return {
             "lastname": self.lastname,
             "firstname": self.firstname,
             "login": self.login,
@@ -154,31 +207,45 @@ class HREmployeeWizard(models.TransientModel):
             "role_line_ids": list_role,
             "notification_type": "inbox",
         }
-        user_id = self.env["res.users"].create(user)
-        return user_id
 
     # @api.multi
-    def create_res_partner_bank(self, partner_id):
-        res_partner_bank_id = self.env["res.partner.bank"].search(
-            [("acc_number", "=", self.acc_number)], limit=1
-        )
-        if res_partner_bank_id:
-            res_partner_bank_id = res_partner_bank_id
-        else:
-            if self.acc_number:
-                res_partner_bank_id = self.env["res.partner.bank"].create(
+    def create_user(self, partner_id):
+        return self.env["res.users"].create(self._prepare_user_vals(partner_id))
+
+    def _create_res_partner_banks(self, partners):
+        """
+        Return the bank accounts of self's account numbers in the order of self,
+        creating missing ones for the respective partner
+        """
+        ResPartnerBank = self.env["res.partner.bank"]
+        banks = {}
+        for bank in ResPartnerBank.search(
+            [("acc_number", "in", self.mapped("acc_number"))]
+        ):
+            banks.setdefault(bank.acc_number, bank)
+        vals_list = []
+        for this, partner_id in zip(self, partners):
+            if this.acc_number and this.acc_number not in banks:
+                banks[this.acc_number] = ResPartnerBank
+                vals_list.append(
                     {
-                        "acc_number": self.acc_number,
-                        "bank_id": self.bank_name_id and self.bank_name_id.id,
+                        "acc_number": this.acc_number,
+                        "bank_id": this.bank_name_id and this.bank_name_id.id,
                         "partner_id": partner_id and partner_id.id,
                     }
                 )
-        return res_partner_bank_id
+        for bank in ResPartnerBank.create(vals_list):
+            banks[bank.acc_number] = bank
+        return [banks.get(this.acc_number, ResPartnerBank) for this in self]
 
-    def create_employee(self, user_id, res_partner_bank_id):
+    # @api.multi
+    def create_res_partner_bank(self, partner_id):
+        return self._create_res_partner_banks(partner_id)[0]
+
+    def _prepare_employee_vals(self, user_id, res_partner_bank_id):
         firstname = self.firstname
         lastname = self.lastname
-        employee = {
+        return {
             "name": firstname + " " + lastname if firstname and lastname else "",
             "firstname": firstname,
             "lastname": lastname,
@@ -201,20 +268,237 @@ class HREmployeeWizard(models.TransientModel):
             "parent_id": self.parent_id.id,
             "klippa_user": self.klippa_user,
         }
-        return self.env["hr.employee"].create(employee)
+
+    def create_employee(self, user_id, res_partner_bank_id):
+        return self.env["hr.employee"].create(
+            self._prepare_employee_vals(user_id, res_partner_bank_id)
+        )
+
+    def _create_employees(self):
+        """
+        Create partners, bank accounts, users and employees for all hires in self
+        with one create call per model, return the employees in the order of self
+        """
+        reference_data = self._get_partner_reference_data()
+        partners = self.env["res.partner"].create(
+            [this._prepare_partner_vals(reference_data) for this in self]
+        )
+        users = self.env["res.users"].create(
+            [
+                this._prepare_user_vals(partner_id)
+                for this, partner_id in zip(self, partners)
+            ]
+        )
+        banks = self._create_res_partner_banks(partners)
+        return self.env["hr.employee"].create(
+            [
+                this._prepare_employee_vals(user_id, bank)
+                for this, user_id, bank in zip(self, users, banks)
+            ]
+        )
 
     def create_all(self):
         """Partner, user, bank, holiday and Employee creation"""
-        partner_id = self.create_partner()
-        user_id = self.create_user(partner_id)
-        res_partner_bank_id = self.create_res_partner_bank(partner_id)
-        employee_id = self.create_employee(user_id, res_partner_bank_id)
+        employee_id = self._create_employees()
         result_dict = self.env["ir.actions.actions"]._for_xml_id(
             "hr.open_view_employee_list_my"
         )
         result_dict.update(views=[(False, "form")], res_id=employee_id.id)
         return result_dict
 
+    def _read_import_file(self):
+        """Return a list of (row number, {column: value}) of the import file"""
+        data = base64.b64decode(self.import_file or b"")
+        if (self.import_filename or "").lower().endswith(".xlsx"):
+            if openpyxl is None:
+                raise UserError(_("Importing XLSX files requires openpyxl"))
+            sheet = openpyxl.load_workbook(
+                io.BytesIO(data), read_only=True, data_only=True
+            ).active
+            rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+        else:
+            text = data.decode("utf-8-sig")
+            try:
+                dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            rows = list(csv.reader(io.StringIO(text), dialect))
+        if not rows:
+            raise UserError(_("The import file is empty"))
+        header = [str(column or "").strip() for column in rows[0]]
+        import_fields = self._get_import_fields()
+        unknown = [column for column in header if column not in import_fields]
+        if unknown:
+            raise UserError(_("Unknown columns: %s") % ", ".join(unknown))
+        return [
+            (row_number, dict(zip(header, row)))
+            for row_number, row in enumerate(rows[1:], start=2)
+            if any(value not in (None, "") for value in row)
+        ]
+
+    @api.model
+    def _get_import_fields(self):
+        """Return the names of fields that can be columns of an import file"""
+        return [
+            name
+            for name, field in self._fields.items()
+            if field.store
+            and not field.automatic
+            and field.type not in ("one2many", "binary")
+            and not name.startswith("import_")
+        ]
+
+    @api.model
+    def _get_import_references(self, rows):
+        """
+        Return a dict field name -> {name: id} for the relational columns, with
+        one search per column
+        """
+        references = {}
+        for name in self._get_import_fields():
+            field = self._fields[name]
+            if field.type not in ("many2one", "many2many"):
+                continue
+            values = set()
+            for _row_number, row in rows:
+                values.update(self._split_import_value(field, row.get(name)))
+            if not values:
+                continue
+            comodel = self.env[field.comodel_name].with_context(active_test=False)
+            references[name] = {
+                record[comodel._rec_name]: record.id
+                for record in comodel.search([(comodel._rec_name, "in", list(values))])
+            }
+        return references
+
+    @api.model
+    def _get_import_default_fields(self):
+        """Return the fields hires of an import take from the wizard"""
+        return list(IMPORT_DEFAULT_FIELDS)
+
+    @api.model
+    def _split_import_value(self, field, value):
+        if value in (None, ""):
+            return []
+        if field.type == "many2many":
+            return [part.strip() for part in str(value).split(",") if part.strip()]
+        return [str(value).strip()]
+
+    @api.model
+    def _convert_import_value(self, field, value, references):
+        """Return value as to be written to field, raise ValueError if invalid"""
+        if value in (None, ""):
+            return [(6, 0, [])] if field.type == "many2many" else False
+        if field.type in ("many2one", "many2many"):
+            ids = []
+            for name in self._split_import_value(field, value):
+                if name not in references.get(field.name, {}):
+                    raise ValueError(_("%s not found") % name)
+                ids.append(references[field.name][name])
+            return ids[0] if field.type == "many2one" else [(6, 0, ids)]
+        if field.type == "date":
+            if isinstance(value, datetime):
+                return value.date()
+            if isinstance(value, date):
+                return value
+            return fields.Date.to_date(str(value).strip())
+        if field.type == "boolean":
+            if isinstance(value, bool):
+                return value
+            return str(value).strip().lower() in IMPORT_TRUE_VALUES
+        if field.type in ("float", "integer"):
+            return float(value) if field.type == "float" else int(float(value))
+        if field.type == "selection":
+            selection = dict(field._description_selection(self.env))
+            value = str(value).strip()
+            for key, label in selection.items():
+                if value in (key, label):
+                    return key
+            raise ValueError(_("%s is not one of %s") % (value, ", ".join(selection)))
+        return str(value).strip()
+
+    def _validate_import_rows(self, rows):
+        """
+        Return a list of (row number, values for a hire) for valid rows and a list
+        of (row number, error) for invalid ones
+        """
+        references = self._get_import_references(rows)
+        logins = [str(row.get("login") or "").strip() for _row_number, row in rows]
+        existing_logins = set(
+            self.env["res.users"]
+            .with_context(active_test=False)
+            .search([("login", "in", logins)])
+            .mapped("login")
+        )
+        seen_logins = set()
+        default_vals = self._convert_to_write(
+            {name: self[name] for name in self._get_import_default_fields()}
+        )
+        default_vals["role_line_ids"] = [
+            (0, 0, line.copy_data({"user_role_id": False})[0])
+            for line in self.role_line_ids
+        ]
+        valid, errors = [], []
+        for row_number, row in rows:
+            vals = dict(default_vals)
+            row_errors = []
+            for name, value in row.items():
+                field = self._fields[name]
+                try:
+                    vals[name] = self._convert_import_value(field, value, references)
+                except ValueError as e:
+                    row_errors.append("%s: %s" % (field.string, e))
+            for name in ("firstname", "lastname", "login"):
+                if not vals.get(name):
+                    row_errors.append(_("%s is required") % self._fields[name].string)
+            login = vals.get("login")
+            if login and (login in existing_logins or login in seen_logins):
+                row_errors.append(_("Login %s is already in use") % login)
+            seen_logins.add(login)
+            if row_errors:
+                errors.append((row_number, "; ".join(row_errors)))
+            else:
+                valid.append((row_number, vals))
+        return valid, errors
+
+    def action_import(self):
+        """
+        Create employees for all rows of the import file. Invalid rows and rows
+        that fail to be created are reported in the import log, the other rows
+        are created anyway
+        """
+        self.ensure_one()
+        if not self.import_file:
+            raise UserError(_("Please select a file to import"))
+        valid, errors = self._validate_import_rows(self._read_import_file())
+        employees = self.env["hr.employee"]
+        try:
+            with self.env.cr.savepoint():
+                employees = self.create(
+                    [vals for _row_number, vals in valid]
+                )._create_employees()
+        except Exception:
+            for row_number, vals in valid:
+                try:
+                    with self.env.cr.savepoint():
+                        employees += self.create(vals)._create_employees()
+                except Exception as e:
+                    errors.append((row_number, str(e)))
+        self.import_log = "\n".join(
+            [_("%d employees created") % len(employees)]
+            + [
+                _("Row %d: %s") % (row_number, error)
+                for row_number, error in sorted(errors)
+            ]
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "views": [(self.env.ref("ps_hr.view_employee_import_wizard").id, "form")],
+            "target": "new",
+        }
+
 
 class UsersRoleWizard(models.TransientModel):
     _name = "users.role.wizard"
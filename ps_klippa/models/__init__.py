@@ -1 +1,2 @@
 from . import hr_expense
+from . import hr_expense_sheet
@@ -1,35 +1,95 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import api, models
 
+from .hr_expense_sheet import KLIPPA_SUBMIT_CHUNK_SIZE
+
 
 class HrExpense(models.Model):
     _inherit = "hr.expense"
 
     @api.model
-    def _klippa_update_expenses(self):
+    def _klippa_update_expenses(self, chunk_size=KLIPPA_SUBMIT_CHUNK_SIZE):
+        """
+        Process expenses imported by Klippa in stages: assign operating units,
+        create one sheet per employee, analytic account and name, and submit the
+        sheets in chunks. Every stage and chunk is committed when running as cron
+        """
         user = self.env.ref("ps_klippa.user_klippa")
-        for this in self.search(
+        self._klippa_assign_operating_units(user)
+        self._klippa_commit()
+        sheets = self._klippa_create_sheets(user)
+        self._klippa_commit()
+        sheets._klippa_submit(chunk_size)
+
+    @api.model
+    def _klippa_commit(self):
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    @api.model
+    def _klippa_assign_operating_units(self, user):
+        """Set the first operating unit of the analytic account on draft expenses"""
+        expenses = self.search(
             [
                 ("create_uid", "=", user.id),
                 ("state", "=", "draft"),
                 ("operating_unit_id", "=", False),
                 ("analytic_account_id", "!=", False),
             ]
-        ):
-            this.operating_unit_id = this.analytic_account_id.operating_unit_ids.ids[:1]
-        for row in self.read_group(
+        )
+        operating_unit2expense_ids = defaultdict(list)
+        for expense in expenses:
+            operating_units = expense.analytic_account_id.operating_unit_ids
+            if operating_units:
+                operating_unit2expense_ids[operating_units[:1].id].append(expense.id)
+        # one write per operating unit, write() in ps_expense keeps the sheets
+        # in line with their expenses
+        for operating_unit_id, expense_ids in operating_unit2expense_ids.items():
+            self.browse(expense_ids).write({"operating_unit_id": operating_unit_id})
+
+    @api.model
+    def _klippa_create_sheets(self, user):
+        """
+        Create a sheet per employee, analytic account and name for expenses
+        without sheet, return the sheets
+        """
+        groups = {}
+        for expense in self.search(
             [
                 ("create_uid", "=", user.id),
                 ("state", "=", "draft"),
                 ("sheet_id", "=", False),
-            ],
-            [],
-            ["employee_id", "analytic_account_id", "name"],
-            lazy=False,
+            ]
         ):
-            expenses = self.search(row["__domain"])
-            sheet = expenses._create_sheet_from_expenses()
-            sheet.name = expenses[0].name
-            sheet.action_submit_sheet()
+            key = (expense.employee_id, expense.analytic_account_id, expense.name)
+            groups[key] = groups.get(key, self.browse([])) + expense
+        vals_list = [
+            expenses._klippa_prepare_sheet_vals() for expenses in groups.values()
+        ]
+        sheets = self.env["hr.expense.sheet"].create(vals_list)
+        # like _create_sheet_from_expenses in ps_expense
+        operating_unit2sheets = {}
+        for sheet in sheets.filtered(lambda x: not x.operating_unit_id):
+            operating_unit = sheet.expense_line_ids.mapped("operating_unit_id")[:1]
+            if operating_unit:
+                operating_unit2sheets.setdefault(operating_unit, sheets.browse([]))
+                operating_unit2sheets[operating_unit] += sheet
+        for operating_unit, operating_unit_sheets in operating_unit2sheets.items():
+            operating_unit_sheets.write({"operating_unit_id": operating_unit.id})
+        return sheets
+
+    def _klippa_prepare_sheet_vals(self):
+        """Return the values _create_sheet_from_expenses would use for self"""
+        todo = self.filtered(
+            lambda x: x.payment_mode == "own_account"
+        ) or self.filtered(lambda x: x.payment_mode == "company_account")
+        return {
+            "company_id": self.company_id.id,
+            "employee_id": self[0].employee_id.id,
+            "name": self[0].name,
+            "expense_line_ids": [(6, 0, todo.ids)],
+        }
@@ -0,0 +1,34 @@
+# Copyright 2018 The Open Source Company ((www.tosc.nl).)
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+
+from odoo import models
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+KLIPPA_SUBMIT_CHUNK_SIZE = 100
+
+
+class HrExpenseSheet(models.Model):
+    _inherit = "hr.expense.sheet"
+
+    def _klippa_submit(self, chunk_size=KLIPPA_SUBMIT_CHUNK_SIZE):
+        """
+        Submit sheets in chunks, retrying a failing chunk sheet by sheet so that a
+        failing sheet only keeps itself from being submitted
+        """
+        for chunk_ids in split_every(chunk_size, self.ids):
+            chunk = self.browse(chunk_ids)
+            try:
+                with self.env.cr.savepoint():
+                    chunk.action_submit_sheet()
+            except Exception:
+                for sheet in chunk:
+                    try:
+                        with self.env.cr.savepoint():
+                            sheet.action_submit_sheet()
+                    except Exception:
+                        _logger.exception("Submitting Klippa sheet %s failed", sheet.id)
+            self.env["hr.expense"]._klippa_commit()
@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
 from odoo.tests.common import TransactionCase
 
 
@@ -32,3 +35,22 @@ class TestPsKlippa(TransactionCase):
         self.env.ref("ps_klippa.ir_cron_expense_update_actions").method_direct_trigger()
         self.assertTrue(new_expenses[1].sheet_id)
         self.assertNotEqual(new_expenses[0].sheet_id, new_expenses[1].sheet_id)
+
+    def test_ps_klippa_submit_isolation(self):
+        """A sheet failing to submit does not keep the others from submitting"""
+        expenses = self.env.ref("ps_klippa.expense_demo1") + self.env.ref(
+            "ps_klippa.expense_demo3"
+        )
+        sheets = self.env["hr.expense.sheet"].create(
+            [expense._klippa_prepare_sheet_vals() for expense in expenses]
+        )
+        submit = type(sheets).action_submit_sheet
+
+        def action_submit_sheet(self):
+            if sheets[0] in self:
+                raise UserError("bad expense")
+            return submit(self)
+
+        with patch.object(type(sheets), "action_submit_sheet", action_submit_sheet):
+            sheets._klippa_submit(chunk_size=2)
+        self.assertEqual(sheets.mapped("state"), ["draft", "submit"])
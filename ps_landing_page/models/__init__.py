@@ -1 +1,8 @@
+from . import hr_employee_landing_page_snapshot
 from . import hr_employee_landing_page
+from . import hr_employee
+from . import hr_expense_sheet
+from . import hr_leave
+from . import hr_timesheet_sheet
+from . import ps_time_line
+from . import res_users
@@ -0,0 +1,34 @@
+from odoo import models
+
+# fields of employees the landing page of them or their managers depends on
+LANDING_PAGE_FIELDS = {
+    "user_id",
+    "parent_id",
+    "department_id",
+    "expense_manager_id",
+    "official_date_of_employment",
+    "end_date_of_employment",
+}
+
+
+class HrEmployee(models.Model):
+    _inherit = "hr.employee"
+
+    def _get_landing_page_users(self):
+        """Return the users whose landing page shows data of self"""
+        return (
+            self.mapped("user_id")
+            | self.mapped("parent_id.user_id")
+            | self.mapped("department_id.manager_id.user_id")
+            | self.mapped("expense_manager_id")
+        )
+
+    def write(self, vals):
+        if not LANDING_PAGE_FIELDS & set(vals):
+            return super().write(vals)
+        users = self.sudo()._get_landing_page_users()
+        result = super().write(vals)
+        self.env["hr.employee.landing_page.snapshot"]._invalidate(
+            users | self.sudo()._get_landing_page_users()
+        )
+        return result
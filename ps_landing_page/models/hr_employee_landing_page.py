@@ -2,10 +2,12 @@ from datetime import datetime
 
 from lxml import etree
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 from odoo.osv.expression import AND
 from odoo.tools.safe_eval import safe_eval
 
+from odoo.addons.ps_hr.models.ps_instrumentation import instrumented
+
 
 class HrEmployeeLandingPage(models.TransientModel):
     _name = "hr.employee.landing_page"
@@ -13,7 +15,40 @@ class HrEmployeeLandingPage(models.TransientModel):
     _rec_name = "employee_id"
 
     @api.depends("employee_id")
+    @instrumented(flush=False)
     def _compute_all(self):
+        snapshot_model = self.env["hr.employee.landing_page.snapshot"].sudo()
+        for this in self:
+            own_page = this.employee_id == self.env.user.employee_id
+            data = own_page and snapshot_model._get_snapshot(self.env.user)
+            if not data:
+                data = this._get_snapshot_data()
+                if own_page:
+                    snapshot_model._set_snapshot(self.env.user, data)
+            this.update(
+                {
+                    "current_week": data["current_week"],
+                    "next_week_id": data["next_week_id"],
+                    "vacation_balance": data["vacation_balance"],
+                    "overtime_balance": data["overtime_balance"],
+                    "private_km_balance": data["private_km_balance"],
+                    "emp_timesheet_status_ids": [
+                        (6, 0, data["emp_timesheet_status_ids"])
+                    ],
+                    "emp_timesheet_to_be_approved_ids": [
+                        (6, 0, data["emp_timesheet_to_be_approved_ids"])
+                    ],
+                    "emp_expense_status_ids": [(6, 0, data["emp_expense_status_ids"])],
+                    "emp_expense_to_be_approved_ids": [
+                        (6, 0, data["emp_expense_to_be_approved_ids"])
+                    ],
+                }
+            )
+
+    def _get_snapshot_data(self):
+        """Return a json serializable dict of the values shown on the landing page"""
+        self.ensure_one()
+        data = {}
 
         # current week
         self.env.cr.execute(
@@ -26,13 +61,10 @@ class HrEmployeeLandingPage(models.TransientModel):
         current_week_id = self.env.cr.fetchone()[0]
 
         next_week_id = self.get_upcoming_week()
-        if current_week_id == next_week_id.id or current_week_id < next_week_id.id:
-            self.current_week = True
-        else:
-            self.current_week = False
-
-        if next_week_id:
-            self.next_week_id = next_week_id.name
+        data["current_week"] = bool(
+            current_week_id == next_week_id.id or current_week_id < next_week_id.id
+        )
+        data["next_week_id"] = next_week_id.name if next_week_id else False
 
         # compute vaction balance
         vacation_balance = 0
@@ -41,7 +73,7 @@ class HrEmployeeLandingPage(models.TransientModel):
                 self.employee_id.allocation_count
                 - self.employee_id.allocation_used_count
             )
-        self.vacation_balance = vacation_balance
+        data["vacation_balance"] = vacation_balance
 
         user_id = self.env.user.id
         # compute overtime balance
@@ -56,7 +88,7 @@ class HrEmployeeLandingPage(models.TransientModel):
         overtime_balance = 0
         for x in self.env.cr.fetchall():
             overtime_balance += x[0]
-        self.overtime_balance = overtime_balance
+        data["overtime_balance"] = overtime_balance
 
         current_year = datetime.now()
         first_date = str(current_year.year) + "-1-1"
@@ -65,7 +97,7 @@ class HrEmployeeLandingPage(models.TransientModel):
 
         # compute private milage, Note: private_mileage is an computed field can't
         # be calulated through SQl
-        self.private_km_balance = sum(
+        data["private_km_balance"] = sum(
             hr_timesheet.search(
                 [
                     ("employee_id", "=", self.employee_id.id),
@@ -80,29 +112,30 @@ class HrEmployeeLandingPage(models.TransientModel):
         domain = self._get_action_domain(
             "hr_timesheet_sheet.act_hr_timesheet_sheet_my_timesheets"
         )
-        timesheet_ids = hr_timesheet.search(domain, limit=10).ids
-        self.emp_timesheet_status_ids = [(6, 0, timesheet_ids)]
+        data["emp_timesheet_status_ids"] = hr_timesheet.search(domain, limit=10).ids
 
         # to be approved timesheets
         domain = self._get_action_domain(
             "hr_timesheet_sheet.act_hr_timesheet_sheet_to_review"
         )
-        to_be_approved_sheets = hr_timesheet.search(domain, limit=10).ids
-        self.emp_timesheet_to_be_approved_ids = [(6, 0, to_be_approved_sheets)]
+        data["emp_timesheet_to_be_approved_ids"] = hr_timesheet.search(
+            domain, limit=10
+        ).ids
 
         # my expense status
         domain = self._get_action_domain("hr_expense.action_hr_expense_sheet_my_all")
-        expense_ids = self.env["hr.expense.sheet"].search(domain, limit=10).ids
-        self.emp_expense_status_ids = [(6, 0, expense_ids)]
+        data["emp_expense_status_ids"] = (
+            self.env["hr.expense.sheet"].search(domain, limit=10).ids
+        )
 
         # to be approved expenses
         domain = self._get_action_domain(
             "hr_expense.action_hr_expense_sheet_all_to_approve"
         )
-        to_be_approved_expense_ids = (
+        data["emp_expense_to_be_approved_ids"] = (
             self.env["hr.expense.sheet"].search(domain, limit=10).ids
         )
-        self.emp_expense_to_be_approved_ids = [(6, 0, to_be_approved_expense_ids)]
+        return data
 
     def _default_employee(self):
         return self.env.user.employee_id
@@ -276,9 +309,26 @@ class HrEmployeeLandingPage(models.TransientModel):
         """Return the domain of an action as it would be run by the web client"""
         action = self.env.ref(xmlid).sudo()
         eval_context = action._get_eval_context()
-        domain = safe_eval(action.domain, eval_context)
+        return AND(
+            [
+                safe_eval(domain, eval_context)
+                for domain in self._get_action_domain_strings(
+                    xmlid, tuple(self.env.user.groups_id.ids)
+                )
+            ]
+        )
+
+    @api.model
+    @tools.ormcache("xmlid", "group_ids")
+    def _get_action_domain_strings(self, xmlid, group_ids):
+        """
+        Return the unevaluated domains of an action and its default search filters.
+        Cached per action and groups because the search view depends on the groups
+        """
+        action = self.env.ref(xmlid).sudo()
+        eval_context = action._get_eval_context()
         context = safe_eval(action.context, eval_context)
-        extra_domains = []
+        domains = [action.domain or "[]"]
         search_view = etree.fromstring(
             self.env[action.res_model].fields_view_get(
                 action.search_view_id.id, "search"
@@ -289,5 +339,5 @@ class HrEmployeeLandingPage(models.TransientModel):
             if not key.startswith(prefix):
                 continue
             for node in search_view.xpath("//*[@name='%s']" % key[len(prefix) :]):
-                extra_domains.append(safe_eval(node.get("domain", "[]"), eval_context))
-        return AND([domain] + extra_domains)
+                domains.append(node.get("domain", "[]"))
+        return tuple(domains)
@@ -0,0 +1,88 @@
+import json
+
+from odoo import api, fields, models
+
+
+class HrEmployeeLandingPageSnapshot(models.Model):
+    _name = "hr.employee.landing_page.snapshot"
+    _description = "Employee landing page snapshot"
+    _log_access = False
+
+    user_id = fields.Many2one(
+        "res.users", required=True, ondelete="cascade", index=True
+    )
+    date = fields.Date(required=True)
+    data = fields.Text(required=True)
+
+    _sql_constraints = [
+        ("user_id_uniq", "unique (user_id)", "There can only be one snapshot per user")
+    ]
+
+    @api.model
+    def _get_snapshot(self, user):
+        """Return the snapshot data of user if it was taken today, None otherwise"""
+        self.env.cr.execute(
+            "SELECT data FROM hr_employee_landing_page_snapshot "
+            "WHERE user_id=%s AND date=%s",
+            (user.id, fields.Date.context_today(self)),
+        )
+        row = self.env.cr.fetchone()
+        return json.loads(row[0]) if row else None
+
+    @api.model
+    def _set_snapshot(self, user, data):
+        self.env.cr.execute(
+            """
+            INSERT INTO hr_employee_landing_page_snapshot (user_id, date, data)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id) DO UPDATE
+            SET date=EXCLUDED.date, data=EXCLUDED.data
+            """,
+            (user.id, fields.Date.context_today(self), json.dumps(data)),
+        )
+
+    @api.model
+    def _invalidate(self, users):
+        if not users:
+            return
+        self.env.cr.execute(
+            "DELETE FROM hr_employee_landing_page_snapshot WHERE user_id IN %s",
+            (tuple(users.ids),),
+        )
+
+
+class HrEmployeeLandingPageSnapshotMixin(models.AbstractModel):
+    _name = "hr.employee.landing_page.snapshot.mixin"
+    _description = "Invalidate landing page snapshots of affected users on changes"
+
+    # fields whose changes invalidate, None for all fields
+    _landing_page_fields = None
+
+    def _get_landing_page_users(self):
+        """Return the users whose landing page shows data of self"""
+        return self.env["res.users"]
+
+    def _invalidate_landing_page(self, users=None):
+        self.env["hr.employee.landing_page.snapshot"]._invalidate(
+            self.sudo()._get_landing_page_users() | (users or self.env["res.users"])
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_landing_page()
+        return records
+
+    def write(self, vals):
+        if self._landing_page_fields is not None and not (
+            self._landing_page_fields & set(vals)
+        ):
+            return super().write(vals)
+        users = self.sudo()._get_landing_page_users()
+        result = super().write(vals)
+        self._invalidate_landing_page(users)
+        return result
+
+    def unlink(self):
+        self._invalidate_landing_page()
+        return super().unlink()
@@ -0,0 +1,20 @@
+from odoo import models
+
+
+class HrExpenseSheet(models.Model):
+    _name = "hr.expense.sheet"
+    _inherit = ["hr.expense.sheet", "hr.employee.landing_page.snapshot.mixin"]
+
+    def _get_landing_page_users(self):
+        users = (
+            super()._get_landing_page_users()
+            | self.mapped("user_id")
+            | self.mapped("employee_id.user_id")
+            | self.mapped("employee_id.parent_id.user_id")
+            | self.mapped("employee_id.department_id.manager_id.user_id")
+            | self.mapped("employee_id.expense_manager_id")
+        )
+        if self.filtered(lambda x: x.state == "submit"):
+            # sheets to approve are shown to all expense approvers
+            users |= self.env.ref("hr_expense.group_hr_expense_user").users
+        return users
@@ -0,0 +1,17 @@
+from odoo import models
+
+
+class HrLeave(models.Model):
+    _name = "hr.leave"
+    _inherit = ["hr.leave", "hr.employee.landing_page.snapshot.mixin"]
+
+    def _get_landing_page_users(self):
+        return super()._get_landing_page_users() | self.mapped("employee_id.user_id")
+
+
+class HrLeaveAllocation(models.Model):
+    _name = "hr.leave.allocation"
+    _inherit = ["hr.leave.allocation", "hr.employee.landing_page.snapshot.mixin"]
+
+    def _get_landing_page_users(self):
+        return super()._get_landing_page_users() | self.mapped("employee_id.user_id")
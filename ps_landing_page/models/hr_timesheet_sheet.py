@@ -0,0 +1,12 @@
+from odoo import models
+
+
+class HrTimesheetSheet(models.Model):
+    _name = "hr_timesheet.sheet"
+    _inherit = ["hr_timesheet.sheet", "hr.employee.landing_page.snapshot.mixin"]
+
+    def _get_landing_page_users(self):
+        users = super()._get_landing_page_users() | self.mapped("user_id")
+        for this in self.filtered(lambda x: x.state == "confirm"):
+            users |= this._get_possible_reviewers()
+        return users
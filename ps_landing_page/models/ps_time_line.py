@@ -0,0 +1,19 @@
+from odoo import models
+
+
+class PsTimeLine(models.Model):
+    _name = "ps.time.line"
+    _inherit = ["ps.time.line", "hr.employee.landing_page.snapshot.mixin"]
+
+    # fields of time lines the overtime balance on the landing page depends on
+    _landing_page_fields = {
+        "unit_amount",
+        "date",
+        "user_id",
+        "sheet_id",
+        "project_id",
+        "task_id",
+    }
+
+    def _get_landing_page_users(self):
+        return super()._get_landing_page_users() | self.mapped("user_id")
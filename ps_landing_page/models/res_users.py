@@ -0,0 +1,18 @@
+from odoo import models
+
+
+class ResUsers(models.Model):
+    _inherit = "res.users"
+
+    def write(self, vals):
+        result = super().write(vals)
+        # what users see on their landing page depends on their groups and
+        # companies
+        if {"company_id", "company_ids"} & set(vals) or any(
+            name.startswith("in_group_")
+            or name.startswith("sel_groups_")
+            or name == "groups_id"
+            for name in vals
+        ):
+            self.env["hr.employee.landing_page.snapshot"]._invalidate(self)
+        return result
@@ -13,3 +13,50 @@ class TestPsLandingPage(TransactionCase):
         page.action_view_leaves_dashboard()
         page.action_view_timesheet_tree()
         page.action_view_analytic_tree()
+
+    def test_ps_landing_page_snapshot(self):
+        user = self.env.ref("base.user_demo")
+        snapshot_model = self.env["hr.employee.landing_page.snapshot"]
+        snapshot_model._invalidate(user)
+        page = self.env["hr.employee.landing_page"].with_user(user).create({})
+        next_week = page.next_week_id
+        snapshot = snapshot_model._get_snapshot(user)
+        self.assertEqual(snapshot["next_week_id"], next_week)
+        page.invalidate_cache()
+        self.assertEqual(page.next_week_id, next_week)
+        # time lines invalidate on changes of the figures the page shows
+        time_line = self.env["ps.time.line"].search(
+            [("user_id", "=", user.id)], limit=1
+        )
+        time_line.write({"name": "changed"})
+        self.assertTrue(snapshot_model._get_snapshot(user))
+        time_line.write({"unit_amount": time_line.unit_amount + 1})
+        self.assertIsNone(snapshot_model._get_snapshot(user))
+        snapshot_model._set_snapshot(user, snapshot)
+        sheet = self.env["hr_timesheet.sheet"].with_user(user).create({})
+        self.assertIsNone(snapshot_model._get_snapshot(user))
+        snapshot_model._set_snapshot(user, snapshot)
+        sheet.write({"state": "confirm"})
+        self.assertIsNone(snapshot_model._get_snapshot(user))
+        snapshot_model._set_snapshot(user, snapshot)
+        user.employee_id.write({"official_date_of_employment": "2020-01-01"})
+        self.assertIsNone(snapshot_model._get_snapshot(user))
+        snapshot_model._set_snapshot(user, snapshot)
+        manager = user.employee_id.parent_id.user_id
+        if manager:
+            snapshot_model._set_snapshot(manager, snapshot)
+            user.employee_id.write({"parent_id": False})
+            self.assertIsNone(snapshot_model._get_snapshot(manager))
+        snapshot_model._set_snapshot(user, snapshot)
+        user.write({"groups_id": [(4, self.env.ref("base.group_no_one").id)]})
+        self.assertIsNone(snapshot_model._get_snapshot(user))
+        self.assertEqual(
+            page._get_action_domain_strings(
+                "hr_expense.action_hr_expense_sheet_my_all",
+                tuple(user.groups_id.ids),
+            ),
+            page._get_action_domain_strings(
+                "hr_expense.action_hr_expense_sheet_my_all",
+                tuple(user.groups_id.ids),
+            ),
+        )
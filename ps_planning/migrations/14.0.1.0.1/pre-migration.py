@@ -0,0 +1,7 @@
+from odoo.tools import drop_view_if_exists
+
+
+def migrate(cr, version=None):
+    # ps.planning.billing.report used to be a view, now it's a table filled by
+    # _refresh
+    drop_view_if_exists(cr, "ps_planning_billing_report")
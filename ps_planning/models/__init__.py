@@ -1,8 +1,17 @@
 # Copyright 2024 Hunki Enterprises BV
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
 
+from . import date_range
 from . import project_project
 from . import ps_planning_line
+from . import ps_planning_line_day
+from . import ps_planning_work_day
 from . import ps_contracted_line
+from . import ps_invoice
 from . import ps_planning_billing_report
+from . import ps_planning_billing_report_dirty
+from . import ps_time_line
 from . import ps_time_line_planning_report
+from . import ps_time_line_user_total
+from . import resource_calendar_leaves
+from . import task_user
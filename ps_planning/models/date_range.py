@@ -0,0 +1,26 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import api, models
+
+
+class DateRange(models.Model):
+    _inherit = "date.range"
+
+    def _refresh_planning_work_days(self):
+        month_type = self.env.ref("account_fiscal_month.date_range_fiscal_month")
+        self.env["ps.planning.work.day"]._refresh(
+            range_ids=self.filtered(lambda x: x.type_id == month_type).ids
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
+        result._refresh_planning_work_days()
+        return result
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {"type_id", "date_start", "date_end", "company_id"} & set(vals):
+            self.env["ps.planning.work.day"]._refresh(range_ids=self.ids)
+        return result
@@ -14,6 +14,14 @@ class ProjectProject(models.Model):
         "ps.contracted.line", "project_id", string="Contracted lines"
     )
 
+    def write(self, vals):
+        result = super().write(vals)
+        if "user_id" in vals or "partner_id" in vals:
+            self.env["ps.planning.billing.report"]._refresh(
+                project_ids=self.filtered("ps_contracted_line_ids").ids
+            )
+        return result
+
     def _compute_ps_contracted_line_count(self):
         for this in self:
             this.ps_contracted_line_count = len(this.ps_contracted_line_ids)
@@ -21,38 +29,42 @@ class ProjectProject(models.Model):
     def open_ps_contracted_lines(self, products=None, date_from=None, date_to=None):
         PsContractedLine = self.env["ps.contracted.line"]
         Product = self.env["product.product"]
+        all_products = None
+        vals_list = []
         for this in self:
             contracted = this.ps_contracted_line_ids
             if not products and (
                 not contracted.check_access_rights("create", False) or contracted
             ):
                 continue
-            for task in this.task_ids:
-                for product in products or Product.search(
+            if not products and all_products is None:
+                all_products = Product.search(
                     PsContractedLine._fields["product_id"].get_domain_list(
                         PsContractedLine
                     )
-                ):
-                    existing = contracted.filtered_domain(
-                        [
-                            ("project_id", "=", this.id),
-                            ("task_id", "=", task.id),
-                            ("product_id", "=", product.id),
-                            ("date_from", "=", date_from),
-                            ("date_to", "=", date_to),
-                        ]
-                    )
-                    if existing:
-                        continue
-                    PsContractedLine.create(
-                        {
-                            "project_id": this.id,
-                            "task_id": task.id,
-                            "product_id": product.id,
-                            "date_from": date_from,
-                            "date_to": date_to,
-                        }
-                    )
+                )
+            existing = {
+                (line.task_id.id, line.product_id.id)
+                for line in contracted
+                if line.date_from == (date_from or False)
+                and line.date_to == (date_to or False)
+            }
+            missing = {
+                (task.id, product.id)
+                for task in this.task_ids
+                for product in products or all_products
+            } - existing
+            vals_list += [
+                {
+                    "project_id": this.id,
+                    "task_id": task_id,
+                    "product_id": product_id,
+                    "date_from": date_from,
+                    "date_to": date_to,
+                }
+                for task_id, product_id in sorted(missing)
+            ]
+        PsContractedLine.create(vals_list)
 
         return {
             "type": "ir.actions.act_window",
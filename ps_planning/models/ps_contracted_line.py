@@ -1,7 +1,7 @@
 # Copyright 2024 Hunki Enterprises BV
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
 
-from dateutil.relativedelta import SA, SU, relativedelta
+from dateutil.relativedelta import relativedelta
 
 from odoo import _, api, fields, models, tools
 from odoo.exceptions import UserError, ValidationError
@@ -57,77 +57,103 @@ class PsContractedLine(models.Model):
         )
 
     def _create_or_assign_date_range(self):
+        """
+        Assign a contract period range to lines with dates, creating missing ones.
+        Fiscal months are searched once for all periods of self
+        """
         DateRange = self.env["date.range"]
         range_type = self.env.ref("ps_planning.date_range_type_contracted_period")
         month_type = self.env.ref("account_fiscal_month.date_range_fiscal_month")
-        for this in self:
-            if this.date_from and this.date_to:
-                month_date = this.date_from.replace(day=1)
-                while month_date <= this.date_to:
-                    if not DateRange.search(
-                        [
-                            ("date_start", "<=", month_date),
-                            ("date_end", ">=", month_date),
-                            ("type_id", "=", month_type.id),
-                        ]
-                    ):
-                        raise UserError(
-                            _(
-                                "Date range for %s is missing, please contact your "
-                                "administrator"
-                            )
-                            % month_date
+        with_dates = self.filtered(lambda x: x.date_from and x.date_to)
+        periods = sorted({(this.date_from, this.date_to) for this in with_dates})
+        if not periods:
+            return
+        months = DateRange.search(
+            [
+                ("date_start", "<=", max(date_to for date_from, date_to in periods)),
+                ("date_end", ">=", min(date_from for date_from, date_to in periods)),
+                ("type_id", "=", month_type.id),
+            ]
+        )
+        period_ranges = DateRange.search(
+            [
+                ("type_id", "=", range_type.id),
+                ("date_start", "in", [date_from for date_from, date_to in periods]),
+                ("date_end", "in", [date_to for date_from, date_to in periods]),
+            ]
+        )
+        for date_from, date_to in periods:
+            month_date = date_from.replace(day=1)
+            while month_date <= date_to:
+                if not any(
+                    month.date_start <= month_date <= month.date_end for month in months
+                ):
+                    raise UserError(
+                        _(
+                            "Date range for %s is missing, please contact your "
+                            "administrator"
                         )
-                    month_date += relativedelta(months=1)
-                date_range = self._get_date_range()
-                if not date_range:
-                    date_range = DateRange.create(
-                        {
-                            "name": "%s - %s"
-                            % (
-                                tools.format_date(self.env, this.date_from),
-                                tools.format_date(self.env, this.date_to),
-                            ),
-                            "type_id": range_type.id,
-                            "date_start": this.date_from,
-                            "date_end": this.date_to,
-                        }
+                        % month_date
                     )
-                this.range_id = date_range
+                month_date += relativedelta(months=1)
+            date_range = period_ranges.filtered(
+                lambda x: x.date_start == date_from and x.date_end == date_to
+            )
+            if not date_range:
+                date_range = DateRange.create(
+                    {
+                        "name": "%s - %s"
+                        % (
+                            tools.format_date(self.env, date_from),
+                            tools.format_date(self.env, date_to),
+                        ),
+                        "type_id": range_type.id,
+                        "date_start": date_from,
+                        "date_end": date_to,
+                    }
+                )
+            with_dates.filtered(
+                lambda x: x.date_from == date_from and x.date_to == date_to
+            ).write({"range_id": date_range.id})
 
     @api.constrains("project_id", "task_id", "product_id", "range_id")
     def _check_project_id(self):
-        for this in self:
-            if (
-                not this.project_id
-                or not this.task_id
-                or not this.product_id
-                or not this.range_id
-            ):
-                continue
-            if self.search(
-                [
-                    ("project_id", "=", this.project_id.id),
-                    ("task_id", "=", this.task_id.id),
-                    ("product_id", "=", this.product_id.id),
-                    ("range_id", "=", this.range_id.id),
-                    ("id", "!=", this.id),
-                ]
-            ):
+        to_check = self.filtered(
+            lambda x: x.project_id and x.task_id and x.product_id and x.range_id
+        )
+        if not to_check:
+            return
+        others = self.search(
+            [
+                ("project_id", "in", to_check.project_id.ids),
+                ("task_id", "in", to_check.task_id.ids),
+                ("product_id", "in", to_check.product_id.ids),
+                ("range_id", "!=", False),
+            ]
+        )
+        # compare within groups of the same project, task and product only
+        groups = {}
+        for other in others:
+            key = (other.project_id.id, other.task_id.id, other.product_id.id)
+            groups.setdefault(key, []).append(other.id)
+        for this in to_check:
+            same = (
+                self.browse(
+                    groups.get(
+                        (this.project_id.id, this.task_id.id, this.product_id.id), []
+                    )
+                )
+                - this
+            )
+            if same.filtered(lambda x: x.range_id == this.range_id):
                 raise ValidationError(
                     _(
                         "The combination of project, task, product and period must be unique"
                     )
                 )
-            if self.search(
-                [
-                    ("project_id", "=", this.project_id.id),
-                    ("task_id", "=", this.task_id.id),
-                    ("product_id", "=", this.product_id.id),
-                    ("range_id.date_start", "<=", this.range_id.date_end),
-                    ("range_id.date_end", ">=", this.range_id.date_start),
-                    ("id", "!=", this.id),
-                ]
+            if same.filtered(
+                lambda x: x.range_id.date_start <= this.range_id.date_end
+                and x.range_id.date_end >= this.range_id.date_start
             ):
                 raise ValidationError(
                     _("You cannot have overlapping contracts for the same task/product")
@@ -152,10 +178,10 @@ class PsContractedLine(models.Model):
     def _onchange_project_id(self):
         self.task_id = False
 
-    def create(self, vals):
-        result = super().create(vals)
-        if "date_from" in vals or "date_to" in vals:
-            result._create_or_assign_date_range()
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
+        result._create_or_assign_date_range()
         return result
 
     def write(self, vals):
@@ -195,15 +221,19 @@ class PsContractedLine(models.Model):
                     if key in ("task_id", "product_id")
                 }
             )
+        if "rate" in vals:
+            self.env["ps.planning.billing.report"]._refresh(
+                project_ids=self.mapped("project_id").ids
+            )
         return result
 
     def _get_contracted_days_by_month(self):
         months = self.env["ps.planning.wizard"]._get_months(self.range_id)
-        available_work_days = self._get_work_days(self.range_id)
+        work_days = self._get_work_days_batch(self.range_id + months)
+        available_work_days = work_days[0]
         contracted_days_by_month = {
-            month: self.days
-            * round(self._get_work_days(month) / available_work_days, 2)
-            for month in months
+            month: self.days * round(month_work_days / available_work_days, 2)
+            for month, month_work_days in zip(months, work_days[1:])
         }
         contracted_days_by_month[months[-1:]] += self.days - sum(
             contracted_days_by_month.values()
@@ -213,26 +243,15 @@ class PsContractedLine(models.Model):
     def _get_work_days(self, period):
         return self._get_work_days_dates(period.date_start, period.date_end)
 
+    def _get_work_days_batch(self, periods):
+        """Return the number of working days for each of periods"""
+        return self.env["ps.work.calendar"]._count_work_days(
+            [(period.date_start, period.date_end, None) for period in periods],
+            company=self.project_id.company_id[:1] or None,
+        )
+
     def _get_work_days_dates(self, date_start, date_end):
-        start_weekday = date_start.weekday()
-        end_weekday = date_end.weekday()
-        weeks = (
-            (
-                (date_end + relativedelta(weekday=SU))
-                - (
-                    date_start
-                    + (
-                        relativedelta(weekday=SA)
-                        if start_weekday != 6
-                        else relativedelta(days=-1)
-                    )
-                )
-            ).days
-            - 1
-        ) / 7
-        days = weeks * 5
-        if start_weekday < 5:
-            days += 5 - start_weekday
-        if end_weekday < 4:
-            days -= 4 - end_weekday
-        return days
+        return self.env["ps.work.calendar"]._count_work_days(
+            [(date_start, date_end, None)],
+            company=self.project_id.company_id[:1] or None,
+        )[0]
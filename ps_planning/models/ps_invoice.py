@@ -0,0 +1,15 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import models
+
+
+class PsInvoice(models.Model):
+    _inherit = "ps.invoice"
+
+    def _sql_update(self, self_obj, status):
+        # the state is set in SQL, so write() doesn't mark the report dirty
+        result = super()._sql_update(self_obj, status)
+        if self_obj and status and "state" in self_obj._billing_report_fields:
+            self_obj._refresh_billing_report()
+        return result
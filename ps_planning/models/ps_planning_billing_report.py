@@ -1,94 +1,237 @@
 # Copyright 2024 Hunki Enterprises BV
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
 
-from psycopg2.extensions import AsIs
-
-from odoo import fields, models, tools
+from odoo import api, fields, models, tools
 
 
 class PsPlanningBillingReport(models.Model):
     _name = "ps.planning.billing.report"
     _description = "Billing report"
     _order = "project_id, range_id"
-    _auto = False
+    _log_access = False
 
-    project_id = fields.Many2one("project.project")
-    project_user_id = fields.Many2one("res.users")
-    project_partner_id = fields.Many2one("res.partner")
-    range_id = fields.Many2one("date.range")
-    contracted_days = fields.Float()
-    contracted_value = fields.Float()
-    planned_days = fields.Float()
-    planned_value = fields.Float()
-    actual_days = fields.Float()
-    actual_value = fields.Float()
-    billed_days = fields.Float()
-    billed_value = fields.Float()
+    project_id = fields.Many2one("project.project", readonly=True, ondelete="cascade")
+    project_user_id = fields.Many2one("res.users", readonly=True)
+    project_partner_id = fields.Many2one("res.partner", readonly=True)
+    range_id = fields.Many2one("date.range", readonly=True, ondelete="cascade")
+    contracted_days = fields.Float(readonly=True)
+    contracted_value = fields.Float(readonly=True)
+    planned_days = fields.Float(readonly=True)
+    planned_value = fields.Float(readonly=True)
+    actual_days = fields.Float(readonly=True)
+    actual_value = fields.Float(readonly=True)
+    billed_days = fields.Float(readonly=True)
+    billed_value = fields.Float(readonly=True)
 
     def init(self):
-        tools.drop_view_if_exists(self._cr, self._table)
-        self._cr.execute(
+        tools.create_index(
+            self.env.cr,
+            "ps_planning_billing_report_project_range_index",
+            self._table,
+            ["project_id", "range_id"],
+        )
+        self.env.cr.execute("SELECT 1 FROM ps_planning_billing_report LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh()
+
+    @api.model
+    def _refresh(self, project_ids=None, range_ids=None):
+        """
+        Recompute the figures of the given projects and months, all if neither is
+        passed. Only projects with contracted lines are reported, with a row per
+        month with contracted, planned, actual or billed figures
+        """
+        if project_ids is not None and not project_ids:
+            return
+        if range_ids is not None and not range_ids:
+            return
+        for model, field_names in (
+            ("project.project", ["user_id", "partner_id"]),
+            ("ps.contracted.line", ["project_id", "rate"]),
+            (
+                "ps.planning.line",
+                ["line_type", "range_id", "project_id", "days", "contracted_line_id"],
+            ),
+            (
+                "ps.time.line",
+                ["project_id", "date", "unit_amount", "amount", "product_uom_id"],
+            ),
+            (
+                "ps.time.line.user.total",
+                [
+                    "project_id",
+                    "date",
+                    "unit_amount",
+                    "line_fee_rate",
+                    "product_uom_id",
+                    "state",
+                ],
+            ),
+        ):
+            self.env[model].flush(field_names)
+        params = {
+            "month_type_id": self.env.ref(
+                "account_fiscal_month.date_range_fiscal_month"
+            ).id,
+            "uom_hour_id": self.env.ref("uom.product_uom_hour").id,
+            "project_ids": tuple(project_ids or []),
+            "range_ids": tuple(range_ids or []),
+        }
+        delete_clauses = ["TRUE"]
+        project_clause = "TRUE"
+        range_clause = "TRUE"
+        if project_ids is not None:
+            delete_clauses.append("project_id IN %(project_ids)s")
+            project_clause = "project_id IN %(project_ids)s"
+        if range_ids is not None:
+            delete_clauses.append("range_id IN %(range_ids)s")
+            range_clause = "id IN %(range_ids)s"
+        self.env.cr.execute(
+            "DELETE FROM ps_planning_billing_report WHERE "
+            + " AND ".join(delete_clauses),
+            params,
+        )
+        self.env.cr.execute(
             """
-            CREATE view %s as
-                WITH xmlids AS (
-                    SELECT res_id as product_uom_hour from ir_model_data
-                    WHERE module='uom' and name='product_uom_hour'
-                )
+            INSERT INTO ps_planning_billing_report (
+                project_id, range_id, project_user_id, project_partner_id,
+                contracted_days, contracted_value, planned_days, planned_value,
+                actual_days, actual_value, billed_days, billed_value
+            )
+            WITH months AS (
+                SELECT id, date_start, date_end
+                FROM date_range
+                WHERE type_id = %(month_type_id)s AND """
+            + range_clause
+            + """
+            ),
+            projects AS (
+                SELECT DISTINCT project_id AS id
+                FROM ps_contracted_line
+                WHERE """
+            + project_clause
+            + """
+            ),
+            planning AS (
                 SELECT
-                min(ps_planning_line_planned.id) as id,
-                ps_contracted_line.project_id,
-                ps_planning_line_planned.range_id,
-                max(project_project.partner_id) as project_partner_id,
-                max(project_project.user_id) as project_user_id,
-                (
-                    select sum(days)
-                    from ps_planning_line
-                    where line_type='contracted'
-                    and project_id=ps_contracted_line.project_id
-                    and range_id=ps_planning_line_planned.range_id
-                ) as contracted_days,
-                (
-                    select sum(ps_planning_line.days * ps_contracted_line.rate)
-                    from ps_planning_line
-                    join ps_contracted_line
-                    on ps_planning_line.contracted_line_id = ps_contracted_line.id
-                    where line_type='contracted'
-                    and ps_planning_line.project_id=ps_contracted_line.project_id
-                    and ps_planning_line.range_id=ps_planning_line_planned.range_id
-                ) as contracted_value,
-                sum(ps_planning_line_planned.days) as planned_days,
-                sum(
-                    ps_planning_line_planned.days * ps_contracted_line.rate
-                ) as planned_value,
-                (
-                    select sum(unit_amount) / 8
-                    from ps_time_line
-                    where
-                    product_uom_id=(select product_uom_hour from xmlids)
-                    and project_id=ps_contracted_line.project_id
-                    and date >= date_range.date_start
-                    and date <= date_range.date_end
-                ) as actual_days,
-                0 as actual_value,
-                0 as billed_days,
-                0 as billed_value
-                FROM
-                ps_contracted_line
-                JOIN
-                ps_planning_line ps_planning_line_planned
-                ON ps_planning_line_planned.contracted_line_id=ps_contracted_line.id
-                AND ps_planning_line_planned.line_type='planned'
-                JOIN
-                project_project
-                ON ps_contracted_line.project_id=project_project.id
-                JOIN
-                date_range
-                ON ps_planning_line_planned.range_id=date_range.id
-                GROUP BY
-                ps_contracted_line.project_id,
-                ps_planning_line_planned.range_id,
-                date_range.date_start,
-                date_range.date_end
-        """,
-            (AsIs(self._table),),
+                    ppl.project_id,
+                    ppl.range_id,
+                    sum(CASE WHEN ppl.line_type = 'contracted' THEN ppl.days END)
+                    AS contracted_days,
+                    sum(CASE WHEN ppl.line_type = 'contracted'
+                        THEN ppl.days * pcl.rate END)
+                    AS contracted_value,
+                    sum(CASE WHEN ppl.line_type = 'planned' THEN ppl.days END)
+                    AS planned_days,
+                    sum(CASE WHEN ppl.line_type = 'planned'
+                        THEN ppl.days * pcl.rate END)
+                    AS planned_value
+                FROM ps_planning_line ppl
+                JOIN ps_contracted_line pcl ON pcl.id = ppl.contracted_line_id
+                JOIN projects ON projects.id = ppl.project_id
+                JOIN months ON months.id = ppl.range_id
+                GROUP BY ppl.project_id, ppl.range_id
+            ),
+            actual AS (
+                SELECT
+                    ptl.project_id,
+                    months.id AS range_id,
+                    sum(ptl.unit_amount) / 8 AS actual_days,
+                    -sum(ptl.amount) AS actual_value
+                FROM ps_time_line ptl
+                JOIN projects ON projects.id = ptl.project_id
+                JOIN months ON ptl.date BETWEEN months.date_start AND months.date_end
+                WHERE ptl.product_uom_id = %(uom_hour_id)s
+                GROUP BY ptl.project_id, months.id
+            ),
+            billed AS (
+                SELECT
+                    ptlut.project_id,
+                    months.id AS range_id,
+                    sum(ptlut.unit_amount) / 8 AS billed_days,
+                    sum(ptlut.unit_amount * ptlut.line_fee_rate) AS billed_value
+                FROM ps_time_line_user_total ptlut
+                JOIN projects ON projects.id = ptlut.project_id
+                JOIN months ON ptlut.date BETWEEN months.date_start
+                    AND months.date_end
+                WHERE ptlut.state = 'invoiced'
+                AND ptlut.product_uom_id = %(uom_hour_id)s
+                GROUP BY ptlut.project_id, months.id
+            ),
+            project_months AS (
+                SELECT project_id, range_id FROM planning
+                UNION
+                SELECT project_id, range_id FROM actual
+                UNION
+                SELECT project_id, range_id FROM billed
+            )
+            SELECT
+                project_months.project_id,
+                project_months.range_id,
+                pp.user_id,
+                pp.partner_id,
+                coalesce(planning.contracted_days, 0),
+                coalesce(planning.contracted_value, 0),
+                coalesce(planning.planned_days, 0),
+                coalesce(planning.planned_value, 0),
+                coalesce(actual.actual_days, 0),
+                coalesce(actual.actual_value, 0),
+                coalesce(billed.billed_days, 0),
+                coalesce(billed.billed_value, 0)
+            FROM project_months
+            JOIN project_project pp ON pp.id = project_months.project_id
+            LEFT JOIN planning USING (project_id, range_id)
+            LEFT JOIN actual USING (project_id, range_id)
+            LEFT JOIN billed USING (project_id, range_id)
+            """,
+            params,
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _mark_dirty(self, project_ids, dates):
+        """
+        Mark the figures of projects for the months containing dates to be
+        recomputed by _refresh_dirty. This is for changes of time lines, which
+        happen too often and one by one to recompute the figures right away
+        """
+        if not project_ids or not dates:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO ps_planning_billing_report_dirty (project_id, range_id)
+            SELECT project_id, dr.id
+            FROM unnest(%s::int[]) AS project_id
+            CROSS JOIN date_range dr
+            WHERE dr.type_id = %s AND dr.date_start <= %s AND dr.date_end >= %s
+            ON CONFLICT DO NOTHING
+            """,
+            (
+                list(project_ids),
+                self.env.ref("account_fiscal_month.date_range_fiscal_month").id,
+                max(dates),
+                min(dates),
+            ),
+        )
+
+    @api.model
+    def _refresh_dirty(self):
+        """Recompute the figures marked by _mark_dirty in one go"""
+        self.env.cr.execute(
+            "DELETE FROM ps_planning_billing_report_dirty "
+            "RETURNING project_id, range_id"
+        )
+        rows = self.env.cr.fetchall()
+        if rows:
+            self._refresh(
+                project_ids=list({row[0] for row in rows}),
+                range_ids=list({row[1] for row in rows}),
+            )
+
+    @api.model
+    def action_open_report(self):
+        """Bring the figures marked dirty up to date and open the report"""
+        self.sudo()._refresh_dirty()
+        return self.env["ir.actions.actions"]._for_xml_id(
+            "ps_planning.action_ps_planning_billing_report"
         )
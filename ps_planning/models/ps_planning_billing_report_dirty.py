@@ -0,0 +1,21 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import fields, models
+
+
+class PsPlanningBillingReportDirty(models.Model):
+    _name = "ps.planning.billing.report.dirty"
+    _description = "Billing report figures to recompute"
+    _log_access = False
+
+    project_id = fields.Many2one("project.project", required=True, ondelete="cascade")
+    range_id = fields.Many2one("date.range", required=True, ondelete="cascade")
+
+    _sql_constraints = [
+        (
+            "project_range_uniq",
+            "unique (project_id, range_id)",
+            "Projects can only be marked once per month",
+        )
+    ]
@@ -1,7 +1,7 @@
 # Copyright 2024 Hunki Enterprises BV
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class PsPlanningLine(models.Model):
@@ -36,3 +36,42 @@ class PsPlanningLine(models.Model):
             "The combination of range, task, product and employee must be unique",
         )
     ]
+
+    def _refresh_billing_report(self, project_ids=(), range_ids=()):
+        self.env["ps.planning.billing.report"]._refresh(
+            project_ids=list(set(project_ids) | set(self.mapped("project_id").ids)),
+            range_ids=list(set(range_ids) | set(self.mapped("range_id").ids)),
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
+        if self.env.context.get("ps_planning_no_refresh"):
+            return result
+        self.env["ps.planning.line.day"]._refresh(line_ids=result.ids)
+        result._refresh_billing_report()
+        return result
+
+    def write(self, vals):
+        if self.env.context.get("ps_planning_no_refresh") or not {
+            "line_type",
+            "range_id",
+            "task_id",
+            "employee_id",
+            "days",
+            "contracted_line_id",
+        } & set(vals):
+            return super().write(vals)
+        project_ids = self.mapped("project_id").ids
+        range_ids = self.mapped("range_id").ids
+        result = super().write(vals)
+        self.env["ps.planning.line.day"]._refresh(line_ids=self.ids)
+        self._refresh_billing_report(project_ids, range_ids)
+        return result
+
+    def unlink(self):
+        project_ids = self.mapped("project_id").ids
+        range_ids = self.mapped("range_id").ids
+        result = super().unlink()
+        self.browse([])._refresh_billing_report(project_ids, range_ids)
+        return result
@@ -0,0 +1,101 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import api, fields, models, tools
+
+
+class PsPlanningLineDay(models.Model):
+    _name = "ps.planning.line.day"
+    _description = "Planning entry spread over working days"
+    _log_access = False
+    _order = "date"
+
+    planning_line_id = fields.Many2one(
+        "ps.planning.line",
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete="cascade",
+    )
+    line_type = fields.Selection(
+        [("contracted", "Contracted"), ("planned", "Planned")], readonly=True
+    )
+    range_id = fields.Many2one("date.range", readonly=True, ondelete="cascade")
+    project_id = fields.Many2one("project.project", readonly=True)
+    task_id = fields.Many2one("project.task", readonly=True)
+    employee_id = fields.Many2one("hr.employee", readonly=True)
+    date = fields.Date(readonly=True)
+    days = fields.Float(readonly=True)
+
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "ps_planning_line_day_project_date_index",
+            self._table,
+            ["project_id", "date"],
+        )
+        tools.create_index(
+            self.env.cr,
+            "ps_planning_line_day_range_index",
+            self._table,
+            ["range_id"],
+        )
+
+    @api.model
+    def _refresh(self, line_ids=None, range_ids=None):
+        """
+        Spread the days of the given planning lines, or the planning lines of the
+        given months, evenly over the working days of their month. Everything is
+        spread if neither is passed
+        """
+        if line_ids is not None and not line_ids:
+            return
+        if range_ids is not None and not range_ids:
+            return
+        self.env["ps.planning.line"].flush(
+            ["line_type", "range_id", "project_id", "task_id", "employee_id", "days"]
+        )
+        params = {
+            "line_ids": tuple(line_ids or []),
+            "range_ids": tuple(range_ids or []),
+        }
+        delete_clauses = ["TRUE"]
+        select_clauses = ["TRUE"]
+        if line_ids is not None:
+            delete_clauses.append("planning_line_id IN %(line_ids)s")
+            select_clauses.append("ppl.id IN %(line_ids)s")
+        if range_ids is not None:
+            delete_clauses.append("range_id IN %(range_ids)s")
+            select_clauses.append("ppl.range_id IN %(range_ids)s")
+        self.env.cr.execute(
+            "DELETE FROM ps_planning_line_day WHERE " + " AND ".join(delete_clauses),
+            params,
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO ps_planning_line_day (
+                planning_line_id, line_type, range_id, project_id, task_id,
+                employee_id, date, days
+            )
+            WITH work_day_count AS (
+                SELECT range_id, count(*) work_days
+                FROM ps_planning_work_day
+                GROUP BY range_id
+            )
+            SELECT
+                ppl.id,
+                ppl.line_type,
+                ppl.range_id,
+                ppl.project_id,
+                ppl.task_id,
+                ppl.employee_id,
+                ppwd.date,
+                ppl.days / work_day_count.work_days
+            FROM ps_planning_line ppl
+            JOIN work_day_count ON work_day_count.range_id = ppl.range_id
+            JOIN ps_planning_work_day ppwd ON ppwd.range_id = ppl.range_id
+            WHERE """
+            + " AND ".join(select_clauses),
+            params,
+        )
+        self.invalidate_cache()
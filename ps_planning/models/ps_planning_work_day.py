@@ -0,0 +1,95 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import api, fields, models, tools
+
+
+class PsPlanningWorkDay(models.Model):
+    _name = "ps.planning.work.day"
+    _description = "Working day of a fiscal month"
+    _log_access = False
+    _order = "date"
+
+    date = fields.Date(required=True, readonly=True)
+    range_id = fields.Many2one(
+        "date.range", required=True, readonly=True, ondelete="cascade"
+    )
+
+    def init(self):
+        """Filling the working days spreads the planning too"""
+        tools.create_index(
+            self.env.cr,
+            "ps_planning_work_day_range_date_index",
+            self._table,
+            ["range_id", "date"],
+        )
+        self.env.cr.execute("SELECT 1 FROM ps_planning_work_day LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh()
+
+    @api.model
+    def _refresh(self, range_ids=None):
+        """
+        Recreate the working days of the given fiscal months, all months if none
+        are passed. Working days are week days not covered by a public holiday of
+        the company of the month, the planning spread over the months is updated
+        accordingly
+        """
+        if range_ids is not None and not range_ids:
+            return
+        self.env["date.range"].flush(
+            ["type_id", "date_start", "date_end", "company_id"]
+        )
+        self.env["resource.calendar.leaves"].flush(
+            ["resource_id", "company_id", "calendar_id", "date_from", "date_to"]
+        )
+        params = {
+            "month_type_id": self.env.ref(
+                "account_fiscal_month.date_range_fiscal_month"
+            ).id,
+            "range_ids": tuple(range_ids or []),
+        }
+        delete_clause = "TRUE"
+        select_clause = "TRUE"
+        if range_ids is not None:
+            delete_clause = "range_id IN %(range_ids)s"
+            select_clause = "dr.id IN %(range_ids)s"
+        self.env.cr.execute(
+            "DELETE FROM ps_planning_work_day WHERE " + delete_clause, params
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO ps_planning_work_day (date, range_id)
+            SELECT month_day::date, dr.id
+            FROM date_range dr
+            CROSS JOIN LATERAL generate_series(
+                dr.date_start, dr.date_end, '1day'
+            ) month_day
+            WHERE dr.type_id = %(month_type_id)s
+            AND """
+            + self.env["ps.work.calendar"]._get_work_day_sql(
+                "month_day::date", "dr.company_id"
+            )
+            + """
+            AND """
+            + select_clause,
+            params,
+        )
+        self.invalidate_cache()
+        self.env["ps.planning.line.day"]._refresh(range_ids=range_ids)
+
+    @api.model
+    def _refresh_dates(self, date_from, date_to):
+        """Recreate the working days of fiscal months overlapping a period"""
+        months = self.env["date.range"].search(
+            [
+                (
+                    "type_id",
+                    "=",
+                    self.env.ref("account_fiscal_month.date_range_fiscal_month").id,
+                ),
+                ("date_start", "<=", date_to),
+                ("date_end", ">=", date_from),
+            ]
+        )
+        self._refresh(range_ids=months.ids)
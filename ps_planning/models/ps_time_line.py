@@ -0,0 +1,45 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import api, models
+
+
+class PsTimeLine(models.Model):
+    _inherit = "ps.time.line"
+
+    _billing_report_fields = {
+        "project_id",
+        "task_id",
+        "date",
+        "unit_amount",
+        "amount",
+        "product_uom_id",
+    }
+
+    def _refresh_billing_report(self, project_ids=(), dates=()):
+        self.env["ps.planning.billing.report"]._mark_dirty(
+            set(project_ids) | set(self.mapped("project_id").ids),
+            set(dates) | set(self.mapped("date")),
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
+        result._refresh_billing_report()
+        return result
+
+    def write(self, vals):
+        if not self._billing_report_fields & set(vals):
+            return super().write(vals)
+        project_ids = self.mapped("project_id").ids
+        dates = self.mapped("date")
+        result = super().write(vals)
+        self._refresh_billing_report(project_ids, dates)
+        return result
+
+    def unlink(self):
+        project_ids = self.mapped("project_id").ids
+        dates = self.mapped("date")
+        result = super().unlink()
+        self.browse([])._refresh_billing_report(project_ids, dates)
+        return result
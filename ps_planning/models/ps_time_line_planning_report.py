@@ -20,12 +20,16 @@ class PsTimeLinePlanningReport(models.Model):
     days_contracted = fields.Float()
 
     def init(self):
+        """
+        Contracted and planned days come pre-spread over the working days of their
+        month from ps.planning.line.day, ids are made distinct per source
+        """
         tools.drop_view_if_exists(self._cr, self._table)
         self._cr.execute(
             """
             CREATE view %s as
             SELECT
-                id,
+                id * 2 as id,
                 project_id,
                 task_id,
                 employee_id,
@@ -34,58 +38,19 @@ class PsTimeLinePlanningReport(models.Model):
                 0 as days_planned,
                 0 as days_contracted
             FROM ps_time_line
-            UNION (
-            WITH
-            xmlid_month_range AS (
-                SELECT res_id FROM ir_model_data
-                WHERE module='account_fiscal_month' AND name='date_range_fiscal_month'
-            ),
-            month_days AS (
-                SELECT generate_series(date_start, date_end, '1day')::date month_day,
-                date_range.id range_id FROM date_range, xmlid_month_range
-                WHERE date_range.type_id=xmlid_month_range.res_id
-            ),
-            work_days AS (
-                SELECT month_day, range_id FROM month_days
-                WHERE extract(isodow from month_day) < 6
-            ),
-            work_day_count AS (
-                SELECT count(month_day) work_days, range_id FROM work_days GROUP BY range_id
-            )
+            UNION ALL
             SELECT
-                id,
+                id * 2 + 1 as id,
                 project_id,
                 task_id,
                 employee_id,
-                work_days.month_day,
-                0 as days_actual,
-                0 as days_planned,
-                days / work_day_count.work_days as days_contracted
-            FROM ps_planning_line, work_days, work_day_count
-            WHERE
-            ps_planning_line.range_id=work_days.range_id
-            AND
-            ps_planning_line.range_id=work_day_count.range_id
-            AND
-            ps_planning_line.line_type='contracted'
-            UNION
-            SELECT
-                id,
-                project_id,
-                task_id,
-                employee_id,
-                work_days.month_day,
+                date,
                 0 as days_actual,
-                days / work_day_count.work_days as days_planned,
-                0 as days_contracted
-            FROM ps_planning_line, work_days, work_day_count
-            WHERE
-            ps_planning_line.range_id=work_days.range_id
-            AND
-            ps_planning_line.range_id=work_day_count.range_id
-            AND
-            ps_planning_line.line_type='planned'
-            )
+                CASE WHEN line_type = 'planned' THEN days ELSE 0 END
+                as days_planned,
+                CASE WHEN line_type = 'contracted' THEN days ELSE 0 END
+                as days_contracted
+            FROM ps_planning_line_day
         """,
             (AsIs(self._table),),
         )
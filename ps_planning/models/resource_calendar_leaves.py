@@ -0,0 +1,54 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from datetime import timedelta
+
+from odoo import api, models
+
+
+class ResourceCalendarLeaves(models.Model):
+    _inherit = "resource.calendar.leaves"
+
+    def _get_public_holiday_period(self):
+        """
+        Return the dates covered by the public holidays in self, widened by a day
+        on each side as the datetimes are in UTC
+        """
+        public_holidays = self.filtered(lambda x: not x.resource_id)
+        if not public_holidays:
+            return None
+        return (
+            min(public_holidays.mapped("date_from")).date() - timedelta(days=1),
+            max(public_holidays.mapped("date_to")).date() + timedelta(days=1),
+        )
+
+    def _refresh_planning_work_days(self, period):
+        if period:
+            self.env["ps.planning.work.day"]._refresh_dates(*period)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
+        result._refresh_planning_work_days(result._get_public_holiday_period())
+        return result
+
+    def write(self, vals):
+        if not {
+            "resource_id",
+            "company_id",
+            "calendar_id",
+            "date_from",
+            "date_to",
+        } & set(vals):
+            return super().write(vals)
+        period_before = self._get_public_holiday_period()
+        result = super().write(vals)
+        self._refresh_planning_work_days(period_before)
+        self._refresh_planning_work_days(self._get_public_holiday_period())
+        return result
+
+    def unlink(self):
+        period = self._get_public_holiday_period()
+        result = super().unlink()
+        self._refresh_planning_work_days(period)
+        return result
@@ -0,0 +1,27 @@
+# Copyright 2024 Hunki Enterprises BV
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl-3.0)
+
+from odoo import models
+
+
+class TaskUser(models.Model):
+    _inherit = "task.user"
+
+    def update_ps_time_lines(self):
+        result = super().update_ps_time_lines()
+        # the fee rate and amount of time lines are set in SQL, so write()
+        # doesn't mark the report dirty
+        self.env["ps.time.line"].flush(["task_id", "user_id", "date"])
+        self.env.cr.execute(
+            """
+            SELECT max(date) FROM ps_time_line
+            WHERE task_id = %s AND user_id = %s AND date >= %s
+            """,
+            (self.task_id.id, self.user_id.id, self.from_date),
+        )
+        last_date = self.env.cr.fetchone()[0]
+        if last_date:
+            self.env["ps.planning.billing.report"]._mark_dirty(
+                self.task_id.project_id.ids, [self.from_date, last_date]
+            )
+        return result
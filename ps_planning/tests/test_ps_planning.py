@@ -1,6 +1,11 @@
-from odoo.exceptions import UserError, ValidationError
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.exceptions import AccessError, UserError, ValidationError
 from odoo.tests.common import Form, TransactionCase
 
+from odoo.addons.ps_timesheet_invoicing.tests.test_ps_invoice import TestPsInvoiceBase
+
 
 class TestPsPlanning(TransactionCase):
     def setUp(self):
@@ -66,6 +71,8 @@ class TestPsPlanning(TransactionCase):
             }
         )
         wizard.action_start_planning()
+        # only employees with planning lines get a row
+        self.assertFalse(wizard.line_ids.filtered(lambda x: x.line_type == "planned"))
         wizard.write(
             {
                 "add_line_task_id": self.task1.id,
@@ -93,6 +100,74 @@ class TestPsPlanning(TransactionCase):
         product1_task1_planning_line1 = product1_task1_wizard_line1.planning_line_id
         self.assertEqual(product1_task1_planning_line1.days, 42)
 
+    def test_commit_planning(self):
+        self.test_planning_lines()
+        wizard = self.env["ps.planning.wizard"].search(
+            [("project_id", "=", self.project.id)], limit=1, order="id desc"
+        )
+        planned = wizard.line_ids.filtered(
+            lambda x: x.line_type == "planned" and x.planning_line_id
+        )
+        self.assertEqual(len(planned), 1)
+        planning_line = planned.planning_line_id
+        other_month = (
+            wizard.line_ids.filtered(
+                lambda x: x.line_type == "planned" and not x.planning_line_id
+            )
+        )[:1]
+        other_month.days = 2
+        planned.days = 21
+        wizard.action_commit_planning()
+        self.assertEqual(planning_line.days, 21)
+        self.assertTrue(other_month.planning_line_id)
+        self.assertEqual(other_month.planning_line_id.days, 2)
+        self.assertEqual(other_month.planning_line_id.project_id, self.project)
+        self.assertEqual(
+            sum(
+                self.env["ps.planning.line.day"]
+                .search([("planning_line_id", "=", planning_line.id)])
+                .mapped("days")
+            ),
+            21,
+        )
+        planned.days = 0
+        wizard.action_commit_planning()
+        self.assertFalse(planning_line.exists())
+        self.assertFalse(planned.planning_line_id)
+
+    def test_commit_planning_access(self):
+        self.test_planning_lines()
+        user = self.env["res.users"].create(
+            {
+                "name": "C&P user",
+                "login": "ps_planning_user",
+                "groups_id": [
+                    (6, 0, self.env.ref("base.group_user").ids),
+                    (4, self.env.ref("project.group_project_user").id),
+                    (4, self.env.ref("ps_planning.group_user").id),
+                ],
+            }
+        )
+        wizard = (
+            self.env["ps.planning.wizard"]
+            .with_user(user)
+            .create(
+                {
+                    "project_id": self.project.id,
+                    "period_id": self.project.ps_contracted_line_ids.range_id.id,
+                }
+            )
+        )
+        wizard.action_start_planning()
+        planned = wizard.line_ids.filtered(
+            lambda x: x.line_type == "planned" and x.planning_line_id
+        )
+        self.assertEqual(len(planned), 1)
+        planned.days = 21
+        with self.assertRaises(AccessError):
+            wizard.action_commit_planning()
+        self.assertEqual(planned.planning_line_id.sudo().days, 42)
+
     def test_change_contracted_lines(self):
         self.test_contract_lines()
         self.test_planning_lines()
@@ -124,11 +199,164 @@ class TestPsPlanning(TransactionCase):
         self.test_contract_lines()
         self.test_planning_lines()
         wizard = self.env["ps.planning.report.wizard"].create({})
-        wizard.action_open_report()
-        # TODO assert things
+        action = wizard.action_open_report()
+        report_line = self.env[action["res_model"]].search(
+            action["domain"] + [("project_id", "=", self.project.id)]
+        )
+        self.assertEqual(len(report_line), 1)
+        self.assertEqual(report_line.days_actual_mtd, 0)
+        self.assertEqual(report_line.budget_utilization, 0)
+        self.env[action["res_model"]].fields_view_get(view_type="search")
 
-        self.env["ps.planning.billing.report"].search([])
-        # TODO assert things
+        billing_report = self.env["ps.planning.billing.report"].search(
+            [("project_id", "=", self.project.id)]
+        )
+        planning_lines = self.project.ps_contracted_line_ids.planning_line_ids
+        self.assertAlmostEqual(
+            sum(billing_report.mapped("planned_days")),
+            sum(
+                planning_lines.filtered(lambda x: x.line_type == "planned").mapped(
+                    "days"
+                )
+            ),
+        )
+        self.assertAlmostEqual(
+            sum(billing_report.mapped("contracted_days")),
+            sum(
+                planning_lines.filtered(lambda x: x.line_type == "contracted").mapped(
+                    "days"
+                )
+            ),
+        )
+        planning_lines.filtered(lambda x: x.line_type == "planned").unlink()
+        billing_report = self.env["ps.planning.billing.report"].search(
+            [("project_id", "=", self.project.id)]
+        )
+        self.assertFalse(sum(billing_report.mapped("planned_days")))
+        BillingReport = self.env["ps.planning.billing.report"]
+        Dirty = self.env["ps.planning.billing.report.dirty"]
+        BillingReport._mark_dirty(
+            [self.project.id], [billing_report[:1].range_id.date_start]
+        )
+        self.assertTrue(Dirty.search([("project_id", "=", self.project.id)]))
+        # searching leaves refreshing to the cron and opening the report
+        BillingReport.search([("project_id", "=", self.project.id)])
+        self.assertTrue(Dirty.search([("project_id", "=", self.project.id)]))
+        action = BillingReport.action_open_report()
+        self.assertEqual(action["res_model"], BillingReport._name)
+        self.assertFalse(Dirty.search([]))
 
         self.env["ps.time.line.planning.report"].search([])
         # TODO assert things
+
+    def test_report_department_filters(self):
+        """Test that new departments show up as filters of the report"""
+        Line = self.env["ps.planning.report.wizard.line"]
+        Line.fields_view_get(view_type="search")
+        department = self.env["hr.department"].create({"name": "Planning filter"})
+        self.assertIn(
+            'string="Planning filter"',
+            Line.fields_view_get(view_type="search")["arch"],
+        )
+        department.write({"name": "Renamed filter"})
+        self.assertIn(
+            'string="Renamed filter"',
+            Line.fields_view_get(view_type="search")["arch"],
+        )
+
+    def test_planning_work_days(self):
+        self.test_contract_lines()
+        self.test_planning_lines()
+        planned_line = self.env["ps.planning.line"].search(
+            [
+                ("project_id", "=", self.project.id),
+                ("line_type", "=", "planned"),
+                ("employee_id", "=", self.employee.id),
+            ],
+            limit=1,
+        )
+        month = planned_line.range_id
+        work_days = self.env["ps.planning.work.day"].search(
+            [("range_id", "=", month.id)]
+        )
+        self.assertTrue(work_days)
+        self.assertFalse(work_days.filtered(lambda x: x.date.weekday() > 4))
+        line_days = self.env["ps.planning.line.day"].search(
+            [("planning_line_id", "=", planned_line.id)]
+        )
+        self.assertEqual(len(line_days), len(work_days))
+        self.assertAlmostEqual(sum(line_days.mapped("days")), planned_line.days)
+
+        holiday = work_days[0].date
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Public holiday",
+                "calendar_id": self.env.company.resource_calendar_id.id,
+                "company_id": self.env.company.id,
+                "date_from": fields.Datetime.to_datetime(holiday).replace(hour=10),
+                "date_to": fields.Datetime.to_datetime(holiday).replace(hour=14),
+            }
+        )
+        work_days = self.env["ps.planning.work.day"].search(
+            [("range_id", "=", month.id)]
+        )
+        self.assertNotIn(holiday, work_days.mapped("date"))
+        line_days = self.env["ps.planning.line.day"].search(
+            [("planning_line_id", "=", planned_line.id)]
+        )
+        self.assertEqual(len(line_days), len(work_days))
+        self.assertAlmostEqual(sum(line_days.mapped("days")), planned_line.days)
+
+        report_lines = self.env["ps.time.line.planning.report"].search(
+            [
+                ("project_id", "=", self.project.id),
+                ("employee_id", "=", self.employee.id),
+            ]
+        )
+        self.assertAlmostEqual(
+            sum(report_lines.mapped("days_planned")), planned_line.days
+        )
+
+
+class TestPsPlanningBilling(TestPsInvoiceBase):
+    def test_billing_report_invoiced(self):
+        """Test that posting an invoice updates the billed figures"""
+        month_type = self.env.ref("account_fiscal_month.date_range_fiscal_month")
+        date = self.ps_line.date
+        if not self.env["date.range"].search(
+            [
+                ("type_id", "=", month_type.id),
+                ("date_start", "<=", date),
+                ("date_end", ">=", date),
+            ]
+        ):
+            self.env["date.range"].create(
+                {
+                    "name": "Billing %s" % date,
+                    "type_id": month_type.id,
+                    "date_start": date.replace(day=1),
+                    "date_end": date + relativedelta(day=31),
+                }
+            )
+        self.env["ps.contracted.line"].create(
+            {
+                "project_id": self.ps_line.project_id.id,
+                "task_id": self.ps_line.task_id.id,
+                "product_id": self.env.ref("ps_planning.planning_product1").id,
+            }
+        )
+        BillingReport = self.env["ps.planning.billing.report"]
+        BillingReport._refresh(project_ids=self.ps_line.project_id.ids)
+        domain = [("project_id", "=", self.ps_line.project_id.id)]
+        self.assertFalse(sum(BillingReport.search(domain).mapped("billed_value")))
+        self.ps_invoice.invoice_id.action_post()
+        user_totals = self.ps_invoice.user_total_ids.filtered(
+            lambda x: x.state == "invoiced"
+            and x.product_uom_id == self.env.ref("uom.product_uom_hour")
+        )
+        billed_value = sum(x.unit_amount * x.line_fee_rate for x in user_totals)
+        self.assertTrue(billed_value)
+        BillingReport._refresh_dirty()
+        self.assertAlmostEqual(
+            sum(BillingReport.search(domain).mapped("billed_value")), billed_value
+        )
@@ -5,7 +5,7 @@ import json
 
 from lxml import etree
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 
 
 class PsPlanningReportWizard(models.TransientModel):
@@ -15,12 +15,19 @@ class PsPlanningReportWizard(models.TransientModel):
 
     reference_date = fields.Date(default=fields.Date.context_today, required=True)
 
+    def _get_grouped_days(self, model, domain, field="days", factor=1):
+        """Return a dict project id -> sum of field for records matching domain"""
+        return {
+            group["project_id"][0]: group[field] * factor
+            for group in self.env[model].read_group(
+                domain + [("project_id", "!=", False)],
+                ["project_id", field],
+                ["project_id"],
+            )
+        }
+
     def action_open_report(self):
-        i = 0
         Line = self.env["ps.planning.report.wizard.line"]
-        PlanningLine = self.env["ps.planning.line"]
-        ContractedLine = self.env["ps.contracted.line"]
-        TimeLine = self.env["ps.time.line"]
         month_type = self.env.ref("account_fiscal_month.date_range_fiscal_month")
         month = self.env["date.range"].search(
             [
@@ -29,86 +36,83 @@ class PsPlanningReportWizard(models.TransientModel):
                 ("type_id", "=", month_type.id),
             ]
         )
+        year_start = month.date_start.replace(month=1, day=1)
         uom_hours = self.env.ref("uom.product_uom_hour")
-        _get_work_days = ContractedLine._get_work_days_dates
-        mtd_fraction = _get_work_days(
-            self.reference_date.replace(day=1), self.reference_date
-        ) / _get_work_days(month.date_start, month.date_end)
-        for project in self.env["project.project"].search(
+        work_days_mtd, work_days_month = self.env["ps.work.calendar"]._count_work_days(
+            [
+                (month.date_start, self.reference_date, None),
+                (month.date_start, month.date_end, None),
+            ]
+        )
+        mtd_fraction = work_days_mtd / work_days_month if work_days_month else 0
+        projects = self.env["project.project"].search(
             [("ps_contracted_line_ids", "!=", False)]
-        ):
-            vals = {
-                "wizard_id": self.id,
-                "sequence": i,
-                "business_line": project.department_id.name,
-                "department_id": project.department_id.id,
-                "project_id": project.id,
-                "project_name": project.name,
-                "project_code": project.code,
-                "days_commercial_full_month": sum(
-                    PlanningLine.search(
-                        [
-                            ("range_id", "=", month.id),
-                            ("task_id.project_id", "=", project.id),
-                            ("line_type", "=", "contracted"),
-                        ]
-                    ).mapped("days")
-                ),
-                "days_planned_full_month": sum(
-                    PlanningLine.search(
-                        [
-                            ("range_id", "=", month.id),
-                            ("task_id.project_id", "=", project.id),
-                            ("line_type", "=", "planned"),
-                        ]
-                    ).mapped("days")
-                ),
-                "days_actual_mtd": sum(
-                    TimeLine.search(
-                        [
-                            ("task_id.project_id", "=", project.id),
-                            ("date", ">=", month.date_start),
-                            ("date", "<=", self.reference_date),
-                            ("product_uom_id", "=", uom_hours.id),
-                        ]
-                    ).mapped(lambda x: x.unit_amount / 8)
-                ),
-                "budget_utilization": 42,
-                "actual_commercial_ytm": sum(
-                    TimeLine.search(
-                        [
-                            ("task_id.project_id", "=", project.id),
-                            ("date", ">=", month.date_start.replace(month=1, day=1)),
-                            ("date", "<", month.date_start),
-                            ("product_uom_id", "=", uom_hours.id),
-                        ]
-                    ).mapped(lambda x: x.unit_amount / 8)
-                )
-                - sum(
-                    PlanningLine.search(
-                        [
-                            (
-                                "range_id.date_start",
-                                ">=",
-                                month.date_start.replace(month=1, day=1),
-                            ),
-                            ("range_id.date_end", "<", month.date_start),
-                            ("task_id.project_id", "=", project.id),
-                            ("line_type", "=", "contracted"),
-                        ]
-                    ).mapped("days"),
-                ),
-                "manager_name": project.user_id.name,
-            }
-            vals.update(
-                days_planned_mtd=vals["days_planned_full_month"] * mtd_fraction,
-                days_actual_planned_mtd=vals["days_actual_mtd"]
-                - vals["days_planned_full_month"] * mtd_fraction,
-                days_actual_commercial_mtd=vals["days_actual_mtd"]
-                - vals["days_commercial_full_month"] * mtd_fraction,
+        )
+        days_commercial = self._get_grouped_days(
+            "ps.planning.line",
+            [("range_id", "=", month.id), ("line_type", "=", "contracted")],
+        )
+        days_planned = self._get_grouped_days(
+            "ps.planning.line",
+            [("range_id", "=", month.id), ("line_type", "=", "planned")],
+        )
+        days_commercial_ytm = self._get_grouped_days(
+            "ps.planning.line",
+            [
+                ("range_id.date_start", ">=", year_start),
+                ("range_id.date_end", "<", month.date_start),
+                ("line_type", "=", "contracted"),
+            ],
+        )
+        days_actual_mtd = self._get_grouped_days(
+            "ps.time.line",
+            [
+                ("date", ">=", month.date_start),
+                ("date", "<=", self.reference_date),
+                ("product_uom_id", "=", uom_hours.id),
+            ],
+            field="unit_amount",
+            factor=1 / 8,
+        )
+        days_actual_ytm = self._get_grouped_days(
+            "ps.time.line",
+            [
+                ("date", ">=", year_start),
+                ("date", "<", month.date_start),
+                ("product_uom_id", "=", uom_hours.id),
+            ],
+            field="unit_amount",
+            factor=1 / 8,
+        )
+        vals_list = []
+        for i, project in enumerate(projects):
+            commercial_mtd = days_commercial.get(project.id, 0) * mtd_fraction
+            planned_mtd = days_planned.get(project.id, 0) * mtd_fraction
+            actual_mtd = days_actual_mtd.get(project.id, 0)
+            vals_list.append(
+                {
+                    "wizard_id": self.id,
+                    "sequence": i,
+                    "business_line": project.department_id.name,
+                    "department_id": project.department_id.id,
+                    "project_id": project.id,
+                    "project_name": project.name,
+                    "project_code": project.code,
+                    "days_commercial_full_month": days_commercial.get(project.id, 0),
+                    "days_planned_full_month": days_planned.get(project.id, 0),
+                    "days_actual_mtd": actual_mtd,
+                    "days_planned_mtd": planned_mtd,
+                    "days_actual_planned_mtd": actual_mtd - planned_mtd,
+                    "days_actual_commercial_mtd": actual_mtd - commercial_mtd,
+                    "budget_utilization": actual_mtd / commercial_mtd
+                    if commercial_mtd
+                    else 0,
+                    "actual_commercial_ytm": days_actual_ytm.get(project.id, 0)
+                    - days_commercial_ytm.get(project.id, 0),
+                    "manager_name": project.user_id.name,
+                }
             )
-            Line.sudo().create(vals)
-            i += 1
+        Line.sudo().create(vals_list)
         return {
             "type": "ir.actions.act_window",
             "name": _("PS Planning report"),
@@ -139,10 +143,38 @@ class PsPlanningReportWizardLine(models.TransientModel):
     days_actual_mtd = fields.Integer("MTD Actual MD")
     days_actual_planned_mtd = fields.Integer("MTD Actual - Planned MD")
     days_actual_commercial_mtd = fields.Integer("MTD Actual - Commercial MD")
-    budget_utilization = fields.Integer("KPI % MTD")
+    budget_utilization = fields.Float("KPI % MTD")
     actual_commercial_ytm = fields.Integer("Actual Commercial YTM")
     manager_name = fields.Char("Project Manager")
 
+    @api.model
+    def _get_department_version(self):
+        """
+        Return a digest of the departments the filters are built from, to key
+        the cached filters on instead of clearing caches on department changes
+        """
+        self.env["hr.department"].flush(["name", "company_id", "active"])
+        self.env.cr.execute(
+            """
+            SELECT md5(string_agg(concat_ws(',', id, name, company_id), ';'
+                ORDER BY id))
+            FROM hr_department
+            WHERE active
+            """
+        )
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    @tools.ormcache("company_ids", "version")
+    def _get_department_filters(self, company_ids, version):
+        """Return (name, domain) for a search filter per department"""
+        return tuple(
+            (department.name, json.dumps([("department_id", "=", department.id)]))
+            for department in self.env["hr.department"]
+            .sudo()
+            .search([("company_id", "in", list(company_ids) + [False])])
+        )
+
     @api.model
     def _fields_view_get(
         self, view_id=None, view_type="form", toolbar=False, submenu=False
@@ -151,23 +183,31 @@ class PsPlanningReportWizardLine(models.TransientModel):
             view_id=view_id, view_type=view_type, toolbar=toolbar, submenu=submenu
         )
         if view_type == "search":
-            arch = etree.fromstring(result["arch"])
-            for node in arch.xpath("//search"):
+            self.env["ps.view.arch.cache"]._postprocess(
+                self._name,
+                "_add_department_filters",
+                result,
+                view_type,
+                key=(
+                    tuple(sorted(self.env.companies.ids)),
+                    self._get_department_version(),
+                ),
+            )
+        return result
+
+    @api.model
+    def _add_department_filters(self, arch):
+        department_filters = self._get_department_filters(
+            tuple(sorted(self.env.companies.ids)), self._get_department_version()
+        )
+        for node in arch.xpath("//search"):
+            etree.SubElement(
+                node,
+                "separator",
+            )
+            for name, domain in department_filters:
                 etree.SubElement(
                     node,
-                    "separator",
+                    "filter",
+                    attrib={"string": name, "domain": domain},
                 )
-                for department in self.env["hr.department"].search([]):
-                    etree.SubElement(
-                        node,
-                        "filter",
-                        attrib={
-                            "string": department.name,
-                            "domain": json.dumps(
-                                [("department_id", "=", department.id)]
-                            ),
-                        },
-                    )
-
-            result["arch"] = etree.tostring(arch)
-        return result
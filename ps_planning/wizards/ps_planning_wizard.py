@@ -112,76 +112,154 @@ class PsPlanningWizard(models.TransientModel):
                 ("employee_id", "=", employee.id),
             ],
         )
-        contracted_line = self.contracted_line_ids.filtered_domain(
-            [
-                ("task_id", "=", task.id),
-                ("product_id", "=", product.id),
-            ]
+        return self.env["ps.planning.wizard.line"].create(
+            self._prepare_line_vals(
+                month, task, product, employee, planning_line, **extra_vals
+            )
         )
 
-        return self.env["ps.planning.wizard.line"].create(
-            dict(
-                {
-                    "wizard_id": self.id,
-                    "y_axis": "%10d-%10d-1-%s"
-                    % (task.id, product.id, employee.display_name),
-                    "y_axis_display": "",
-                    "range_id": month.id,
-                    "task_id": task.id,
-                    "product_id": product.id,
-                    "employee_id": employee.id,
-                    "days": planning_line.days,
-                    "line_type": "planned",
-                    "state": planning_line.state or "draft",
-                    "planning_line_id": planning_line.id,
-                    "contracted_line_id": contracted_line.id,
-                },
-                **extra_vals
+    def _prepare_line_vals(
+        self,
+        month,
+        task,
+        product,
+        employee,
+        planning_line,
+        contracted_line=None,
+        **extra_vals
+    ):
+        if contracted_line is None:
+            contracted_line = self.contracted_line_ids.filtered_domain(
+                [
+                    ("task_id", "=", task.id),
+                    ("product_id", "=", product.id),
+                ]
             )
+        return dict(
+            {
+                "wizard_id": self.id,
+                "y_axis": "%10d-%10d-1-%s"
+                % (task.id, product.id, employee.display_name),
+                "y_axis_display": "",
+                "range_id": month.id,
+                "task_id": task.id,
+                "product_id": product.id,
+                "employee_id": employee.id,
+                "days": planning_line.days,
+                "line_type": "planned",
+                "state": planning_line.state or "draft",
+                "planning_line_id": planning_line.id,
+                "contracted_line_id": contracted_line.id,
+            },
+            **extra_vals
         )
 
+    def _get_planning_line_index(self, months=None):
+        """
+        Return a dict (range id, task id, product id, line type, employee id) ->
+        planning line for the planning lines of the contracted tasks and products
+        in months, which defaults to the months of the wizard's period
+        """
+        if months is None:
+            months = self._get_months()
+        return {
+            (
+                line.range_id.id,
+                line.task_id.id,
+                line.product_id.id,
+                line.line_type,
+                line.employee_id.id,
+            ): line
+            for line in self.env["ps.planning.line"].search(
+                [
+                    ("project_id", "=", self.project_id.id),
+                    ("range_id", "in", months.ids),
+                    ("task_id", "in", self.contracted_line_ids.task_id.ids),
+                    ("product_id", "in", self.contracted_line_ids.product_id.ids),
+                ]
+            )
+        }
+
+    def _get_planned_employee_ids(self):
+        """
+        Return a dict (task id, product id) -> set of ids of the employees with
+        planned lines on the contracted task and product in any month
+        """
+        employee_ids = {}
+        for group in self.env["ps.planning.line"].read_group(
+            [
+                ("project_id", "=", self.project_id.id),
+                ("line_type", "=", "planned"),
+                ("employee_id", "!=", False),
+                ("task_id", "in", self.contracted_line_ids.task_id.ids),
+                ("product_id", "in", self.contracted_line_ids.product_id.ids),
+            ],
+            ["task_id", "product_id", "employee_id"],
+            ["task_id", "product_id", "employee_id"],
+            lazy=False,
+        ):
+            employee_ids.setdefault(
+                (group["task_id"][0], group["product_id"][0]), set()
+            ).add(group["employee_id"][0])
+        return employee_ids
+
     def action_start_planning(self):
         PsPlanningLine = self.env["ps.planning.line"]
+        Employee = self.env["hr.employee"]
         months = self._get_months()
-        employees = self.env["hr.employee"].search([])
         self.line_ids.unlink()
+        index = self._get_planning_line_index(months)
+        employee_ids = self._get_planned_employee_ids()
 
+        vals_list = []
         for contracted_line in self.contracted_line_ids:
             task = contracted_line.task_id
             product = contracted_line.product_id
             contracted_days_by_month = contracted_line._get_contracted_days_by_month()
+            employees = Employee.browse(
+                sorted(employee_ids.get((task.id, product.id), []))
+            )
             for date_range in months:
-                planning_line = PsPlanningLine.search(
-                    [
-                        ("range_id", "=", date_range.id),
-                        ("task_id", "=", task.id),
-                        ("product_id", "=", product.id),
-                        ("line_type", "=", "contracted"),
-                    ],
+                planning_line = index.get(
+                    (date_range.id, task.id, product.id, "contracted", False),
+                    PsPlanningLine,
                 )
-                self._add_line(
-                    date_range,
-                    task,
-                    product,
-                    self.env["hr.employee"],
-                    y_axis="%10d-%10d-0" % (task.id, product.id),
-                    days=contracted_days_by_month[date_range]
-                    if not planning_line
-                    else planning_line.days,
-                    planning_line_id=planning_line.id,
-                    line_type="contracted",
+                vals_list.append(
+                    self._prepare_line_vals(
+                        date_range,
+                        task,
+                        product,
+                        Employee,
+                        planning_line,
+                        contracted_line,
+                        y_axis="%10d-%10d-0" % (task.id, product.id),
+                        days=contracted_days_by_month[date_range]
+                        if not planning_line
+                        else planning_line.days,
+                        line_type="contracted",
+                    )
                 )
                 for employee in employees:
-                    if not PsPlanningLine.search_count(
-                        [
-                            ("task_id", "=", task.id),
-                            ("product_id", "=", product.id),
-                            ("line_type", "=", "planned"),
-                            ("employee_id", "=", employee.id),
-                        ],
-                    ):
-                        continue
-                    self._add_line(date_range, task, product, employee)
+                    vals_list.append(
+                        self._prepare_line_vals(
+                            date_range,
+                            task,
+                            product,
+                            employee,
+                            index.get(
+                                (
+                                    date_range.id,
+                                    task.id,
+                                    product.id,
+                                    "planned",
+                                    employee.id,
+                                ),
+                                PsPlanningLine,
+                            ),
+                            contracted_line,
+                        )
+                    )
+        self.env["ps.planning.wizard.line"].create(vals_list)
 
         action = self.env["ir.actions.actions"]._for_xml_id(
             "ps_planning.action_ps_planning_wizard"
@@ -190,26 +268,69 @@ class PsPlanningWizard(models.TransientModel):
         return action
 
     def action_commit_planning(self):
-        for line in self.line_ids:
-            if not line.days:
-                line.planning_line_id.unlink()
-                continue
-            if line.planning_line_id:
-                line.planning_line_id.write({"days": line.days, "state": line.state})
-            else:
-                line.planning_line_id = line.planning_line_id.create(
-                    {
-                        "days": line.days,
-                        "employee_id": line.employee_id.id,
-                        "task_id": line.task_id.id,
-                        "range_id": line.range_id.id,
-                        "product_id": line.product_id.id,
-                        "line_type": line.line_type,
-                        "state": line.state,
-                        "contracted_line_id": line.contracted_line_id.id,
-                    }
-                )
-        self.action_start_planning()
+        """
+        Write changed cells to planning lines: existing lines are written grouped
+        by their new values, new ones are created in one go, and lines of cells
+        set to zero are removed. Derived data is refreshed once at the end
+        """
+        PsPlanningLine = self.env["ps.planning.line"].with_context(
+            ps_planning_no_refresh=True
+        )
+        changed = self.line_ids.filtered(
+            lambda x: x.days != x.planning_line_id.days
+            or x.planning_line_id
+            and x.state != x.planning_line_id.state
+        )
+        to_delete = changed.filtered(lambda x: not x.days)
+        to_write = changed - to_delete
+        if to_delete:
+            planning_lines = to_delete.planning_line_id
+            to_delete.write({"planning_line_id": False})
+            planning_lines.unlink()
+        if not to_write:
+            return
+        # cells whose line has been created since the matrix was started
+        index = self._get_planning_line_index()
+        for line in to_write.filtered(lambda x: not x.planning_line_id):
+            line.planning_line_id = index.get(
+                (
+                    line.range_id.id,
+                    line.task_id.id,
+                    line.product_id.id,
+                    line.line_type,
+                    line.employee_id.id,
+                ),
+                PsPlanningLine,
+            )
+        to_create = to_write.filtered(lambda x: not x.planning_line_id)
+        values2lines = {}
+        for line in to_write - to_create:
+            key = (line.days, line.state or "draft")
+            values2lines[key] = values2lines.get(key, PsPlanningLine) + (
+                line.planning_line_id
+            )
+        for (days, state), planning_lines in values2lines.items():
+            planning_lines.write({"days": days, "state": state})
+        created = PsPlanningLine.create(
+            [
+                {
+                    "days": line.days,
+                    "employee_id": line.employee_id.id,
+                    "task_id": line.task_id.id,
+                    "range_id": line.range_id.id,
+                    "product_id": line.product_id.id,
+                    "line_type": line.line_type,
+                    "state": line.state or "draft",
+                    "contracted_line_id": line.contracted_line_id.id,
+                }
+                for line in to_create
+            ]
+        )
+        for line, planning_line in zip(to_create, created):
+            line.planning_line_id = planning_line
+        planning_lines = to_write.planning_line_id
+        self.env["ps.planning.line.day"]._refresh(line_ids=planning_lines.ids)
+        planning_lines._refresh_billing_report()
 
     def _get_months(self, period=None):
         month_type = self.env.ref("account_fiscal_month.date_range_fiscal_month")
@@ -2,7 +2,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 {
     "name": "Timesheet and Invoicing",
-    "version": "14.0.1.0.2",
+    "version": "14.0.1.0.4",
     "license": "AGPL-3",
     "summary": """This module introduces an advanced professional services invoicing process,
         offering fixed price, time and material, licensing and several combinations
@@ -0,0 +1,6 @@
+from odoo.tools import drop_view_if_exists
+
+
+def migrate(cr, version=None):
+    # status.time.report used to be a view, now it's a table filled by _refresh
+    drop_view_if_exists(cr, "status_time_report")
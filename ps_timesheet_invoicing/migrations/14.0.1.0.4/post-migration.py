@@ -0,0 +1,38 @@
+from odoo import SUPERUSER_ID, api
+
+# the account code and operating units the pipeline actuals report used to have
+# hardcoded
+PIPELINE_ACTUALS_ACCOUNT_CODE = "8100"
+PIPELINE_ACTUALS_OPERATING_UNITS = {
+    "pipeline_actuals_red_operating_unit_id": 6,
+    "pipeline_actuals_green_operating_unit_id": 7,
+    "pipeline_actuals_blue_operating_unit_id": 8,
+    "pipeline_actuals_black_operating_unit_id": 11,
+}
+
+
+def migrate(cr, version=None):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    operating_units = (
+        env["operating.unit"]
+        .browse(list(PIPELINE_ACTUALS_OPERATING_UNITS.values()))
+        .exists()
+    )
+    for company in env["res.company"].search([]):
+        vals = {
+            field_name: operating_unit_id
+            for field_name, operating_unit_id in PIPELINE_ACTUALS_OPERATING_UNITS.items()
+            if not company[field_name] and operating_unit_id in operating_units.ids
+        }
+        if not company.pipeline_actuals_account_ids:
+            accounts = env["account.account"].search(
+                [
+                    ("code", "=", PIPELINE_ACTUALS_ACCOUNT_CODE),
+                    ("company_id", "=", company.id),
+                ]
+            )
+            if accounts:
+                vals["pipeline_actuals_account_ids"] = [(6, 0, accounts.ids)]
+        # writing the accounts refreshes crm.pipeline.actuals.monthly, which was
+        # filled empty on update as no accounts were configured yet
+        company.write(vals)
@@ -0,0 +1,37 @@
+from odoo.exceptions import UserError
+from odoo.tools import table_exists
+
+
+def migrate(cr, version=None):
+    # the exclusion constraints on fleet.vehicle.driver can't be added if there
+    # are conflicting assignments, and Odoo would only log that
+    if not table_exists(cr, "fleet_vehicle_driver"):
+        return
+    cr.execute(
+        """
+        SELECT this.id, other.id
+        FROM fleet_vehicle_driver this
+        JOIN fleet_vehicle_driver other ON (
+            other.id > this.id
+            AND (
+                other.vehicle_id = this.vehicle_id
+                OR other.driver_id = this.driver_id
+            )
+            AND daterange(other.date_start, other.date_end, '[)')
+            && daterange(this.date_start, this.date_end, '[)')
+        )
+        UNION ALL
+        SELECT id, NULL FROM fleet_vehicle_driver WHERE date_end < date_start
+        ORDER BY 1, 2
+        """
+    )
+    conflicts = cr.fetchall()
+    if conflicts:
+        raise UserError(
+            "Fix the following conflicting or invalid fleet.vehicle.driver "
+            "records before updating: %s"
+            % ", ".join(
+                "%d and %d" % conflict if conflict[1] else "%d" % conflict[0]
+                for conflict in conflicts
+            )
+        )
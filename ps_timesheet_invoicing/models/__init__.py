@@ -4,6 +4,7 @@ from . import account_move_line
 from . import account_journal
 from . import ps_invoice
 from . import hr_timesheet_sheet
+from . import date_range
 from . import project
 from . import project_task
 from . import project_invoicing_properties
@@ -15,6 +16,7 @@ from . import res_users
 from . import hr_department
 from . import hr_employee
 from . import res_company
+from . import crm_lead
 from . import ps_time_line
 from . import ps_time_line_user_total
 from . import task_user
@@ -1,7 +1,7 @@
 # Copyright 2023 Hunki Enterprises BV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class AccountAnalyticLine(models.Model):
@@ -14,3 +14,44 @@ class AccountAnalyticLine(models.Model):
         "account.move.line",
         string="Invoiced in line",
     )
+
+    def _refresh_pipeline_actuals(self, analytic_account_ids=None, dates=None):
+        # ps.time.line inherits from us, but is never booked on a move
+        if self._name != "account.analytic.line":
+            return
+        lines = self.filtered("move_id")
+        self.env["crm.pipeline.actuals.monthly"]._refresh_analytic_lines(
+            set(lines.mapped("account_id").ids + (analytic_account_ids or [])),
+            set(lines.mapped("date") + (dates or [])),
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._refresh_pipeline_actuals()
+        return records
+
+    def write(self, vals):
+        if not {
+            "amount",
+            "date",
+            "account_id",
+            "general_account_id",
+            "move_id",
+            "company_id",
+        } & set(vals):
+            return super().write(vals)
+        lines = self.filtered("move_id")
+        analytic_account_ids = lines.mapped("account_id").ids
+        dates = lines.mapped("date")
+        result = super().write(vals)
+        self._refresh_pipeline_actuals(analytic_account_ids, dates)
+        return result
+
+    def unlink(self):
+        lines = self.filtered("move_id")
+        analytic_account_ids = lines.mapped("account_id").ids
+        dates = lines.mapped("date")
+        result = super().unlink()
+        self.browse([])._refresh_pipeline_actuals(analytic_account_ids, dates)
+        return result
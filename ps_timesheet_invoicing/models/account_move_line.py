@@ -53,6 +53,12 @@ class AccountMoveLine(models.Model):
         for line in self.filtered("user_id"):
             line.operating_unit_id = line.user_id._get_operating_unit_id()
 
+    def write(self, vals):
+        result = super().write(vals)
+        if "operating_unit_id" in vals:
+            self.mapped("analytic_line_ids")._refresh_pipeline_actuals()
+        return result
+
     @api.model
     def default_get(self, fields):
         res = super().default_get(fields)
@@ -0,0 +1,16 @@
+from odoo import models
+
+from odoo.addons.ps_crm.models.crm_lead import REVENUE_SPLIT_COLOURS
+
+
+class CrmLead(models.Model):
+    _inherit = "crm.lead"
+
+    def _get_revenue_split_colour(self):
+        """Prefer the operating units per colour configured on the company"""
+        company = self.company_id or self.env.company
+        for colour in REVENUE_SPLIT_COLOURS:
+            operating_unit = company["pipeline_actuals_%s_operating_unit_id" % colour]
+            if operating_unit and operating_unit == self.operating_unit_id:
+                return colour
+        return super()._get_revenue_split_colour()
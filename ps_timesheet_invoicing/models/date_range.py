@@ -0,0 +1,38 @@
+# Copyright 2026 The Open Source Company (www.tosc.nl).
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class DateRange(models.Model):
+    _inherit = "date.range"
+
+    def _get_calendar_weeks(self):
+        return self.filtered(
+            lambda x: x.type_id
+            == self.env.ref("ps_date_range_week.date_range_calender_week")
+        )
+
+    def _get_fiscal_months(self):
+        return self.filtered(
+            lambda x: x.type_id
+            == self.env.ref("account_fiscal_month.date_range_fiscal_month")
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["status.time.report"]._refresh(
+            week_ids=records._get_calendar_weeks().ids
+        )
+        self.env["crm.pipeline.actuals.monthly"]._refresh(
+            month_ids=records._get_fiscal_months().ids
+        )
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {"type_id", "date_start", "date_end"} & set(vals):
+            self.env["status.time.report"]._refresh(week_ids=self.ids)
+            self.env["crm.pipeline.actuals.monthly"]._refresh(month_ids=self.ids)
+        return result
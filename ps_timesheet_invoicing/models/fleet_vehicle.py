@@ -1,12 +1,11 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import psycopg2
 from dateutil import relativedelta
 
 from odoo import api, fields, models
 
-from .fleet_vehicle_driver import inhibit_constraints_sentinel
-
 
 class FleetVehicle(models.Model):
     _inherit = "fleet.vehicle"
@@ -26,15 +25,25 @@ class FleetVehicle(models.Model):
     def write(self, vals):
         if "fleet_vehicle_driver_ids" not in vals:
             return super().write(vals)
-        result = super(
-            FleetVehicle,
-            self.with_context(
-                fleet_vehicle_driver_inhibit_constrains=inhibit_constraints_sentinel
-            )
+        VehicleDriver = self.env["fleet.vehicle.driver"]
+        VehicleDriver._set_constraints_mode("DEFERRED")
+        reset = True
+        try:
             # filter out driver_id if both fleet_vehicle_driver_ids and driver_id
             # are to be written
-        ).write({key: value for key, value in vals.items() if key != "driver_id"})
-        self.fleet_vehicle_driver_ids._check_all()
+            result = super(
+                FleetVehicle, self.with_context(fleet_vehicle_driver_deferred=True)
+            ).write({key: value for key, value in vals.items() if key != "driver_id"})
+            VehicleDriver.flush()
+        except psycopg2.Error:
+            # rolling back the aborted transaction or savepoint resets the mode,
+            # and any statement before that would fail
+            reset = False
+            raise
+        finally:
+            if reset:
+                VehicleDriver._set_constraints_mode("IMMEDIATE")
+        self.mapped("fleet_vehicle_driver_ids")._check_overlap()
         return result
 
     def _set_odometer(self):
@@ -89,7 +98,7 @@ class FleetVehicle(models.Model):
 
     def _search_driver_id(self, operator, value):
         today = fields.Date.context_today(self)
-        vehicle_drivers = self.env["fleet.vehicle.driver"].search(
+        query = self.env["fleet.vehicle.driver"]._where_calc(
             [
                 ("driver_id", operator, value),
                 ("date_start", "<=", today),
@@ -98,4 +107,16 @@ class FleetVehicle(models.Model):
                 ("date_end", ">=", today),
             ]
         )
-        return [("fleet_vehicle_driver_ids", "in", vehicle_drivers.ids)]
+        self.env["fleet.vehicle.driver"]._apply_ir_rules(query, "read")
+        tables, where_clause, where_clause_params = query.get_sql()
+        return [
+            (
+                "id",
+                "inselect",
+                (
+                    'SELECT "fleet_vehicle_driver"."vehicle_id" FROM %s WHERE %s'
+                    % (tables, where_clause),
+                    where_clause_params,
+                ),
+            )
+        ]
@@ -1,9 +1,15 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, exceptions, fields, models
+import logging
 
-inhibit_constraints_sentinel = object()
+import psycopg2
+
+from odoo import _, api, exceptions, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+OVERLAP_CONSTRAINTS = ("open_ended", "vehicle_overlap", "driver_overlap")
 
 
 class FleetVehicle(models.Model):
@@ -16,46 +22,126 @@ class FleetVehicle(models.Model):
     date_start = fields.Date(required=True, string="Start")
     date_end = fields.Date(string="End")
 
+    # the exclusion constraints are deferrable so that fleet.vehicle#write can
+    # check them once after all driver records are written
+    _sql_constraints = [
+        (
+            "date_end_after_start",
+            "CHECK (date_end IS NULL OR date_end >= date_start)",
+            "End date must be bigger than start date",
+        ),
+        (
+            "open_ended",
+            "EXCLUDE USING gist (vehicle_id WITH =) WHERE (date_end IS NULL) "
+            "DEFERRABLE INITIALLY IMMEDIATE",
+            "You can only have one open-ended driver record per vehicle",
+        ),
+        (
+            "vehicle_overlap",
+            "EXCLUDE USING gist "
+            "(vehicle_id WITH =, daterange(date_start, date_end, '[)') WITH &&) "
+            "DEFERRABLE INITIALLY IMMEDIATE",
+            "You cannot have overlapping drivers for a vehicle",
+        ),
+        (
+            "driver_overlap",
+            "EXCLUDE USING gist "
+            "(driver_id WITH =, daterange(date_start, date_end, '[)') WITH &&) "
+            "DEFERRABLE INITIALLY IMMEDIATE",
+            "A driver cannot have multiple vehicles at the same time",
+        ),
+    ]
+
+    def _auto_init(self):
+        # the exclusion constraints compare integers with gist
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        except psycopg2.Error:
+            _logger.warning(
+                "Cannot create extension btree_gist, driver assignments will be "
+                "checked in Python. Create the extension as superuser to fix this"
+            )
+        return super()._auto_init()
+
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "fleet_vehicle_driver_driver_date_index",
+            self._table,
+            ["driver_id", "date_start"],
+        )
+
+    @api.model
+    def _set_constraints_mode(self, mode):
+        """
+        Set deferrable constraints to DEFERRED or IMMEDIATE. This addresses all of
+        them, as SET CONSTRAINTS fails on names of constraints that could not be
+        created on databases with overlapping assignments
+        """
+        self.env.cr.execute("SET CONSTRAINTS ALL %s" % mode)
+
+    @api.model
+    def _has_overlap_constraints(self):
+        """
+        Return if the exclusion constraints exist, which they don't if btree_gist
+        is missing or the database had overlapping assignments when they were
+        added
+        """
+        self.env.cr.execute(
+            "SELECT count(*) FROM pg_constraint WHERE conname IN %s",
+            (tuple("%s_%s" % (self._table, name) for name in OVERLAP_CONSTRAINTS),),
+        )
+        return self.env.cr.fetchone()[0] == len(OVERLAP_CONSTRAINTS)
+
     @api.constrains("vehicle_id", "driver_id", "date_start", "date_end")
-    def _check_all(self):
+    def _check_overlap(self):
+        """Check what the exclusion constraints do in case they are missing"""
         if (
-            self.env.context.get("fleet_vehicle_driver_inhibit_constrains")
-            == inhibit_constraints_sentinel
+            not self
+            or self.env.context.get("fleet_vehicle_driver_deferred")
+            or self._has_overlap_constraints()
         ):
             return
-        for this in self:
-            if not this.date_end:
-                if self.search(
-                    [
-                        ("vehicle_id", "=", this.vehicle_id.id),
-                        ("date_end", "=", False),
-                        ("id", "!=", this.id),
-                    ]
-                ):
-                    raise exceptions.ValidationError(
-                        _("You can only have one open-ended driver record per vehicle")
-                    )
-            elif this.date_end < this.date_start:
-                raise exceptions.ValidationError(
-                    _("End date must be bigger than start date")
-                )
-            interval_domain = [
-                ("id", "!=", this.id),
-                ("date_start", "<", this.date_end)
-                if this.date_end
-                else ("date_start", ">", this.date_start),
-                "|",
-                ("date_end", ">", this.date_start),
-                ("date_end", "=", False),
-            ]
-            if self.search([("vehicle_id", "=", this.vehicle_id.id)] + interval_domain):
-                raise exceptions.ValidationError(
-                    _("You cannot have overlapping drivers for a vehicle")
-                )
-            if self.search([("driver_id", "=", this.driver_id.id)] + interval_domain):
-                raise exceptions.ValidationError(
-                    _("A driver cannot have multiple vehicles at the same time")
+        self.flush(["vehicle_id", "driver_id", "date_start", "date_end"])
+        self.env.cr.execute(
+            """
+            SELECT
+                bool_or(this.date_end IS NULL AND other.date_end IS NULL
+                    AND this.vehicle_id = other.vehicle_id),
+                bool_or(this.vehicle_id = other.vehicle_id),
+                bool_or(this.driver_id = other.driver_id)
+            FROM fleet_vehicle_driver this
+            JOIN fleet_vehicle_driver other ON (
+                other.id != this.id
+                AND (
+                    other.vehicle_id = this.vehicle_id
+                    OR other.driver_id = this.driver_id
                 )
+                AND daterange(other.date_start, other.date_end, '[)')
+                && daterange(this.date_start, this.date_end, '[)')
+            )
+            WHERE this.id IN %s
+            """,
+            (tuple(self.ids),),
+        )
+        open_ended, vehicle_overlap, driver_overlap = self.env.cr.fetchone()
+        if open_ended:
+            raise exceptions.ValidationError(
+                _("You can only have one open-ended driver record per vehicle")
+            )
+        if vehicle_overlap:
+            raise exceptions.ValidationError(
+                _("You cannot have overlapping drivers for a vehicle")
+            )
+        if driver_overlap:
+            raise exceptions.ValidationError(
+                _("A driver cannot have multiple vehicles at the same time")
+            )
+
+    @api.constrains("date_start")
+    def _check_date_start(self):
+        for this in self:
             if this.date_start.weekday() != 0:
                 raise exceptions.ValidationError(
                     _("Driver assignments should start on a Monday")
@@ -1,7 +1,10 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, fields, models
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import UserError
 
 
@@ -16,24 +19,37 @@ class FleetVehicleOdometer(models.Model):
         )
     ]
 
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "fleet_vehicle_odometer_vehicle_date_index",
+            self._table,
+            ["vehicle_id", "date"],
+        )
+
     def _inverse_odometer_values(self):
-        for odom in self:
+        """Record the input on the records, their values are computed from the
+        recomputed values of their older records at the end of the create or
+        write, or of the deferred recomputation block"""
+        ultimos = self.env.context.get("fleet_vehicle_odometer_deferred_ultimos")
+        if ultimos is None:
+            with self._deferred_recompute() as this:
+                return this._inverse_odometer_values()
+        starts = self.env.context["fleet_vehicle_odometer_deferred_starts"]
+        for odom in self.with_context(fleet_vehicle_odometer_inverse=True):
             if odom.value_period_update and odom.value_update:
                 raise UserError(
                     _("You cannot enter both period value and ultimo value for %s!")
                     % (odom.date)
                 )
-            older = self.sudo().search(
-                [("vehicle_id", "=", odom.vehicle_id.id), ("date", "<", odom.date)],
-                limit=1,
-                order="date desc",
-            )
             if odom.value_update:
-                odom.value_period = odom.value_update - older.value
                 odom.value = odom.value_update
+                ultimos[odom.id] = odom.value_update
             else:
-                odom.value = older.value + odom.value_period_update
                 odom.value_period = odom.value_period_update
+                ultimos.pop(odom.id, None)
+            # dates are unique per vehicle, so this recomputes odom itself
+            starts.append((odom.vehicle_id.id, odom.date - timedelta(days=1)))
 
     value_period = fields.Float(
         string="Odometer Period Value (computed)",
@@ -58,50 +74,143 @@ class FleetVehicleOdometer(models.Model):
         inverse="_inverse_odometer_values",
     )
 
-    def _update_newer(self, vehicle_id=None, date=None):
-        """Recompute records newer than self or date"""
-        newer = self.sudo().search(
-            [
-                ("vehicle_id", "=", self.vehicle_id.id or vehicle_id),
-                ("date", ">", self.date or date),
-            ],
-            order="date asc",
+    @api.model
+    def _recompute_values(self, starts, ultimos=None):
+        """Recompute the cumulative value of all records newer than the
+        (vehicle_id, date) tuples in starts in one statement. A date of None
+        recomputes all records of the vehicle. ultimos maps ids of records to
+        the ultimo value entered on them, those keep that value and get their
+        period value from the recomputed value of the record before them"""
+        ultimos = ultimos or {}
+        vehicle2date = {}
+        for vehicle_id, date in starts:
+            if not vehicle_id:
+                continue
+            current = vehicle2date.get(vehicle_id, date)
+            vehicle2date[vehicle_id] = (current and date and min(current, date)) or None
+        if not vehicle2date:
+            return
+        self.flush(["vehicle_id", "date", "value", "value_period"])
+        self.env.cr.execute(
+            """
+            WITH start AS (
+                SELECT * FROM unnest(%s::int[], %s::date[]) AS s(vehicle_id, date)
+            ),
+            ultimo AS (
+                SELECT * FROM unnest(%s::int[], %s::float8[]) AS u(id, value)
+            ),
+            segmented AS (
+                SELECT fvo.id, fvo.vehicle_id, fvo.date, fvo.value_period,
+                    ultimo.value AS ultimo_value, anchor.value AS anchor_value,
+                    -- a segment starts at every ultimo value
+                    COUNT(ultimo.value) OVER (
+                        PARTITION BY fvo.vehicle_id ORDER BY fvo.date
+                    ) AS segment
+                FROM start
+                JOIN fleet_vehicle_odometer fvo ON (
+                    fvo.vehicle_id = start.vehicle_id
+                    AND (start.date IS NULL OR fvo.date > start.date)
+                )
+                LEFT JOIN ultimo ON ultimo.id = fvo.id
+                LEFT JOIN LATERAL (
+                    SELECT value
+                    FROM fleet_vehicle_odometer
+                    WHERE vehicle_id = start.vehicle_id AND date <= start.date
+                    ORDER BY date DESC
+                    LIMIT 1
+                ) anchor ON TRUE
+            ),
+            cumulative AS (
+                SELECT id, vehicle_id, date, ultimo_value, anchor_value,
+                    CASE WHEN segment = 0 THEN COALESCE(anchor_value, 0)
+                    ELSE FIRST_VALUE(ultimo_value) OVER segment_window END
+                    + SUM(
+                        CASE WHEN ultimo_value IS NULL
+                        THEN COALESCE(value_period, 0) ELSE 0 END
+                    ) OVER segment_window AS value
+                FROM segmented
+                WINDOW segment_window AS (PARTITION BY vehicle_id, segment ORDER BY date)
+            ),
+            computed AS (
+                SELECT id, value,
+                    ultimo_value - COALESCE(
+                        LAG(value) OVER (PARTITION BY vehicle_id ORDER BY date),
+                        anchor_value,
+                        0
+                    ) AS value_period
+                FROM cumulative
+            )
+            UPDATE fleet_vehicle_odometer fvo
+            SET value = computed.value,
+                value_period = COALESCE(computed.value_period, fvo.value_period)
+            FROM computed
+            WHERE fvo.id = computed.id
+            AND (fvo.value, fvo.value_period) IS DISTINCT FROM (
+                computed.value, COALESCE(computed.value_period, fvo.value_period)
+            )
+            """,
+            (
+                list(vehicle2date.keys()),
+                list(vehicle2date.values()),
+                list(ultimos.keys()),
+                list(ultimos.values()),
+            ),
         )
-        former_value = self.value
-        for one in newer.with_context(odo_newer=True):
-            one.value = former_value + one.value_period
-            former_value = one.value
+        self.invalidate_cache(["value", "value_period"])
+
+    def _get_recompute_starts(self):
+        return [(this.vehicle_id.id, this.date) for this in self.sudo()]
+
+    def _recompute_newer(self, starts=None):
+        """Recompute records newer than self and starts, or collect them for later
+        if we're in a deferred recomputation block"""
+        starts = self._get_recompute_starts() + (starts or [])
+        deferred = self.env.context.get("fleet_vehicle_odometer_deferred_starts")
+        if deferred is not None:
+            deferred.extend(starts)
+        else:
+            self._recompute_values(starts)
 
-    def _find_newer(self, vehicle_id=None, date=None):
-        """Return the closest record that is newer than self or date"""
-        return self.sudo().search(
-            [
-                ("vehicle_id", "=", self.vehicle_id.id or vehicle_id),
-                ("date", ">", self.date or date),
-            ],
-            limit=1,
-            order="date asc",
+    @contextmanager
+    def _deferred_recompute(self):
+        """
+        Return a context manager that yields self with recomputation of newer
+        records deferred to the end of the block, for bulk imports. Blocks
+        nested in another one are recomputed with the outer block
+        """
+        if self.env.context.get("fleet_vehicle_odometer_deferred_starts") is not None:
+            yield self
+            return
+        starts = []
+        ultimos = {}
+        yield self.with_context(
+            fleet_vehicle_odometer_deferred_starts=starts,
+            fleet_vehicle_odometer_deferred_ultimos=ultimos,
         )
+        self._recompute_values(starts, ultimos)
 
-    @api.model
-    def create(self, data):
-        res = super().create(data)
-        if res._find_newer():
-            res._update_newer()
-        return res
+    @api.model_create_multi
+    def create(self, vals_list):
+        with self._deferred_recompute() as this:
+            records = super(FleetVehicleOdometer, this).create(vals_list)
+            records._recompute_newer()
+        return self.browse(records.ids)
 
     def write(self, data):
-        res = super().write(data)
-        if not self.env.context.get("odo_newer"):
-            for record in self:
-                if record._find_newer():
-                    record._update_newer()
+        if self.env.context.get("fleet_vehicle_odometer_inverse"):
+            return super().write(data)
+        starts = (
+            self._get_recompute_starts()
+            if {"vehicle_id", "date"} & set(data.keys())
+            else []
+        )
+        with self._deferred_recompute() as this:
+            res = super(FleetVehicleOdometer, this).write(data)
+            this._recompute_newer(starts)
         return res
 
     def unlink(self):
-        self_data = self.mapped(lambda x: (x.vehicle_id.id, x.date))
+        starts = self._get_recompute_starts()
         result = super().unlink()
-        for vehicle_id, gone_date in self_data:
-            if self.env[self._name]._find_newer(vehicle_id, gone_date):
-                self.env[self._name]._update_newer(vehicle_id, gone_date)
+        self.browse([])._recompute_newer(starts)
         return result
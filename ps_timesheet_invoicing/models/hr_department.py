@@ -8,3 +8,14 @@ class HrDepartment(models.Model):
     _inherit = "hr.department"
 
     no_ott_check = fields.Boolean("8 Hours OTT possible", help="No Overtime Check")
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {"parent_id", "operating_unit_id"} & set(vals):
+            self.env["status.time.report"]._refresh(
+                employee_ids=self.env["hr.employee"]
+                .with_context(active_test=False)
+                .search([("department_id", "child_of", self.ids)])
+                .ids
+            )
+        return result
@@ -33,6 +33,25 @@ class HrEmployee(models.Model):
         "8 Hours OTT possible", help="No Overtime Check", groups="hr.group_hr_user"
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["status.time.report"]._refresh(employee_ids=records.ids)
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {
+            "official_date_of_employment",
+            "end_date_of_employment",
+            "department_id",
+            "parent_id",
+            "external",
+            "timesheet_optional",
+        } & set(vals):
+            self.env["status.time.report"]._refresh(employee_ids=self.ids)
+        return result
+
     @api.depends("product_id.list_price")
     def _compute_fee_rate(self):
         for this in self:
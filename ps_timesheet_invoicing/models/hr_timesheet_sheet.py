@@ -4,11 +4,13 @@
 import logging
 from datetime import datetime, timedelta
 
-from odoo import SUPERUSER_ID, _, api, fields, models
+from odoo import SUPERUSER_ID, _, api, fields, models, tools
 from odoo.exceptions import UserError, ValidationError
 from odoo.osv.expression import TRUE_LEAF
 from odoo.tools import float_compare
 
+from odoo.addons.ps_hr.models.ps_instrumentation import instrumented
+
 _logger = logging.getLogger(__name__)
 
 
@@ -16,65 +18,85 @@ class HrTimesheetSheet(models.Model):
     _inherit = "hr_timesheet.sheet"
     _order = "week_id desc"
 
-    def get_week_to_submit(self):
-        dt = datetime.now()
-        emp_obj = self.env.user.employee_id
-        emp_id = emp_obj.id
-        timesheets = self.env["hr_timesheet.sheet"].search(
-            [("employee_id", "=", emp_id)]
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "hr_timesheet_sheet_employee_week_index",
+            self._table,
+            ["employee_id", "week_id"],
         )
-        logged_weeks = timesheets.mapped("week_id").ids if timesheets else []
-        date_range = self.env["date.range"]
-        date_range_type_cw_id = self.env.ref(
-            "ps_date_range_week.date_range_calender_week"
-        ).id
-        employment_date = emp_obj.sudo().official_date_of_employment
-        employment_week = date_range.search(
-            [
-                ("type_id", "=", date_range_type_cw_id),
-                ("date_start", "<=", employment_date),
-                ("date_end", ">=", employment_date),
-            ]
+
+    @api.model
+    def _get_missing_weeks(self, employees, date_to=None, first_only=False):
+        """Return a dict employee id -> calendar weeks without a timesheet
+
+        Only weeks from the employment week of the employee on are considered,
+        and up to date_to if passed. With first_only, return only the earliest
+        missing week per employee"""
+        result = {employee.id: self.env["date.range"] for employee in employees}
+        if not employees:
+            return result
+        query = """
+            SELECT {distinct} he.id, dr.id
+            FROM hr_employee he
+            JOIN date_range dr ON (
+                dr.type_id = %(type_id)s
+                AND dr.active
+                AND (
+                    he.official_date_of_employment IS NULL
+                    OR dr.date_end >= he.official_date_of_employment
+                )
+            )
+            WHERE he.id IN %(employee_ids)s
+            {date_to_clause}
+            AND NOT EXISTS (
+                SELECT 1 FROM hr_timesheet_sheet hts
+                WHERE hts.employee_id = he.id AND hts.week_id = dr.id
+            )
+            ORDER BY he.id, dr.date_start
+        """.format(
+            distinct="DISTINCT ON (he.id)" if first_only else "",
+            date_to_clause="AND dr.date_start <= %(date_to)s" if date_to else "",
         )
-        past_week_domain = [
-            ("type_id", "=", date_range_type_cw_id),
-            ("date_end", "<", dt - timedelta(days=dt.weekday())),
-        ]
-        if employment_week:
-            past_week_domain += [("date_start", ">=", employment_week.date_start)]
-
-        if logged_weeks:
-            past_week_domain += [("id", "not in", logged_weeks)]
-
-        past_weeks = date_range.search(past_week_domain, limit=1, order="date_start")
-        week = date_range.search(
-            [
-                ("type_id", "=", date_range_type_cw_id),
-                ("date_start", "=", dt - timedelta(days=dt.weekday())),
-            ],
-            limit=1,
+        self.env.cr.execute(
+            query,
+            {
+                "type_id": self.env.ref(
+                    "ps_date_range_week.date_range_calender_week"
+                ).id,
+                "employee_ids": tuple(employees.ids),
+                "date_to": date_to,
+            },
         )
+        week_ids = {}
+        for employee_id, week_id in self.env.cr.fetchall():
+            week_ids.setdefault(employee_id, []).append(week_id)
+        for employee_id, ids in week_ids.items():
+            result[employee_id] = self.env["date.range"].browse(ids)
+        return result
 
-        if week or past_weeks:
-            if past_weeks and past_weeks.id not in logged_weeks:
-                return past_weeks
-            elif week and week.id not in logged_weeks:
-                return week
-            else:
-                upcoming_week = date_range.search(
-                    [
-                        ("id", "not in", logged_weeks),
-                        ("type_id", "=", date_range_type_cw_id),
-                        ("date_start", ">", dt - timedelta(days=dt.weekday())),
-                    ],
-                    order="date_start",
-                    limit=1,
-                )
-                if upcoming_week:
-                    return upcoming_week
-                else:
-                    return False
-        return False
+    def get_week_to_submit(self):
+        employee = self.env.user.employee_id
+        if employee:
+            return (
+                self._get_missing_weeks(employee.sudo(), first_only=True)[employee.id]
+                or False
+            )
+        dt = datetime.now()
+        return (
+            self.env["date.range"].search(
+                [
+                    (
+                        "type_id",
+                        "=",
+                        self.env.ref("ps_date_range_week.date_range_calender_week").id,
+                    ),
+                    ("date_start", "=", dt - timedelta(days=dt.weekday())),
+                ],
+                limit=1,
+            )
+            or False
+        )
 
     @api.onchange("add_line_project_id")
     def onchange_add_project_id(self):
@@ -113,18 +135,37 @@ class HrTimesheetSheet(models.Model):
         return rec
 
     def _get_week_domain(self):
-        emp_id = self.env.user.employee_id.id
-        timesheets = self.env["hr_timesheet.sheet"].search(
-            [("employee_id", "=", emp_id)]
-        )
-        logged_weeks = timesheets.mapped("week_id").ids if timesheets else []
+        """Weeks the user's employee has no timesheet for, from the employment
+        week on, as a subquery so the weeks aren't read when building the view"""
+        employee = self.env.user.employee_id
         date_range_type_cw_id = self.env.ref(
             "ps_date_range_week.date_range_calender_week"
         ).id
         return [
             ("type_id", "=", date_range_type_cw_id),
             ("active", "=", True),
-            ("id", "not in", logged_weeks) if logged_weeks else TRUE_LEAF,
+            (
+                "id",
+                "inselect",
+                (
+                    """
+                    SELECT dr.id
+                    FROM date_range dr
+                    JOIN hr_employee he ON (
+                        he.official_date_of_employment IS NULL
+                        OR dr.date_end >= he.official_date_of_employment
+                    )
+                    WHERE he.id = %s
+                    AND NOT EXISTS (
+                        SELECT 1 FROM hr_timesheet_sheet hts
+                        WHERE hts.employee_id = he.id AND hts.week_id = dr.id
+                    )
+                    """,
+                    (employee.id,),
+                ),
+            )
+            if employee
+            else TRUE_LEAF,
         ]
 
     def _get_employee_domain(self):
@@ -180,11 +221,65 @@ class HrTimesheetSheet(models.Model):
             latest_mileage = self.sudo().starting_mileage_editable
         return latest_mileage
 
+    def _get_vehicle_mileage_map(self):
+        """Return a dict sheet id -> (vehicle id, latest mileage before the week)
+        for all stored sheets in self, resolved in one query"""
+        sheet_ids = tuple(self.ids)
+        if not sheet_ids:
+            return {}
+        self.env.cr.execute(
+            """
+            SELECT hts.id, fvd.vehicle_id, odo.value
+            FROM hr_timesheet_sheet hts
+            JOIN date_range dr ON dr.id = hts.week_id
+            JOIN hr_employee he ON he.id = hts.employee_id
+            JOIN res_users ru ON ru.id = he.user_id
+            LEFT JOIN LATERAL (
+                SELECT vehicle_id
+                FROM fleet_vehicle_driver
+                WHERE driver_id = ru.partner_id
+                AND date_start <= dr.date_start
+                AND (date_end IS NULL OR date_end >= dr.date_start)
+                ORDER BY date_start DESC
+                LIMIT 1
+            ) fvd ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT value
+                FROM fleet_vehicle_odometer
+                WHERE vehicle_id = fvd.vehicle_id
+                AND date < dr.date_start
+                ORDER BY date DESC
+                LIMIT 1
+            ) odo ON TRUE
+            WHERE hts.id IN %s
+            """,
+            (sheet_ids,),
+        )
+        return {
+            sheet_id: (vehicle_id, value or 0)
+            for sheet_id, vehicle_id, value in self.env.cr.fetchall()
+        }
+
     @api.depends("employee_id", "week_id")
     def _compute_starting_mileage(self):
-        for sheet in self:
+        stored = self.filtered(lambda x: isinstance(x.id, int))
+        for sheet in self - stored:
             sheet.vehicle = True if sheet._get_vehicle() else False
             sheet.starting_mileage = sheet._get_latest_mileage()
+        if not stored:
+            return
+        stored.flush(["employee_id", "week_id"])
+        self.env["fleet.vehicle.driver"].flush(
+            ["vehicle_id", "driver_id", "date_start", "date_end"]
+        )
+        self.env["fleet.vehicle.odometer"].flush(["vehicle_id", "date", "value"])
+        mileage_map = stored._get_vehicle_mileage_map()
+        for sheet in stored:
+            vehicle_id, mileage = mileage_map.get(sheet.id, (False, 0))
+            sheet.vehicle = bool(vehicle_id)
+            sheet.starting_mileage = (
+                mileage if vehicle_id else sheet.sudo().starting_mileage_editable
+            )
 
     @api.depends("timesheet_ids.kilometers")
     def _compute_business_mileage(self):
@@ -252,6 +347,36 @@ class HrTimesheetSheet(models.Model):
         "his/her senior.",
     )
 
+    def _refresh_status_time_report(self, employee_ids=None, week_ids=None):
+        self.env["status.time.report"]._refresh(
+            employee_ids=list(
+                set(self.mapped("employee_id").ids + (employee_ids or []))
+            ),
+            week_ids=list(set(self.mapped("week_id").ids + (week_ids or []))),
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._refresh_status_time_report()
+        return records
+
+    def write(self, vals):
+        if not {"state", "week_id", "employee_id", "reviewer_id"} & set(vals):
+            return super().write(vals)
+        employee_ids = self.mapped("employee_id").ids
+        week_ids = self.mapped("week_id").ids
+        result = super().write(vals)
+        self._refresh_status_time_report(employee_ids, week_ids)
+        return result
+
+    def unlink(self):
+        employee_ids = self.mapped("employee_id").ids
+        week_ids = self.mapped("week_id").ids
+        result = super().unlink()
+        self.browse([])._refresh_status_time_report(employee_ids, week_ids)
+        return result
+
     # start override methods from hr_timesheet and hr_timesheet_sheet
     def _get_data_matrix(self):
         with self.env["ps.time.line"]._as_analytic_line(self):
@@ -397,6 +522,7 @@ class HrTimesheetSheet(models.Model):
         if self.overtime_line_id:
             self.overtime_line_id.unlink()
 
+    @instrumented()
     def action_timesheet_confirm(self):
         self._check_end_mileage()
         vehicle = self._get_vehicle()
@@ -11,6 +11,8 @@ from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 from odoo.tests.common import Form
 
+from odoo.addons.ps_hr.models.ps_instrumentation import instrumented
+
 
 class PSInvoice(models.Model):
     _name = "ps.invoice"
@@ -27,6 +29,7 @@ class PSInvoice(models.Model):
         "project_id",
         "link_project",
     )
+    @instrumented(flush=False)
     def _compute_objects(self):
         """
         this method computes account_analytic_ids, task_user_ids and user_total_ids
@@ -653,6 +656,7 @@ class PSInvoice(models.Model):
             else []
         )
 
+    @instrumented()
     def generate_invoice(self):
         self.ensure_one()
         if self.invoice_id.state == "cancel":
@@ -7,3 +7,29 @@ class ResCompany(models.Model):
     wip_journal_id = fields.Many2one(
         "account.journal", "WIP Journal", domain=[("type", "=", "wip")]
     )
+    pipeline_actuals_account_ids = fields.Many2many(
+        "account.account",
+        "account_account_res_company_pipeline_rel",
+        "res_company_id",
+        "account_account_id",
+        string="Pipeline Actuals Accounts",
+        help="Revenue accounts counted as actuals in the pipeline actuals report",
+    )
+    pipeline_actuals_red_operating_unit_id = fields.Many2one(
+        "operating.unit", "Pipeline Actuals Red"
+    )
+    pipeline_actuals_blue_operating_unit_id = fields.Many2one(
+        "operating.unit", "Pipeline Actuals Blue"
+    )
+    pipeline_actuals_green_operating_unit_id = fields.Many2one(
+        "operating.unit", "Pipeline Actuals Green"
+    )
+    pipeline_actuals_black_operating_unit_id = fields.Many2one(
+        "operating.unit", "Pipeline Actuals Black"
+    )
+
+    def write(self, vals):
+        result = super().write(vals)
+        if "pipeline_actuals_account_ids" in vals:
+            self.env["crm.pipeline.actuals.monthly"]._refresh()
+        return result
@@ -25,15 +25,11 @@ class ResUsers(models.Model):
         top Department."""
         employee_id = self._get_related_employees()
         assert len(employee_id) == 1, "Only one employee can have this user_id"
-        dep = employee_id.department_id
-        if dep:
-            while dep.parent_id:
-                dep = dep.parent_id
-        else:
+        if not employee_id.department_id:
             raise ValidationError(
                 _(
                     "The Employee in the PS Time Line has "
                     "no department defined. Please complete"
                 )
             )
-        return dep.operating_unit_id
+        return employee_id.department_id.root_operating_unit_id
@@ -1,6 +1,128 @@
 from odoo import api, fields, models, tools
 
 
+class CrmPipelineActualsMonthly(models.Model):
+    _name = "crm.pipeline.actuals.monthly"
+    _description = "Pipeline Actuals per project, month and operating unit"
+    _log_access = False
+
+    project_id = fields.Many2one(
+        "project.project", string="Project", readonly=True, ondelete="cascade"
+    )
+    month_id = fields.Many2one(
+        "date.range", string="Month", readonly=True, ondelete="cascade"
+    )
+    operating_unit_id = fields.Many2one(
+        "operating.unit", string="Operating Unit", readonly=True
+    )
+    amount = fields.Float("Amount", readonly=True)
+
+    def init(self):
+        tools.create_index(
+            self.env.cr,
+            "crm_pipeline_actuals_monthly_project_month_index",
+            self._table,
+            ["project_id", "month_id"],
+        )
+        self.env.cr.execute("SELECT 1 FROM crm_pipeline_actuals_monthly LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh()
+
+    @api.model
+    def _refresh(self, project_ids=None, month_ids=None):
+        """
+        Recompute the actuals for the given projects and months, all if neither is
+        passed, from posted analytic lines on the companies' pipeline revenue
+        accounts
+        """
+        if project_ids is not None and not project_ids:
+            return
+        if month_ids is not None and not month_ids:
+            return
+        self.env["account.analytic.line"].flush(
+            ["amount", "date", "account_id", "general_account_id", "move_id"]
+        )
+        self.env["account.move.line"].flush(["operating_unit_id", "parent_state"])
+        params = {
+            "month_type_id": self.env.ref(
+                "account_fiscal_month.date_range_fiscal_month"
+            ).id,
+            "project_ids": tuple(project_ids or []),
+            "month_ids": tuple(month_ids or []),
+        }
+        delete_clauses = ["TRUE"]
+        select_clauses = ["TRUE"]
+        if project_ids is not None:
+            delete_clauses.append("project_id IN %(project_ids)s")
+            select_clauses.append("pp.id IN %(project_ids)s")
+        if month_ids is not None:
+            delete_clauses.append("month_id IN %(month_ids)s")
+            select_clauses.append("dr.id IN %(month_ids)s")
+        self.env.cr.execute(
+            "DELETE FROM crm_pipeline_actuals_monthly WHERE "
+            + " AND ".join(delete_clauses),
+            params,
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO crm_pipeline_actuals_monthly (
+                project_id, month_id, operating_unit_id, amount
+            )
+            SELECT
+                pp.id,
+                dr.id,
+                aml.operating_unit_id,
+                SUM(aal.amount)
+            FROM account_analytic_line aal
+            JOIN account_move_line aml ON (
+                aal.move_id = aml.id
+                AND aml.parent_state = 'posted'
+            )
+            JOIN project_project pp ON (
+                pp.analytic_account_id = aal.account_id
+            )
+            JOIN date_range dr ON (
+                dr.type_id = %(month_type_id)s AND
+                dr.date_start <= aal.date AND
+                dr.date_end >= aal.date
+            )
+            WHERE (aal.company_id, aal.general_account_id) IN (
+                SELECT res_company_id, account_account_id
+                FROM account_account_res_company_pipeline_rel
+            )
+            AND """
+            + " AND ".join(select_clauses)
+            + """
+            GROUP BY pp.id, dr.id, aml.operating_unit_id
+            """,
+            params,
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh_analytic_lines(self, analytic_account_ids, dates):
+        """Recompute the actuals affected by analytic lines"""
+        if not analytic_account_ids or not dates:
+            return
+        projects = (
+            self.env["project.project"]
+            .with_context(active_test=False)
+            .search([("analytic_account_id", "in", list(analytic_account_ids))])
+        )
+        months = self.env["date.range"].search(
+            [
+                (
+                    "type_id",
+                    "=",
+                    self.env.ref("account_fiscal_month.date_range_fiscal_month").id,
+                ),
+                ("date_start", "<=", max(dates)),
+                ("date_end", ">=", min(dates)),
+            ]
+        )
+        self._refresh(project_ids=projects.ids, month_ids=months.ids)
+
+
 class CrmPipelineActualsReport(models.Model):
     _name = "crm.pipeline.actuals.report"
     _auto = False
@@ -38,107 +160,64 @@ class CrmPipelineActualsReport(models.Model):
 
     # @api.model_cr
     def init(self):
-        """ """
+        """The operating units per color come from the company of the lead"""
         tools.drop_view_if_exists(self.env.cr, "crm_pipeline_actuals_report")
         self.env.cr.execute(
             """
         CREATE OR REPLACE VIEW crm_pipeline_actuals_report AS (
-            WITH query01 as (
             SELECT
-                    sum(aal.amount) as amount,
-                    dr.id as month,
-                    aml.operating_unit_id as operating_unit,
-                    pp.id as project_id
-            FROM account_analytic_line aal
-            LEFT JOIN date_range dr on (
-                dr.type_id = 2 AND
-                dr.date_start <= aal.date AND
-                dr.date_end >= aal.date
-                )
-            LEFT JOIN account_account aa on (
-                aal.general_account_id = aa.id
-                )
-            LEFT JOIN account_move_line aml on (
-                aal.move_id = aml.id
-                )
-            LEFT JOIN project_project pp ON (
-                pp.analytic_account_id = aal.account_id
-                )
-            WHERE
-                aa.code = '8100' AND
-                aal.move_id is not NULL
-            GROUP BY
-                dr.id,
-                aml.operating_unit_id,
-                pp.id)
-
-                SELECT
-                    crs.id AS id,
-                    sum(query01.amount) AS total_actuals_amount,
-                    sum(CASE
-                        WHEN query01.operating_unit = '6'
-                        THEN query01.amount
-                        ELSE 0
-                    END) AS actuals_red_amount,
-                    sum(CASE
-                        WHEN query01.operating_unit = '7'
-                        THEN query01.amount
-                        ELSE 0
-                    END) AS actuals_green_amount,
-                    sum(CASE
-                        WHEN query01.operating_unit = '8'
-                        THEN query01.amount
-                        ELSE 0
-                    END) AS actuals_blue_amount,
-                    sum(CASE
-                        WHEN query01.operating_unit = '11'
-                        THEN query01.amount
-                        ELSE 0
-                    END) AS actuals_black_amount,
-                    crs.project_id AS project_id,
-                    crs.month AS month,
-                    crs.operating_unit_id AS operating_unit_id,
-                    crs.partner_id AS partner_id,
-                    crs.user_id AS user_id,
-                    crs.department_id AS department_id,
-                    crs.name AS name,
-                    crs.lead_id AS lead_id,
-                    crs.total_revenue AS total_revenue,
-                    crs.total_revenue_per AS total_revenue_per,
-                    crs.ps_red_bv_amount AS ps_red_bv_amount,
-                    crs.ps_blue_bv_amount AS ps_blue_bv_amount,
-                    crs.ps_green_bv_amount AS ps_green_bv_amount,
-                    crs.ps_black_bv_amount AS ps_black_bv_amount,
-                    crs.ps_red_bv_per AS ps_red_bv_per,
-                    crs.ps_blue_bv_per AS ps_blue_bv_per,
-                    crs.ps_green_bv_per AS ps_green_bv_per,
-                    crs.ps_black_bv_per AS ps_black_bv_per
-                FROM
-                    query01
-                RIGHT JOIN	crm_revenue_split crs ON (
-                    query01.month = crs.month AND
-                    query01.project_id = crs.project_id)
-                GROUP BY
-                    query01.operating_unit,
-                    crs.id,
-                    crs.project_id,
-                    crs.month,
-                    crs.operating_unit_id,
-                    crs.partner_id,
-                    crs.user_id,
-                    crs.department_id,
-                    crs.name,
-                    crs.lead_id,
-                    crs.total_revenue,
-                    crs.total_revenue_per,
-                    crs.ps_red_bv_amount,
-                    crs.ps_blue_bv_amount,
-                    crs.ps_green_bv_amount,
-                    crs.ps_black_bv_amount,
-                    crs.ps_red_bv_per,
-                    crs.ps_blue_bv_per,
-                    crs.ps_green_bv_per,
-                    crs.ps_black_bv_per)"""
+                crs.id AS id,
+                coalesce(sum(cpam.amount), 0) AS total_actuals_amount,
+                coalesce(sum(CASE
+                    WHEN cpam.operating_unit_id =
+                        rc.pipeline_actuals_red_operating_unit_id
+                    THEN cpam.amount
+                    ELSE 0
+                END), 0) AS actuals_red_amount,
+                coalesce(sum(CASE
+                    WHEN cpam.operating_unit_id =
+                        rc.pipeline_actuals_green_operating_unit_id
+                    THEN cpam.amount
+                    ELSE 0
+                END), 0) AS actuals_green_amount,
+                coalesce(sum(CASE
+                    WHEN cpam.operating_unit_id =
+                        rc.pipeline_actuals_blue_operating_unit_id
+                    THEN cpam.amount
+                    ELSE 0
+                END), 0) AS actuals_blue_amount,
+                coalesce(sum(CASE
+                    WHEN cpam.operating_unit_id =
+                        rc.pipeline_actuals_black_operating_unit_id
+                    THEN cpam.amount
+                    ELSE 0
+                END), 0) AS actuals_black_amount,
+                crs.project_id AS project_id,
+                crs.month AS month,
+                crs.operating_unit_id AS operating_unit_id,
+                crs.partner_id AS partner_id,
+                crs.user_id AS user_id,
+                crs.department_id AS department_id,
+                crs.name AS name,
+                crs.lead_id AS lead_id,
+                crs.total_revenue AS total_revenue,
+                crs.total_revenue_per AS total_revenue_per,
+                crs.ps_red_bv_amount AS ps_red_bv_amount,
+                crs.ps_blue_bv_amount AS ps_blue_bv_amount,
+                crs.ps_green_bv_amount AS ps_green_bv_amount,
+                crs.ps_black_bv_amount AS ps_black_bv_amount,
+                crs.ps_red_bv_per AS ps_red_bv_per,
+                crs.ps_blue_bv_per AS ps_blue_bv_per,
+                crs.ps_green_bv_per AS ps_green_bv_per,
+                crs.ps_black_bv_per AS ps_black_bv_per
+            FROM crm_revenue_split crs
+            LEFT JOIN crm_lead cl ON (cl.id = crs.lead_id)
+            LEFT JOIN res_company rc ON (rc.id = cl.company_id)
+            LEFT JOIN crm_pipeline_actuals_monthly cpam ON (
+                cpam.month_id = crs.month AND
+                cpam.project_id = crs.project_id
+            )
+            GROUP BY crs.id)"""
         )
 
     @api.model
@@ -1,5 +1,7 @@
 from odoo import api, fields, models, tools
 
+from odoo.addons.resource.models.resource import HOURS_PER_DAY
+
 
 class HrChargeabilityReport(models.Model):
     _name = "hr.chargeability.report"
@@ -21,6 +23,10 @@ class HrChargeabilityReport(models.Model):
     ts_no_8_hours_day = fields.Boolean(string="No 8 Hours Per Day", readonly=True)
 
     def init(self):
+        """
+        Norm hours follow the rules of ps.work.calendar: week days that are no
+        public holiday, scaled by the part-time percentage of the employee
+        """
         uom = self.env.ref("uom.product_uom_hour").id
         tools.drop_view_if_exists(self.env.cr, "hr_chargeability_report")
         self.env.cr.execute(
@@ -42,8 +48,18 @@ class HrChargeabilityReport(models.Model):
                         END) as chargeable_hours,
                     (COUNT (DISTINCT pst.date) * (
                              CASE
-                             WHEN dr.date_end - pst.date > 1
-                             THEN 8
+                             WHEN """
+            + self.env["ps.work.calendar"]._get_work_day_sql(
+                "pst.date", "emp.company_id"
+            )
+            + """
+                             THEN %s * (
+                                CASE
+                                WHEN emp.parttime > 0 AND emp.parttime < 100
+                                THEN emp.parttime / 100.0
+                                ELSE 1
+                                END
+                             )
                              ELSE 0
                              END
                              )
@@ -71,13 +87,15 @@ class HrChargeabilityReport(models.Model):
                     dr.date_end,
                     pst.date,
                     pst.department_id,
+                    emp.company_id,
+                    emp.parttime,
                     -- emp.external,
                     emp.timesheet_optional,
                     emp.timesheet_no_8_hours_day
                 ORDER BY pst.date
             )
             """,
-            (uom,),
+            (HOURS_PER_DAY, uom),
         )
 
     @api.model
@@ -1,33 +1,20 @@
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 
 
 class StatusTimeReport(models.Model):
     _name = "status.time.report"
-    _auto = False
     _description = "Status Time Report"
+    _log_access = False
 
-    @api.depends("department_id")
-    def _compute_atmost_parent_ou(self):
-        department2ou = {}
-        for this in self:
-            if not this.department_id:
-                continue
-            if this.department_id in department2ou:
-                this.operating_unit_id = department2ou[this.department_id]
-            else:
-                department = this.department_id
-                while department.parent_id:
-                    department = department.parent_id
-                department2ou[
-                    department
-                ] = this.operating_unit_id = department.operating_unit_id
-
-    employee_id = fields.Many2one("hr.employee", string="Employee", readonly=True)
-    week_id = fields.Many2one("date.range", string="Week", readonly=True)
+    employee_id = fields.Many2one(
+        "hr.employee", string="Employee", readonly=True, index=True, ondelete="cascade"
+    )
+    week_id = fields.Many2one(
+        "date.range", string="Week", readonly=True, index=True, ondelete="cascade"
+    )
     department_id = fields.Many2one("hr.department", string="Department", readonly=True)
     operating_unit_id = fields.Many2one(
         "operating.unit",
-        compute="_compute_atmost_parent_ou",
         string="Operating Unit",
         readonly=True,
     )
@@ -37,21 +24,56 @@ class StatusTimeReport(models.Model):
     external = fields.Boolean(string="External", readonly=True)
 
     def init(self):
-        drcw = self.env.ref("ps_date_range_week.date_range_calender_week").id
-        tools.drop_view_if_exists(self.env.cr, "status_time_report")
+        self.env.cr.execute("SELECT 1 FROM status_time_report LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh()
+
+    @api.model
+    def _refresh(self, employee_ids=None, week_ids=None):
+        """
+        Recreate the rows for the given employees and weeks, all rows if neither
+        is passed. There is one row per employee per week within the employment of
+        the employee
+        """
+        if employee_ids is not None and not employee_ids:
+            return
+        if week_ids is not None and not week_ids:
+            return
+        for model, field_names in (
+            ("hr.employee", None),
+            ("hr.department", ["parent_id", "root_operating_unit_id"]),
+            ("hr_timesheet.sheet", ["week_id", "employee_id", "state", "reviewer_id"]),
+            ("date.range", ["type_id", "date_start", "date_end"]),
+        ):
+            self.env[model].flush(field_names)
+        params = {
+            "type_id": self.env.ref("ps_date_range_week.date_range_calender_week").id,
+            "employee_ids": tuple(employee_ids or []),
+            "week_ids": tuple(week_ids or []),
+        }
+        delete_clauses = ["TRUE"]
+        select_clauses = ["dr.type_id = %(type_id)s"]
+        if employee_ids is not None:
+            delete_clauses.append("employee_id IN %(employee_ids)s")
+            select_clauses.append("hrc.id IN %(employee_ids)s")
+        if week_ids is not None:
+            delete_clauses.append("week_id IN %(week_ids)s")
+            select_clauses.append("dr.id IN %(week_ids)s")
+        self.env.cr.execute(
+            "DELETE FROM status_time_report WHERE " + " AND ".join(delete_clauses),
+            params,
+        )
         self.env.cr.execute(
             """
-            CREATE OR REPLACE VIEW status_time_report AS (
+            INSERT INTO status_time_report (
+                week_id, employee_id, department_id, operating_unit_id, external,
+                ts_optional, validators, state
+            )
             SELECT
-                CAST(
-                    CASE WHEN hrc.id < dr.id
-                        THEN hrc.id + dr.id^2
-                     ELSE hrc.id^2 + hrc.id + dr.id
-                    END
-                    as INTEGER) as id,
                 dr.id as week_id,
                 hrc.id as employee_id,
                 hrc.department_id as department_id,
+                hrc.root_operating_unit_id as operating_unit_id,
                 hrc.external as external,
                 hrc.timesheet_optional as ts_optional,
                 string_agg(
@@ -60,22 +82,26 @@ class StatusTimeReport(models.Model):
                 ) as validators,
                 htsss.state as state
             FROM date_range dr
-            CROSS JOIN  hr_employee hrc
+            JOIN hr_employee hrc
+            ON (
+                hrc.official_date_of_employment < dr.date_start
+                AND (
+                    hrc.end_date_of_employment > dr.date_end
+                    OR hrc.end_date_of_employment is NULL
+                )
+            )
             LEFT JOIN hr_timesheet_sheet htsss
             ON (dr.id = htsss.week_id and hrc.id = htsss.employee_id)
-            LEFT JOIN hr_department hd
-            ON (hd.id = hrc.department_id)
             LEFT JOIN hr_employee he
             ON (htsss.reviewer_id=he.id)
             LEFT JOIN hr_employee he_parent
             ON (hrc.parent_id=he_parent.id)
-            WHERE dr.type_id = %s
-            AND hrc.official_date_of_employment < dr.date_start
-            AND (
-            hrc.end_date_of_employment > dr.date_end
-            OR hrc.end_date_of_employment is NULL
-            )
-            GROUP BY hrc.id, dr.id, hrc.department_id, htsss.state
-            )""",
-            (drcw,),
+            WHERE """
+            + " AND ".join(select_clauses)
+            + """
+            GROUP BY hrc.id, dr.id, hrc.department_id,
+            hrc.root_operating_unit_id, htsss.state
+            """,
+            params,
         )
+        self.invalidate_cache()
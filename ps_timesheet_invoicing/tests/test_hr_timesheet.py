@@ -107,6 +107,31 @@ class TestHrTimesheet(TransactionCase):
         self.assertEqual(next_sheet.overtime_hours_delta, 16)
         next_sheet.action_timesheet_done()
 
+    def test_01_missing_weeks(self):
+        """Test finding weeks without timesheet"""
+        employee = self.user.employee_id
+        sheet_model = self.env["hr_timesheet.sheet"].with_user(self.user)
+        week = sheet_model.get_week_to_submit()
+        missing = sheet_model._get_missing_weeks(employee)[employee.id]
+        self.assertEqual(week, missing[:1])
+        self.assertIn(week, missing)
+        sheet = sheet_model.create({})
+        self.assertEqual(sheet.week_id, week)
+        self.assertTrue(sheet.vehicle)
+        self.assertEqual(sheet.starting_mileage, sheet._get_latest_mileage())
+        missing_after = sheet_model._get_missing_weeks(employee)[employee.id]
+        self.assertEqual(missing_after, missing - week)
+        self.assertNotEqual(sheet_model.get_week_to_submit(), week)
+        self.assertEqual(
+            self.env["date.range"].search(sheet_model._get_week_domain()),
+            missing_after,
+        )
+        first_only = sheet_model._get_missing_weeks(
+            employee + self.env.ref("hr.employee_admin"), first_only=True
+        )
+        self.assertEqual(first_only[employee.id], missing_after[:1])
+        self.assertLessEqual(len(first_only[self.env.ref("hr.employee_admin").id]), 1)
+
     def test_02_change_chargecode(self):
         wizard = (
             self.env["change.chargecode"]
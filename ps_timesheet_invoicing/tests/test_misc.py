@@ -1,3 +1,5 @@
+from psycopg2 import IntegrityError
+
 from odoo.exceptions import ValidationError
 from odoo.tests.common import Form, TransactionCase
 from odoo.tools.misc import mute_logger
@@ -116,6 +118,65 @@ class TestMisc(TransactionCase):
         self.assertEqual(odometer20230701.value, 70)
         odometer20230101.unlink()
         self.assertEqual(odometer20230701.value, 62)
+        odometer_model = self.env["fleet.vehicle.odometer"]
+        with odometer_model._deferred_recompute() as deferred_model:
+            deferred_model.create(
+                [
+                    {
+                        "vehicle_id": vehicle.id,
+                        "value_period_update": 5,
+                        "date": "2023-0%d-15" % month,
+                    }
+                    for month in range(1, 6)
+                ]
+            )
+        self.assertEqual(odometer20230601.value, 67)
+        self.assertEqual(odometer20230701.value, 87)
+        # ultimo values entered in a batch or deferred block count from the
+        # recomputed values of the records before them
+        with odometer_model._deferred_recompute() as deferred_model:
+            odometer20230801 = deferred_model.create(
+                {"vehicle_id": vehicle.id, "value_update": 100, "date": "2023-08-01"}
+            )
+            deferred_model.create(
+                [
+                    {
+                        "vehicle_id": vehicle.id,
+                        "value_period_update": 3,
+                        "date": "2023-02-01",
+                    },
+                    {
+                        "vehicle_id": vehicle.id,
+                        "value_update": 130,
+                        "date": "2023-09-01",
+                    },
+                ]
+            )
+        self.assertEqual(odometer20230701.value, 90)
+        self.assertEqual(odometer20230801.value, 100)
+        self.assertEqual(odometer20230801.value_period, 10)
+        odometer20230901 = odometer_model.search([("date", "=", "2023-09-01")])
+        self.assertEqual(odometer20230901.value, 130)
+        self.assertEqual(odometer20230901.value_period, 30)
+        odometer_model.create(
+            [
+                {
+                    "vehicle_id": vehicle.id,
+                    "value_period_update": 10,
+                    "date": "2023-07-05",
+                },
+                {
+                    "vehicle_id": vehicle.id,
+                    "value_update": 120,
+                    "date": "2023-07-20",
+                },
+            ]
+        )
+        odometer20230720 = odometer_model.search([("date", "=", "2023-07-20")])
+        self.assertEqual(odometer20230720.value, 120)
+        self.assertEqual(odometer20230720.value_period, 20)
+        self.assertEqual(odometer20230801.value, 130)
+        self.assertEqual(odometer20230901.value, 160)
 
     def test_status_time_report(self):
         """Test that the status report works"""
@@ -126,6 +187,43 @@ class TestMisc(TransactionCase):
         self.env["status.time.report"].with_user(
             self.env.ref("base.user_admin")
         ).search([]).read([])
+        user = self.env.ref("base.user_demo")
+        sheet = self.env["hr_timesheet.sheet"].with_user(user).create({})
+        domain = [
+            ("employee_id", "=", user.employee_id.id),
+            ("week_id", "=", sheet.week_id.id),
+        ]
+        self.assertEqual(
+            self.env["status.time.report"].search(domain).state, sheet.state
+        )
+        sheet.unlink()
+        row = self.env["status.time.report"].search(domain)
+        self.assertTrue(row)
+        self.assertFalse(row.state)
+        self.env["hr.employee"].search([]).write(
+            {"official_date_of_employment": "2099-12-31"}
+        )
+        self.assertFalse(self.env["status.time.report"].search([]))
+
+    def test_crm_pipeline_actuals_report(self):
+        """Test that the pipeline actuals follow the configured accounts"""
+        line = self.env["account.analytic.line"].search(
+            [("move_id", "!=", False), ("account_id.project_ids", "!=", False)],
+            limit=1,
+        )
+        actuals = self.env["crm.pipeline.actuals.monthly"]
+        self.env.company.pipeline_actuals_account_ids = line.general_account_id
+        if line:
+            self.assertTrue(
+                actuals.search(
+                    [("project_id.analytic_account_id", "=", line.account_id.id)]
+                )
+            )
+        self.env.company.pipeline_actuals_account_ids = False
+        self.assertFalse(actuals.search([]))
+        self.env["crm.pipeline.actuals.report"].search([]).read(
+            ["total_actuals_amount", "actuals_red_amount"]
+        )
 
     def test_vehicle_driver(self):
         """Test the constraints of vehicle driver records"""
@@ -148,8 +246,8 @@ class TestMisc(TransactionCase):
                 ],
             }
         )
-        with self.assertRaisesRegex(
-            ValidationError, "open-ended"
+        with mute_logger("odoo.sql_db"), self.assertRaisesRegex(
+            IntegrityError, "fleet_vehicle_driver_open_ended"
         ), self.env.cr.savepoint():
             vehicle1.write(
                 {
@@ -165,8 +263,8 @@ class TestMisc(TransactionCase):
                     ],
                 }
             )
-        with self.assertRaisesRegex(
-            ValidationError, "overlapping"
+        with mute_logger("odoo.sql_db"), self.assertRaisesRegex(
+            IntegrityError, "fleet_vehicle_driver_vehicle_overlap"
         ), self.env.cr.savepoint():
             vehicle1.write(
                 {
@@ -183,8 +281,8 @@ class TestMisc(TransactionCase):
                     ],
                 }
             )
-        with self.assertRaisesRegex(
-            ValidationError, "multiple"
+        with mute_logger("odoo.sql_db"), self.assertRaisesRegex(
+            IntegrityError, "fleet_vehicle_driver_driver_overlap"
         ), self.env.cr.savepoint():
             vehicle2.write(
                 {
@@ -216,6 +314,11 @@ class TestMisc(TransactionCase):
                 ],
             }
         )
+        with mute_logger("odoo.sql_db"), self.assertRaisesRegex(
+            IntegrityError, "fleet_vehicle_driver_date_end_after_start"
+        ), self.env.cr.savepoint():
+            vehicle2.fleet_vehicle_driver_ids.write({"date_end": "2024-07-15"})
+            vehicle2.fleet_vehicle_driver_ids.flush()
         with self.assertRaisesRegex(ValidationError, "Monday"):
             vehicle2.fleet_vehicle_driver_ids.date_start = "2024-07-21"
         self.assertEqual(
@@ -1,5 +1,7 @@
 from odoo.tests.common import Form, TransactionCase
 
+from odoo.addons.ps_hr.models.ps_instrumentation import assert_query_budget
+
 
 class TestPsInvoiceBase(TransactionCase):
     def setUp(self):
@@ -48,7 +50,8 @@ class TestPsInvoice(TestPsInvoiceBase):
         ps_invoice = self.ps_invoice
         self.assertTrue(ps_invoice)
         self.assertEqual(ps_invoice.fiscal_position_id, self.partner_fpos)
-        ps_invoice.generate_invoice()
+        with assert_query_budget(self, "ps.invoice.generate_invoice", 1000):
+            ps_invoice.generate_invoice()
         self.assertTrue(ps_invoice.expense_line_ids)
         self.assertTrue(
             ps_invoice.invoice_id.invoice_line_ids.filtered("ps_analytic_line_ids")
@@ -1,7 +1,7 @@
 # Copyright 2018 The Open Source Company ((www.tosc.nl).)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class HREmployeeWizard(models.TransientModel):
@@ -13,7 +13,11 @@ class HREmployeeWizard(models.TransientModel):
         domain=lambda self: self.env["hr.employee"]._get_category_domain(),
     )
 
-    def create_employee(self, user_id, res_partner_bank_id):
-        result = super().create_employee(user_id, res_partner_bank_id)
-        result.product_id = self.product_id
+    def _prepare_employee_vals(self, user_id, res_partner_bank_id):
+        result = super()._prepare_employee_vals(user_id, res_partner_bank_id)
+        result["product_id"] = self.product_id.id
         return result
+
+    @api.model
+    def _get_import_default_fields(self):
+        return super()._get_import_default_fields() + ["product_id"]
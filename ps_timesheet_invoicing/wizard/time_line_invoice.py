@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
+from odoo.addons.ps_hr.models.ps_instrumentation import instrumented
 from odoo.addons.queue_job.exception import FailedJobError
 
 _logger = logging.getLogger(__name__)
@@ -306,6 +307,7 @@ class TimeLineStatus(models.TransientModel):
         res.append(move_line_credit)
         return res
 
+    @instrumented(size=lambda self, time_lines_ids, notupdatestate: len(time_lines_ids))
     def prepare_account_move(self, time_lines_ids, notupdatestate):  # noqa: C901
         """Creates analytics related financial move lines"""
         acc_time_line = self.env["ps.time.line"]